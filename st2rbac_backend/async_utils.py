@@ -0,0 +1,149 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing asyncio friendly permission check API.
+
+Permission checks are evaluated in an executor so database I/O doesn't block the event loop and
+many checks (e.g. the same event checked for many st2stream subscribers) can run concurrently.
+When a permission snapshot is available, checks are resolved from memory and don't hit the
+database at all.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import functools
+import contextvars
+
+from st2rbac_backend.snapshot import get_permission_snapshot
+from st2rbac_backend.snapshot import use_permission_snapshot
+from st2rbac_backend.utils import RBACUtils
+
+__all__ = ["AsyncRBACChecker"]
+
+
+class AsyncRBACChecker(object):
+    """
+    Asyncio wrapper around RBACUtils permission checks.
+
+    Example usage:
+
+        checker = AsyncRBACChecker()
+        has_permission = await checker.check(user_db, PermissionType.ACTION_VIEW, action_db)
+    """
+
+    def __init__(self, snapshot=None, executor=None):
+        """
+        :param snapshot: Optional snapshot to resolve all the checks against. If not provided, the
+                         process wide snapshot is used (if enabled), otherwise checks are resolved
+                         using the database.
+        :type snapshot: :class:`PermissionSnapshot`
+
+        :param executor: Optional executor to run the checks in. If not provided, event loop
+                         default executor is used.
+        :type executor: :class:`concurrent.futures.Executor`
+        """
+        self._snapshot = snapshot
+        self._executor = executor
+
+    async def check(self, user_db, permission_type, resource=None):
+        """
+        Check if the provided user has the provided permission.
+
+        :param resource: Optional resource database object. If not provided, a global (resource
+                         type wide) permission is checked.
+
+        :rtype: ``bool``
+        """
+        if resource is None:
+            func = functools.partial(
+                RBACUtils.user_has_permission, user_db=user_db, permission_type=permission_type
+            )
+        else:
+            func = functools.partial(
+                RBACUtils.user_has_resource_db_permission,
+                user_db=user_db,
+                resource_db=resource,
+                permission_type=permission_type,
+            )
+
+        return await self._run(func)
+
+    async def check_many(self, checks):
+        """
+        Concurrently evaluate multiple permission checks.
+
+        :param checks: List of (user_db, permission_type, resource) tuples.
+        :type checks: ``list`` of ``tuple``
+
+        :return: List of results in the same order as the provided checks.
+        :rtype: ``list`` of ``bool``
+        """
+        # All the checks are resolved against the same snapshot
+        snapshot = self._snapshot
+
+        if snapshot is None:
+            snapshot = await self._run(get_permission_snapshot)
+
+        checker = AsyncRBACChecker(snapshot=snapshot, executor=self._executor)
+
+        result = await asyncio.gather(
+            *[
+                checker.check(user_db=user_db, permission_type=permission_type, resource=resource)
+                for user_db, permission_type, resource in checks
+            ]
+        )
+        return list(result)
+
+    async def filter_users(self, user_dbs, permission_type, resource=None):
+        """
+        Return users which have the provided permission (e.g. st2stream subscribers which are
+        allowed to receive a particular event).
+
+        :rtype: ``list`` of :class:`UserDB`
+        """
+        user_dbs = list(user_dbs)
+        checks = [(user_db, permission_type, resource) for user_db in user_dbs]
+        result = await self.check_many(checks)
+        return [user_db for user_db, has_permission in zip(user_dbs, result) if has_permission]
+
+    async def filter_resource_dbs(self, user_db, resource_dbs, permission_type):
+        """
+        Asyncio variant of RBACUtils.filter_resource_dbs_by_permission.
+
+        :rtype: ``list``
+        """
+        func = functools.partial(
+            RBACUtils.filter_resource_dbs_by_permission,
+            user_db=user_db,
+            resource_dbs=list(resource_dbs),
+            permission_type=permission_type,
+        )
+        return await self._run(func)
+
+    async def _run(self, func):
+        if self._snapshot is not None:
+            func = functools.partial(self._run_with_snapshot, self._snapshot, func)
+
+        # Note: Executor threads don't inherit the caller context (request scope, pinned
+        # snapshot) so we need to explicitly propagate it
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, context.run, func)
+
+    def _run_with_snapshot(self, snapshot, func):
+        with use_permission_snapshot(snapshot):
+            return func()
@@ -13,9 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from oslo_config import cfg
+
 from st2common.rbac.backends.base import BaseRBACBackend
 
 from st2rbac_backend import resolvers
+from st2rbac_backend.events import start_rbac_invalidation_listener
 from st2rbac_backend.service import RBACService
 from st2rbac_backend.utils import RBACUtils
 from st2rbac_backend.syncer import RBACRemoteGroupToRoleSyncer
@@ -24,6 +27,14 @@ __all__ = ["RBACBackend"]
 
 
 class RBACBackend(BaseRBACBackend):
+    def __init__(self):
+        super(RBACBackend, self).__init__()
+
+        # Note: Listener is also needed when caches are disabled since long lived objects such as
+        # compiled permission predicates are only rebuilt when caches version changes
+        if cfg.CONF.rbac.invalidation_events_enable:
+            start_rbac_invalidation_listener()
+
     def get_resolver_for_resource_type(self, resource_type):
         return resolvers.get_resolver_for_resource_type(resource_type=resource_type)
 
@@ -0,0 +1,275 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing in-process caches which are used to speed up permission resolving.
+"""
+
+from __future__ import absolute_import
+
+import time
+import threading
+from collections import namedtuple
+from collections import OrderedDict
+
+from oslo_config import cfg
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.generation import get_current_rbac_generation
+from st2rbac_backend.scope import get_request_scope
+from st2rbac_backend.snapshot import invalidate_permission_snapshot
+
+__all__ = [
+    "LRUCache",
+    "UserPermissions",
+    "get_user_permissions_cache",
+    "get_permission_deny_cache",
+    "invalidate_permission_caches",
+    "get_permission_caches_version",
+]
+
+# Effective roles and permission grants for a particular user. Note: permission_grant_dbs is None
+# when grants haven't been loaded yet.
+UserPermissions = namedtuple("UserPermissions", ["role_dbs", "permission_grant_dbs"])
+
+_user_permissions_cache = None
+_user_permissions_cache_lock = threading.Lock()
+
+# RBAC generation the cache has been populated with
+_user_permissions_cache_generation = None
+
+# Cache of denied permission checks keyed by (username, permission_type, resource_uid, pack_uid)
+_permission_deny_cache = None
+_permission_deny_cache_lock = threading.Lock()
+_permission_deny_cache_generation = None
+
+# Number of in-process invalidations (local RBAC changes and received invalidation events)
+_invalidations_count = 0
+_invalidations_count_lock = threading.Lock()
+
+
+class LRUCache(object):
+    """
+    Thread safe, size bounded cache with least recently used eviction and per entry TTL.
+    """
+
+    def __init__(self, max_size, ttl):
+        """
+        :param max_size: Maximum number of entries in the cache.
+        :type max_size: ``int``
+
+        :param ttl: How long (in seconds) an entry is considered valid.
+        :type ttl: ``float``
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # Number of get() calls which have been served from the cache and number of calls which
+        # haven't
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._get_entry(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_if(self, predicate):
+        """
+        Delete all the entries for which predicate(key, value) returns True.
+        """
+        with self._lock:
+            for key, (_, value) in list(self._entries.items()):
+                if predicate(key, value):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def _get_entry(self, key):
+        entry = self._entries.get(key, None)
+
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+
+def get_user_permissions_cache():
+    """
+    Return per-user effective permissions cache or None if caching is disabled.
+
+    :rtype: :class:`LRUCache` or ``None``
+    """
+    global _user_permissions_cache, _user_permissions_cache_generation
+
+    if not cfg.CONF.rbac.permission_cache_enable:
+        return None
+
+    max_size = cfg.CONF.rbac.permission_cache_size
+    ttl = cfg.CONF.rbac.permission_cache_ttl
+    cache = _user_permissions_cache
+
+    if cache is None or cache.max_size != max_size or cache.ttl != ttl:
+        with _user_permissions_cache_lock:
+            cache = _user_permissions_cache
+
+            if cache is None or cache.max_size != max_size or cache.ttl != ttl:
+                cache = LRUCache(max_size=max_size, ttl=ttl)
+                _user_permissions_cache = cache
+
+    generation = get_current_rbac_generation()
+
+    if generation is not None and generation != _user_permissions_cache_generation:
+        # RBAC data has been changed (possibly by a different process)
+        cache.clear()
+        _user_permissions_cache_generation = generation
+
+    return cache
+
+
+def get_permission_deny_cache():
+    """
+    Return cache of denied permission checks or None if deny caching is disabled.
+
+    :rtype: :class:`LRUCache` or ``None``
+    """
+    global _permission_deny_cache, _permission_deny_cache_generation
+
+    if not cfg.CONF.rbac.permission_deny_cache_enable:
+        return None
+
+    max_size = cfg.CONF.rbac.permission_deny_cache_size
+    ttl = cfg.CONF.rbac.permission_deny_cache_ttl
+    cache = _permission_deny_cache
+
+    if cache is None or cache.max_size != max_size or cache.ttl != ttl:
+        with _permission_deny_cache_lock:
+            cache = _permission_deny_cache
+
+            if cache is None or cache.max_size != max_size or cache.ttl != ttl:
+                cache = LRUCache(max_size=max_size, ttl=ttl)
+                _permission_deny_cache = cache
+
+    generation = get_current_rbac_generation()
+
+    if generation is not None and generation != _permission_deny_cache_generation:
+        cache.clear()
+        _permission_deny_cache_generation = generation
+
+    return cache
+
+
+def invalidate_permission_caches(username=None, role_name=None):
+    """
+    Invalidate all the in-process permission caches.
+
+    :param username: If provided, only cache entries for this user are invalidated. Note: Shared
+                     data such as the permission snapshot is always invalidated.
+    :type username: ``str``
+
+    :param role_name: If provided, only cache entries for users which have this role assigned are
+                      invalidated.
+    :type role_name: ``str``
+    """
+    global _invalidations_count
+
+    with _invalidations_count_lock:
+        _invalidations_count += 1
+
+    invalidate_permission_snapshot()
+
+    scope = get_request_scope()
+    if scope is not None:
+        scope.invalidate(username=username, role_name=role_name)
+
+    deny_cache = _permission_deny_cache
+    if deny_cache is not None:
+        if username:
+            deny_cache.delete_if(lambda key, value: key[0] == username)
+        else:
+            # Role membership is not tracked in the deny cache
+            deny_cache.clear()
+
+    cache = _user_permissions_cache
+    if cache is None:
+        return
+
+    if username:
+        cache.delete(username)
+    elif role_name:
+        cache.delete_if(
+            lambda key, user_permissions: _user_permissions_have_role(
+                user_permissions=user_permissions, role_name=role_name
+            )
+        )
+    else:
+        cache.clear()
+
+
+def get_permission_caches_version():
+    """
+    Return a value which changes each time in-process permission caches are invalidated or RBAC
+    data is changed by a different process (if generation checks are enabled).
+
+    Long lived objects which are derived from RBAC data (e.g. compiled permission predicates) can
+    compare it to the value they have been built with to determine if they need to be rebuilt.
+
+    :rtype: ``tuple``
+    """
+    return (_invalidations_count, get_current_rbac_generation())
+
+
+def _user_permissions_have_role(user_permissions, role_name):
+    for role_db in user_permissions.role_dbs:
+        if role_db.name == role_name:
+            return True
+
+    return False
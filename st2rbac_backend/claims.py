@@ -0,0 +1,137 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing user role claims support.
+
+Role claims are a compact digest of the user effective roles (role names and the RBAC generation
+they have been computed at) which is stored in the auth token metadata at login. When claims for
+the authenticated user are bound to the current request, user role lookups are answered from the
+claims without hitting the database for as long as the RBAC generation matches.
+"""
+
+from __future__ import absolute_import
+
+import contextlib
+import contextvars
+from collections import namedtuple
+
+import six
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.persistence.auth import Token
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.generation import get_current_rbac_generation
+
+LOG = logging.getLogger(__name__)
+
+__all__ = [
+    "RoleClaims",
+    "get_role_claims_from_token",
+    "store_role_claims_in_token",
+    "use_role_claims",
+    "get_trusted_role_claims",
+]
+
+# Token metadata key under which role claims are stored
+TOKEN_METADATA_KEY = "rbac_role_claims"
+
+RoleClaims = namedtuple("RoleClaims", ["username", "role_names", "generation"])
+
+# Role claims which have been bound to the current context (request)
+_role_claims = contextvars.ContextVar("rbac_role_claims", default=None)
+
+
+def get_role_claims_from_token(token_db):
+    """
+    Retrieve role claims which are stored in the provided token metadata.
+
+    :return: Role claims or None if the token has no (valid) role claims.
+    :rtype: :class:`RoleClaims` or ``None``
+    """
+    metadata = getattr(token_db, "metadata", None) or {}
+    value = metadata.get(TOKEN_METADATA_KEY, None)
+
+    if not isinstance(value, dict):
+        return None
+
+    role_names = value.get("roles", None)
+    generation = value.get("generation", None)
+
+    if not isinstance(role_names, list) or not isinstance(generation, six.integer_types):
+        LOG.debug('Ignoring invalid role claims for token of user "%s"' % (token_db.user))
+        return None
+
+    return RoleClaims(
+        username=token_db.user, role_names=frozenset(role_names), generation=generation
+    )
+
+
+def store_role_claims_in_token(token_db, role_claims):
+    """
+    Store the provided role claims in the token metadata and persist the token.
+
+    :rtype: :class:`TokenDB`
+    """
+    metadata = dict(token_db.metadata or {})
+    metadata[TOKEN_METADATA_KEY] = {
+        "roles": sorted(role_claims.role_names),
+        "generation": role_claims.generation,
+    }
+
+    token_db.metadata = metadata
+    return Token.add_or_update(token_db)
+
+
+@contextlib.contextmanager
+def use_role_claims(role_claims):
+    """
+    Context manager which binds the provided role claims (e.g. claims from the token which has
+    been used to authenticate the current request) to the current context.
+    """
+    token = _role_claims.set(role_claims)
+
+    try:
+        yield role_claims
+    finally:
+        _role_claims.reset(token)
+
+
+def get_trusted_role_claims(username):
+    """
+    Return role claims for the provided user which can be trusted or None if there are no
+    claims bound for that user or the claims are stale.
+
+    Note: Claims are only trusted when generation checks are enabled and the generation the claims
+    have been computed at matches the current RBAC generation.
+
+    :rtype: :class:`RoleClaims` or ``None``
+    """
+    if not cfg.CONF.rbac.role_claims_enable:
+        return None
+
+    role_claims = _role_claims.get()
+
+    if role_claims is None or role_claims.username != username:
+        return None
+
+    generation = get_current_rbac_generation()
+
+    if generation is None or generation != role_claims.generation:
+        return None
+
+    return role_claims
@@ -0,0 +1,129 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing RBAC backend specific config options.
+
+Note: Common RBAC options (enable, backend, etc.) are registered by st2common. This module only
+registers additional options which are used by this backend. All the options live under the
+existing "rbac" group.
+"""
+
+from __future__ import absolute_import
+
+from oslo_config import cfg
+
+__all__ = ["register_opts"]
+
+
+def register_opts(ignore_errors=False):
+    rbac_opts = [
+        cfg.BoolOpt(
+            "permission_snapshot_enable",
+            default=False,
+            help="True to resolve permissions using an in-memory snapshot of all the roles, "
+            "role assignments and permission grants instead of querying the database on each "
+            "permission check.",
+        ),
+        cfg.IntOpt(
+            "permission_snapshot_ttl",
+            default=30,
+            help="How long (in seconds) an in-memory permission snapshot is used before it's "
+            "rebuilt from the database.",
+        ),
+        cfg.BoolOpt(
+            "permission_cache_enable",
+            default=False,
+            help="True to cache effective roles and permission grants for each user in memory.",
+        ),
+        cfg.IntOpt(
+            "permission_cache_ttl",
+            default=30,
+            help="How long (in seconds) cached user roles, permission grants and compiled "
+            "permission predicates are valid.",
+        ),
+        cfg.IntOpt(
+            "permission_cache_size",
+            default=1000,
+            help="Maximum number of users for which roles and permission grants are cached.",
+        ),
+        cfg.BoolOpt(
+            "permission_deny_cache_enable",
+            default=False,
+            help="True to cache denied resource permission checks in memory.",
+        ),
+        cfg.IntOpt(
+            "permission_deny_cache_ttl",
+            default=5,
+            help="How long (in seconds) cached denied permission checks are valid.",
+        ),
+        cfg.IntOpt(
+            "permission_deny_cache_size",
+            default=10000,
+            help="Maximum number of denied permission checks which are cached.",
+        ),
+        cfg.StrOpt(
+            "permission_grants_query_mode",
+            default="query",
+            choices=["query", "aggregate"],
+            help="How permission grants for a user are retrieved from the database. \"query\" "
+            "uses three sequential queries and \"aggregate\" uses a single aggregation pipeline "
+            "which reduces the number of database round trips (requires MongoDB >= 4.0).",
+        ),
+        cfg.BoolOpt(
+            "generation_check_enable",
+            default=False,
+            help="True to validate in-memory permission snapshot and caches against the global "
+            "RBAC generation counter which is incremented each time RBAC data is changed.",
+        ),
+        cfg.IntOpt(
+            "generation_check_interval",
+            default=1000,
+            help="How often (in milliseconds) the global RBAC generation counter is read from "
+            "the database. 0 means on every permission check.",
+        ),
+        cfg.BoolOpt(
+            "invalidation_events_enable",
+            default=False,
+            help="True to publish RBAC invalidation events on the message bus when RBAC data is "
+            "changed and to consume them in all the processes which use RBAC.",
+        ),
+        cfg.BoolOpt(
+            "permission_grant_patterns_enable",
+            default=False,
+            help='True to treat "*" and "?" characters in permission grant resource uids as '
+            "wildcards (e.g. action:examples:deploy_*).",
+        ),
+        cfg.BoolOpt(
+            "role_claims_enable",
+            default=False,
+            help="True to store user role claims (role names and the RBAC generation) in the auth "
+            "token metadata at login and to trust them for user role lookups while the RBAC "
+            "generation matches. Requires generation_check_enable.",
+        ),
+    ]
+
+    do_register_opts(rbac_opts, "rbac", ignore_errors)
+
+
+def do_register_opts(opts, group=None, ignore_errors=False):
+    try:
+        cfg.CONF.register_opts(opts, group=group)
+    except Exception:
+        if not ignore_errors:
+            raise
+
+
+register_opts(ignore_errors=True)
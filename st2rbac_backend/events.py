@@ -0,0 +1,263 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing RBAC change notification logic.
+
+Each change to RBAC data invalidates in-process caches, increments the global RBAC generation (when
+generation checks are enabled) and optionally publishes a compact invalidation event on the message
+bus so other StackStorm processes (st2api, st2stream, st2auth) can drop the affected cache entries.
+"""
+
+from __future__ import absolute_import
+
+import uuid
+import threading
+import contextlib
+import contextvars
+
+from kombu import Exchange
+from kombu import Queue
+from kombu.mixins import ConsumerMixin
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.transport import utils as transport_utils
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.cache import invalidate_permission_caches
+from st2rbac_backend.generation import increment_rbac_generation
+
+LOG = logging.getLogger(__name__)
+
+__all__ = [
+    "RBAC_EXCHANGE",
+    "RBACInvalidationPublisher",
+    "RBACInvalidationConsumer",
+    "notify_rbac_change",
+    "suppress_rbac_change_notifications",
+    "publish_rbac_invalidation",
+    "apply_rbac_invalidation",
+    "start_rbac_invalidation_listener",
+]
+
+RBAC_EXCHANGE = Exchange("st2.rbac", type="topic")
+
+# Routing keys for different invalidation scopes
+INVALIDATE_USER_ROUTING_KEY = "invalidate.user"
+INVALIDATE_ROLE_ROUTING_KEY = "invalidate.role"
+INVALIDATE_ALL_ROUTING_KEY = "invalidate.all"
+
+_publisher = None
+_publisher_lock = threading.Lock()
+_listener = None
+_listener_lock = threading.Lock()
+
+# Set while RBAC data is changed in bulk (e.g. by the definitions syncer) so changes made by the
+# individual service mutators don't each result in a notification
+_notifications_suppressed = contextvars.ContextVar(
+    "rbac_change_notifications_suppressed", default=False
+)
+
+
+class RBACInvalidationPublisher(object):
+    """
+    Publisher which publishes RBAC invalidation events.
+    """
+
+    def __init__(self, connection=None):
+        """
+        :param connection: Optional connection to use. If not provided, a connection is lazily
+                           established on first publish and re-used for subsequent publishes.
+        :type connection: :class:`kombu.Connection`
+        """
+        self._connection = connection
+        self._owns_connection = connection is None
+        self._producer = None
+        self._lock = threading.Lock()
+
+    def publish(self, username=None, role_name=None):
+        payload = {"username": username, "role_name": role_name}
+
+        if username:
+            routing_key = INVALIDATE_USER_ROUTING_KEY
+        elif role_name:
+            routing_key = INVALIDATE_ROLE_ROUTING_KEY
+        else:
+            routing_key = INVALIDATE_ALL_ROUTING_KEY
+
+        with self._lock:
+            try:
+                producer = self._get_producer()
+                producer.publish(
+                    payload,
+                    exchange=RBAC_EXCHANGE,
+                    routing_key=routing_key,
+                    declare=[RBAC_EXCHANGE],
+                )
+            except Exception:
+                # Connection is re-established on next publish
+                self._reset()
+                raise
+
+    def close(self):
+        with self._lock:
+            self._reset()
+
+    def _get_producer(self):
+        if self._connection is None:
+            self._connection = transport_utils.get_connection()
+
+        if self._producer is None:
+            self._producer = self._connection.Producer(serializer="json")
+
+        return self._producer
+
+    def _reset(self):
+        self._producer = None
+
+        if self._owns_connection and self._connection is not None:
+            try:
+                self._connection.release()
+            except Exception:
+                LOG.debug("Failed to release RBAC invalidation publisher connection", exc_info=True)
+
+            self._connection = None
+
+
+class RBACInvalidationConsumer(ConsumerMixin):
+    """
+    Consumer which applies RBAC invalidation events to the in-process caches.
+
+    Each process uses its own auto-delete queue so every process receives all the events.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.queue = Queue(
+            name="st2.rbac.invalidation.%s" % (uuid.uuid4().hex),
+            exchange=RBAC_EXCHANGE,
+            routing_key="invalidate.#",
+            auto_delete=True,
+        )
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self.queue], accept=["json"], callbacks=[self.process])]
+
+    def process(self, body, message):
+        try:
+            apply_rbac_invalidation(payload=body)
+        except Exception:
+            LOG.exception("Failed to process RBAC invalidation event: %s" % (body))
+        finally:
+            message.ack()
+
+
+def notify_rbac_change(username=None, role_name=None):
+    """
+    Notify all the interested parties that RBAC data has been changed.
+
+    :param username: Name of the user whose role assignments have been changed.
+    :type username: ``str``
+
+    :param role_name: Name of the role which has been changed.
+    :type role_name: ``str``
+    """
+    if _notifications_suppressed.get():
+        return
+
+    invalidate_permission_caches(username=username, role_name=role_name)
+
+    # Note: Generation is only read when generation checks (or role claims which depend on it)
+    # are enabled so there is no need to pay for a database write otherwise
+    if cfg.CONF.rbac.generation_check_enable or cfg.CONF.rbac.role_claims_enable:
+        increment_rbac_generation()
+
+    if cfg.CONF.rbac.invalidation_events_enable:
+        publish_rbac_invalidation(username=username, role_name=role_name)
+
+
+@contextlib.contextmanager
+def suppress_rbac_change_notifications():
+    """
+    Context manager which suppresses RBAC change notifications for the current context.
+
+    It should be used when changing RBAC data in bulk. Caller is responsible for calling
+    notify_rbac_change once all the changes have been made.
+    """
+    token = _notifications_suppressed.set(True)
+
+    try:
+        yield
+    finally:
+        _notifications_suppressed.reset(token)
+
+
+def publish_rbac_invalidation(username=None, role_name=None):
+    """
+    Publish RBAC invalidation event on the message bus.
+
+    Note: Failing to publish an event is not fatal since caches and compiled permission predicates
+    also expire based on TTL.
+    """
+    global _publisher
+
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = RBACInvalidationPublisher()
+
+    try:
+        _publisher.publish(username=username, role_name=role_name)
+    except Exception:
+        LOG.exception("Failed to publish RBAC invalidation event")
+
+
+def apply_rbac_invalidation(payload):
+    """
+    Apply RBAC invalidation event received from the message bus.
+
+    :param payload: Event payload.
+    :type payload: ``dict``
+    """
+    username = payload.get("username", None)
+    role_name = payload.get("role_name", None)
+
+    LOG.debug("Applying RBAC invalidation event (user=%s, role=%s)" % (username, role_name))
+    invalidate_permission_caches(username=username, role_name=role_name)
+
+
+def start_rbac_invalidation_listener(connection=None):
+    """
+    Start a background consumer which applies RBAC invalidation events to the in-process caches.
+
+    Note: Calling this function multiple times only starts a single consumer.
+
+    :rtype: :class:`RBACInvalidationConsumer`
+    """
+    global _listener
+
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        connection = connection or transport_utils.get_connection()
+        _listener = RBACInvalidationConsumer(connection=connection)
+
+        thread = threading.Thread(target=_listener.run, name="RBACInvalidationListener")
+        thread.daemon = True
+        thread.start()
+
+    return _listener
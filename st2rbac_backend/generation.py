@@ -0,0 +1,110 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing a global RBAC generation counter.
+
+The counter is atomically incremented each time RBAC data (roles, role assignments, permission
+grants) is changed. In-process caches record the generation they have been populated with and
+compare it to the current generation to cheaply determine if they are still fresh.
+"""
+
+from __future__ import absolute_import
+
+import time
+
+import mongoengine as me
+from mongoengine import NotUniqueError
+from oslo_config import cfg
+
+from st2common.models.db import stormbase
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+
+__all__ = [
+    "RBACGenerationDB",
+    "get_rbac_generation",
+    "get_current_rbac_generation",
+    "increment_rbac_generation",
+]
+
+# Name of the document which holds the counter
+RBAC_GENERATION_NAME = "rbac"
+
+# Last generation value which has been read from the database and the time it was read at
+_last_generation = None
+_last_generation_read_at = 0
+
+
+class RBACGenerationDB(stormbase.StormFoundationDB):
+    name = me.StringField(required=True, unique=True)
+    generation = me.IntField(required=True, default=0)
+
+
+def get_rbac_generation():
+    """
+    Retrieve the current RBAC generation from the database.
+
+    :rtype: ``int``
+    """
+    generation_db = RBACGenerationDB.objects(name=RBAC_GENERATION_NAME).only("generation").first()
+
+    if not generation_db:
+        return 0
+
+    return generation_db.generation
+
+
+def increment_rbac_generation():
+    """
+    Atomically increment the RBAC generation.
+
+    :return: New generation.
+    :rtype: ``int``
+    """
+    queryset = RBACGenerationDB.objects(name=RBAC_GENERATION_NAME)
+
+    try:
+        generation_db = queryset.modify(upsert=True, new=True, inc__generation=1)
+    except NotUniqueError:
+        # Document has been concurrently created by a different process
+        generation_db = queryset.modify(upsert=True, new=True, inc__generation=1)
+
+    return generation_db.generation
+
+
+def get_current_rbac_generation():
+    """
+    Return the current RBAC generation which should be used for validating in-process caches or
+    None if generation checks are disabled.
+
+    Note: The value is read from the database at most once per "generation_check_interval"
+    milliseconds.
+
+    :rtype: ``int`` or ``None``
+    """
+    global _last_generation, _last_generation_read_at
+
+    if not cfg.CONF.rbac.generation_check_enable:
+        return None
+
+    interval = cfg.CONF.rbac.generation_check_interval / 1000.0
+    now = time.monotonic()
+
+    if _last_generation is None or (now - _last_generation_read_at) >= interval:
+        _last_generation = get_rbac_generation()
+        _last_generation_read_at = now
+
+    return _last_generation
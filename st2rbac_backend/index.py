@@ -0,0 +1,201 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing an inverted permission grants index which answers "which users / roles have
+been granted a permission on this resource" questions (e.g. for fan-out of st2stream events,
+notifications and inquiry approvers).
+"""
+
+from __future__ import absolute_import
+
+import re
+from collections import defaultdict
+
+from st2rbac_backend.patterns import is_resource_uid_pattern
+from st2rbac_backend.patterns import resource_uid_pattern_to_regex
+from st2rbac_backend.permissions import get_permission_types_mask
+
+__all__ = ["PermissionGrantsInvertedIndex"]
+
+
+class PermissionGrantsInvertedIndex(object):
+    """
+    Immutable index which maps (resource_type, resource_uid, permission_type) to a set of role
+    names and a set of usernames which have been granted that permission.
+
+    Global grants (grants which are not tied to a particular resource) are indexed under None
+    resource uid. System roles have no grants so their members are indexed separately by role
+    name.
+    """
+
+    def __init__(self, role_permission_grants, user_role_names):
+        """
+        :param role_permission_grants: Map of role name to permission grants of that role.
+        :type role_permission_grants: ``dict``
+
+        :param user_role_names: Map of username to names of the roles assigned to that user.
+        :type user_role_names: ``dict``
+        """
+        role_usernames = defaultdict(set)
+        for username, role_names in user_role_names.items():
+            for role_name in role_names:
+                role_usernames[role_name].add(username)
+
+        self._role_usernames = dict(
+            [(role_name, frozenset(usernames)) for role_name, usernames in role_usernames.items()]
+        )
+
+        grant_role_names = defaultdict(set)
+
+        # Maps resource type to a map of resource uid pattern to a list of (permission types mask,
+        # role name) tuples
+        pattern_grants = defaultdict(lambda: defaultdict(list))
+
+        for role_name, permission_grant_dbs in role_permission_grants.items():
+            for permission_grant_db in permission_grant_dbs:
+                resource_type = permission_grant_db.resource_type
+                resource_uid = permission_grant_db.resource_uid or None
+                permission_types = permission_grant_db.permission_types or []
+
+                for permission_type in permission_types:
+                    grant_role_names[(resource_type, resource_uid, permission_type)].add(role_name)
+
+                if is_resource_uid_pattern(resource_uid):
+                    permission_types_mask = get_permission_types_mask(permission_types)
+                    pattern_grants[resource_type][resource_uid].append(
+                        (permission_types_mask, role_name)
+                    )
+
+        # Maps resource type to a (combined regex, list of (regex, role grants) tuples) tuple.
+        # Combined regex of all the patterns for a resource type is matched first so resources
+        # which match no pattern are rejected with a single regex match.
+        self._pattern_grants = {}
+
+        for resource_type, role_grants_by_pattern in pattern_grants.items():
+            grants = []
+            regexes = []
+
+            for resource_uid_pattern in sorted(role_grants_by_pattern.keys()):
+                regex = resource_uid_pattern_to_regex(resource_uid_pattern)
+                grants.append((re.compile(regex), role_grants_by_pattern[resource_uid_pattern]))
+                regexes.append("(?:%s)" % (regex))
+
+            combined_regex = re.compile("|".join(regexes))
+            self._pattern_grants[resource_type] = (combined_regex, grants)
+
+        self._grant_role_names = {}
+        self._grant_usernames = {}
+
+        for key, role_names in grant_role_names.items():
+            usernames = set([])
+            for role_name in role_names:
+                usernames.update(self._role_usernames.get(role_name, ()))
+
+            self._grant_role_names[key] = frozenset(role_names)
+            self._grant_usernames[key] = frozenset(usernames)
+
+    def get_role_names(self, resources, permission_types, match_patterns=False):
+        """
+        Return names of the roles which have been granted one of the provided permission types on
+        one of the provided resources.
+
+        :param resources: List of (resource_uid, resource_type) tuples. None resource uid refers
+                          to global grants.
+        :type resources: ``list`` of ``tuple``
+
+        :param match_patterns: True to also include roles with matching pattern grants.
+        :type match_patterns: ``bool``
+
+        :rtype: ``set`` of ``str``
+        """
+        result = set([])
+
+        for resource_uid, resource_type in resources:
+            for permission_type in permission_types:
+                key = (resource_type, resource_uid or None, permission_type)
+                result.update(self._grant_role_names.get(key, ()))
+
+        if match_patterns and self._pattern_grants:
+            result.update(
+                self._get_pattern_grant_role_names(
+                    resources=resources, permission_types=permission_types
+                )
+            )
+
+        return result
+
+    def get_usernames(
+        self, resources, permission_types, system_role_names=None, match_patterns=False
+    ):
+        """
+        Return names of the users which have been granted one of the provided permission types on
+        one of the provided resources.
+
+        :param system_role_names: Names of the system roles whose members should also be included
+                                  (e.g. admin and observer roles for "view" permissions).
+        :type system_role_names: ``list`` of ``str``
+
+        :rtype: ``set`` of ``str``
+        """
+        result = set([])
+
+        for resource_uid, resource_type in resources:
+            for permission_type in permission_types:
+                key = (resource_type, resource_uid or None, permission_type)
+                result.update(self._grant_usernames.get(key, ()))
+
+        role_names = list(system_role_names or [])
+
+        if match_patterns and self._pattern_grants:
+            role_names.extend(
+                self._get_pattern_grant_role_names(
+                    resources=resources, permission_types=permission_types
+                )
+            )
+
+        for role_name in role_names:
+            result.update(self._role_usernames.get(role_name, ()))
+
+        return result
+
+    def get_usernames_for_role(self, role_name):
+        """
+        :rtype: ``frozenset`` of ``str``
+        """
+        return self._role_usernames.get(role_name, frozenset())
+
+    def _get_pattern_grant_role_names(self, resources, permission_types):
+        result = set([])
+        permission_types_mask = get_permission_types_mask(permission_types)
+
+        for resource_uid, resource_type in resources:
+            if not resource_uid or resource_type not in self._pattern_grants:
+                continue
+
+            combined_regex, grants = self._pattern_grants[resource_type]
+
+            if not combined_regex.match(resource_uid):
+                continue
+
+            for regex, role_grants in grants:
+                if not regex.match(resource_uid):
+                    continue
+
+                for grant_permission_types_mask, role_name in role_grants:
+                    if grant_permission_types_mask & permission_types_mask:
+                        result.add(role_name)
+
+        return result
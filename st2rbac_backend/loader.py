@@ -23,6 +23,7 @@ import os
 import glob
 import functools
 
+import six
 from oslo_config import cfg
 
 from st2common import log as logging
@@ -30,11 +31,20 @@ from st2common.content.loader import MetaLoader
 from st2common.models.api.rbac import RoleDefinitionFileFormatAPI
 from st2common.models.api.rbac import UserRoleAssignmentFileFormatAPI
 from st2common.models.api.rbac import AuthGroupToRoleMapAssignmentFileFormatAPI
+from st2common.rbac.types import SystemRole
 from st2common.util.misc import compare_path_file_name
 
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.patterns import is_resource_uid_pattern
+from st2rbac_backend.patterns import validate_resource_uid_pattern
+
 LOG = logging.getLogger(__name__)
 
-__all__ = ["RBACDefinitionsLoader"]
+__all__ = ["RBACDefinitionsLoader", "get_role_definitions_in_inheritance_order"]
+
+# Role inheritance graph traversal states
+VISITING = "visiting"
+VISITED = "visited"
 
 
 class RBACDefinitionsLoader(object):
@@ -89,6 +99,9 @@ class RBACDefinitionsLoader(object):
 
             result[role_name] = role_definition_api
 
+        # Make sure all the extended roles exist and there are no inheritance cycles
+        get_role_definitions_in_inheritance_order(role_definition_apis=list(result.values()))
+
         return result
 
     def load_user_role_assignments(self):
@@ -155,8 +168,27 @@ class RBACDefinitionsLoader(object):
             msg = 'Role definition file "%s" is empty and invalid' % file_path
             raise ValueError(msg)
 
+        # Note: "extends" is not part of the role definition API schema so we handle it here
+        content = dict(content)
+        extends = content.pop("extends", [])
+
+        if isinstance(extends, six.string_types):
+            extends = [extends]
+
+        if not isinstance(extends, list) or not all(
+            [isinstance(role_name, six.string_types) for role_name in extends]
+        ):
+            msg = 'Role definition file "%s" is invalid: "extends" needs to be a list of role names'
+            raise ValueError(msg % (file_path))
+
         role_definition_api = RoleDefinitionFileFormatAPI(**content)
         role_definition_api = role_definition_api.validate()
+        role_definition_api.extends = extends
+
+        if cfg.CONF.rbac.permission_grant_patterns_enable:
+            self._validate_permission_grant_patterns(
+                role_definition_api=role_definition_api, file_path=file_path
+            )
 
         return role_definition_api
 
@@ -195,6 +227,26 @@ class RBACDefinitionsLoader(object):
 
         return group_to_role_map_api
 
+    def _validate_permission_grant_patterns(self, role_definition_api, file_path):
+        """
+        Validate resource uid patterns in the provided role definition.
+
+        :raises: ValueError
+        """
+        permission_grants = getattr(role_definition_api, "permission_grants", [])
+
+        for permission_grant in permission_grants:
+            resource_uid = permission_grant.get("resource_uid", None)
+
+            if not is_resource_uid_pattern(resource_uid):
+                continue
+
+            try:
+                validate_resource_uid_pattern(resource_uid=resource_uid)
+            except ValueError as e:
+                msg = 'Role definition file "%s" is invalid: %s' % (file_path, six.text_type(e))
+                raise ValueError(msg)
+
     def _get_role_definitions_file_paths(self):
         """
         Retrieve a list of paths for all the role definitions.
@@ -231,3 +283,71 @@ class RBACDefinitionsLoader(object):
         file_paths = glob.glob(glob_str)
         file_paths = sorted(file_paths, key=functools.cmp_to_key(compare_path_file_name))
         return file_paths
+
+
+def get_role_definitions_in_inheritance_order(role_definition_apis):
+    """
+    Return role definitions sorted so that each role comes after all the roles it extends.
+
+    Roles are sorted using an iterative depth first search which also detects inheritance cycles
+    in O(V + E) time.
+
+    :param role_definition_apis: Role definitions to sort.
+    :type role_definition_apis: ``list`` of :class:`RoleDefinitionFileFormatAPI`
+
+    :rtype: ``list`` of :class:`RoleDefinitionFileFormatAPI`
+
+    :raises: ValueError if a role extends a role which doesn't exist or if there is a cycle.
+    """
+    role_definition_apis_map = dict([(api.name, api) for api in role_definition_apis])
+
+    result = []
+    states = {}
+
+    for role_definition_api in role_definition_apis:
+        if role_definition_api.name in states:
+            continue
+
+        states[role_definition_api.name] = VISITING
+
+        # Stack of (role definition, iterator over the extended role names) tuples
+        stack = [(role_definition_api, iter(_get_extended_role_names(role_definition_api)))]
+
+        while stack:
+            current_api, extended_role_names = stack[-1]
+            extended_role_name = next(extended_role_names, None)
+
+            if extended_role_name is None:
+                stack.pop()
+                states[current_api.name] = VISITED
+                result.append(current_api)
+                continue
+
+            state = states.get(extended_role_name, None)
+
+            if state == VISITED:
+                continue
+
+            if state == VISITING:
+                cycle = [entry[0].name for entry in stack]
+                cycle = cycle[cycle.index(extended_role_name) :] + [extended_role_name]
+                raise ValueError("Role inheritance cycle detected: %s" % (" -> ".join(cycle)))
+
+            if extended_role_name in SystemRole.get_valid_values():
+                msg = 'Role "%s" extends system role "%s", system roles can\'t be extended'
+                raise ValueError(msg % (current_api.name, extended_role_name))
+
+            extended_api = role_definition_apis_map.get(extended_role_name, None)
+
+            if not extended_api:
+                msg = 'Role "%s" extends role "%s" which doesn\'t exist or is disabled'
+                raise ValueError(msg % (current_api.name, extended_role_name))
+
+            states[extended_role_name] = VISITING
+            stack.append((extended_api, iter(_get_extended_role_names(extended_api))))
+
+    return result
+
+
+def _get_extended_role_names(role_definition_api):
+    return getattr(role_definition_api, "extends", None) or []
@@ -0,0 +1,240 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing support for resource UID pattern (glob) permission grants.
+
+Pattern grants use "*" (any sequence of characters) and "?" (any single character) wildcards in
+the resource UID, e.g. "action:examples:deploy_*" or "key_value_pair:st2kv.system:app1:*".
+
+Pattern grants are compiled into a single combined regular expression per (resource type,
+permission types) group so matching cost doesn't depend on the number of patterns.
+"""
+
+from __future__ import absolute_import
+
+import re
+
+from oslo_config import cfg
+
+from st2common.models.db.stormbase import UIDFieldMixin
+from st2common.rbac.types import ResourceType
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.cache import LRUCache
+from st2rbac_backend.permissions import get_permission_types_mask
+
+__all__ = [
+    "PermissionGrantPatternsMatcher",
+    "is_resource_uid_pattern",
+    "validate_resource_uid_pattern",
+    "resource_uid_pattern_to_regex",
+    "compile_permission_grant_patterns",
+    "get_permission_grant_patterns_matcher",
+]
+
+PATTERN_CHARACTERS = ("*", "?")
+
+# Maximum number of compiled matchers which are kept in memory
+PATTERNS_MATCHERS_CACHE_SIZE = 1000
+
+# Note: Matchers are keyed by permission grant ids and permission grants are never modified in
+# place so entries never go stale and don't need to expire
+PATTERNS_MATCHERS_CACHE_TTL = float("inf")
+
+_MISSING = object()
+
+_matchers_cache = LRUCache(max_size=PATTERNS_MATCHERS_CACHE_SIZE, ttl=PATTERNS_MATCHERS_CACHE_TTL)
+
+
+class PermissionGrantPatternsMatcher(object):
+    """
+    Matcher which matches resource UIDs against a set of pattern permission grants.
+    """
+
+    def __init__(self, permission_grant_dbs):
+        patterns = {}
+
+        # Maps resource type to a list of resource uid patterns
+        self._resource_uid_patterns = {}
+
+        for permission_grant_db in permission_grant_dbs:
+            permission_types_mask = get_permission_types_mask(permission_grant_db.permission_types)
+
+            if not permission_types_mask:
+                continue
+
+            resource_type = permission_grant_db.resource_type
+            resource_uid = permission_grant_db.resource_uid
+
+            key = (resource_type, permission_types_mask)
+            patterns.setdefault(key, []).append(resource_uid_pattern_to_regex(resource_uid))
+
+            self._resource_uid_patterns.setdefault(resource_type, []).append(resource_uid)
+
+        # List of (resource_type, permission types mask, compiled regex) tuples
+        self._groups = []
+
+        for (resource_type, permission_types_mask), regexes in patterns.items():
+            regex = re.compile("|".join(["(?:%s)" % (regex) for regex in regexes]))
+            self._groups.append((resource_type, permission_types_mask, regex))
+
+    def matches(self, resource_uid, resource_types=None, permission_types=None):
+        """
+        Return True if any of the pattern grants matches the provided resource UID and filters.
+
+        :rtype: ``bool``
+        """
+        permission_types_mask = get_permission_types_mask(permission_types)
+
+        for resource_type, grant_permission_types_mask, regex in self._groups:
+            if resource_types and resource_type not in resource_types:
+                continue
+
+            if permission_types_mask and not grant_permission_types_mask & permission_types_mask:
+                continue
+
+            if regex.match(resource_uid):
+                return True
+
+        return False
+
+    def get_resource_uid_patterns(self, resource_type):
+        """
+        Return resource uid patterns for the provided resource type.
+
+        :rtype: ``list`` of ``str``
+        """
+        return self._resource_uid_patterns.get(resource_type, [])
+
+    def __bool__(self):
+        return bool(self._groups)
+
+
+def is_resource_uid_pattern(resource_uid):
+    """
+    Return True if the provided resource UID is a pattern.
+
+    :rtype: ``bool``
+    """
+    if not resource_uid:
+        return False
+
+    for character in PATTERN_CHARACTERS:
+        if character in resource_uid:
+            return True
+
+    return False
+
+
+def validate_resource_uid_pattern(resource_uid, resource_type=None):
+    """
+    Validate the provided resource UID pattern.
+
+    Resource type part of the UID needs to be a literal valid resource type and at least one
+    character needs to follow it.
+
+    :raises: ValueError
+    """
+    resource_uid_type, separator, rest = resource_uid.partition(UIDFieldMixin.UID_SEPARATOR)
+
+    if is_resource_uid_pattern(resource_uid_type):
+        raise ValueError(
+            'Invalid resource uid pattern "%s": resource type can\'t contain wildcards'
+            % (resource_uid)
+        )
+
+    if resource_uid_type not in ResourceType.get_valid_values():
+        raise ValueError(
+            'Invalid resource uid pattern "%s": invalid resource type "%s"'
+            % (resource_uid, resource_uid_type)
+        )
+
+    if resource_type and resource_uid_type != resource_type:
+        raise ValueError(
+            'Invalid resource uid pattern "%s": resource type doesn\'t match "%s"'
+            % (resource_uid, resource_type)
+        )
+
+    if not separator or not rest:
+        raise ValueError(
+            'Invalid resource uid pattern "%s": pattern is missing resource identifier'
+            % (resource_uid)
+        )
+
+
+def resource_uid_pattern_to_regex(resource_uid):
+    """
+    Translate resource UID pattern to a regular expression which matches the whole UID.
+
+    Note: The result is also valid for MongoDB $regex queries.
+
+    :rtype: ``str``
+    """
+    result = []
+
+    for character in resource_uid:
+        if character == "*":
+            result.append(".*")
+        elif character == "?":
+            result.append(".")
+        else:
+            result.append(re.escape(character))
+
+    return "^%s$" % ("".join(result))
+
+
+def compile_permission_grant_patterns(permission_grant_dbs):
+    """
+    Compile pattern grants in the provided list of permission grants.
+
+    :return: Compiled matcher or None if there are no pattern grants.
+    :rtype: :class:`PermissionGrantPatternsMatcher` or ``None``
+    """
+    pattern_grant_dbs = [
+        permission_grant_db
+        for permission_grant_db in permission_grant_dbs
+        if is_resource_uid_pattern(permission_grant_db.resource_uid)
+    ]
+
+    if not pattern_grant_dbs:
+        return None
+
+    return PermissionGrantPatternsMatcher(permission_grant_dbs=pattern_grant_dbs)
+
+
+def get_permission_grant_patterns_matcher(cache_key, get_permission_grant_dbs):
+    """
+    Return compiled pattern grants matcher for the provided key (e.g. ids of the role permission
+    grants), compiling it on a cache miss.
+
+    :param get_permission_grant_dbs: Function which returns permission grants to compile. It's
+                                     only called on a cache miss.
+    :type get_permission_grant_dbs: ``callable``
+
+    :return: Compiled matcher or None if pattern grants are disabled or there are no pattern
+             grants.
+    :rtype: :class:`PermissionGrantPatternsMatcher` or ``None``
+    """
+    if not cfg.CONF.rbac.permission_grant_patterns_enable:
+        return None
+
+    matcher = _matchers_cache.get(cache_key, _MISSING)
+
+    if matcher is _MISSING:
+        matcher = compile_permission_grant_patterns(get_permission_grant_dbs())
+        _matchers_cache.set(cache_key, matcher)
+
+    return matcher
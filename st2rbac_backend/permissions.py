@@ -0,0 +1,162 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing precomputed permission type bitmask and implication tables.
+
+Each permission type is assigned a bit position so a set of permission types can be represented
+as a single integer mask and a "does any of those grant this permission" check becomes a single
+bitwise AND.
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import RESOURCE_TYPE_TO_PERMISSION_TYPES_MAP
+
+__all__ = [
+    "PermissionImplications",
+    "get_permission_type_bit",
+    "get_permission_types_mask",
+]
+
+# Maps permission type to a bit
+_PERMISSION_TYPE_BITS = {}
+_PERMISSION_TYPE_BITS_LOCK = threading.Lock()
+
+# Maps a tuple of permission types to a mask
+_PERMISSION_TYPES_MASKS = {}
+
+
+def get_permission_type_bit(permission_type):
+    """
+    Return bit which represents the provided permission type.
+
+    Note: Bits for permission types which are not known at import time (e.g. permission types for
+    third party resource types) are allocated on first use.
+
+    :rtype: ``int``
+    """
+    bit = _PERMISSION_TYPE_BITS.get(permission_type, None)
+
+    if bit is None:
+        with _PERMISSION_TYPE_BITS_LOCK:
+            bit = _PERMISSION_TYPE_BITS.get(permission_type, None)
+
+            if bit is None:
+                bit = 1 << len(_PERMISSION_TYPE_BITS)
+                _PERMISSION_TYPE_BITS[permission_type] = bit
+
+    return bit
+
+
+def get_permission_types_mask(permission_types):
+    """
+    Return mask which represents the provided permission types.
+
+    :param permission_types: Permission types.
+    :type permission_types: ``tuple`` or ``list``
+
+    :rtype: ``int``
+    """
+    if not permission_types:
+        return 0
+
+    key = tuple(permission_types)
+    mask = _PERMISSION_TYPES_MASKS.get(key, None)
+
+    if mask is None:
+        mask = 0
+        for permission_type in key:
+            mask |= get_permission_type_bit(permission_type)
+
+        _PERMISSION_TYPES_MASKS[key] = mask
+
+    return mask
+
+
+class PermissionImplications(object):
+    """
+    Precomputed table of permission types which grant / imply a particular permission type for a
+    single resource type.
+
+    - "all" permission type implies all the other permission types
+    - "view" permission type is also implied by the provided view grant permission types (e.g.
+      "create", "modify", "delete")
+    """
+
+    def __init__(self, resource_type, view_grant_permission_types=None):
+        self.resource_type = resource_type
+
+        self._view_permission_type = PermissionType.get_permission_type(
+            resource_type=resource_type, permission_name="view"
+        )
+        self._all_permission_type = PermissionType.get_permission_type(
+            resource_type=resource_type, permission_name="all"
+        )
+        self._view_grant_permission_types = tuple(view_grant_permission_types or [])
+
+        # Maps permission type to a tuple of permission types which grant it
+        self._implied_by = {}
+
+        for permission_type in RESOURCE_TYPE_TO_PERMISSION_TYPES_MAP.get(resource_type, []):
+            self._implied_by[permission_type] = self._compute_implied_by(permission_type)
+
+        # Maps permission type to a mask of permission types which grant it
+        self._implied_by_masks = {}
+
+        for permission_type, implied_by in self._implied_by.items():
+            self._implied_by_masks[permission_type] = get_permission_types_mask(implied_by)
+
+    def get_implied_by_permission_types(self, permission_type):
+        """
+        Return permission types which grant the provided permission type.
+
+        :rtype: ``tuple``
+        """
+        implied_by = self._implied_by.get(permission_type, None)
+
+        if implied_by is None:
+            implied_by = self._compute_implied_by(permission_type)
+
+        return implied_by
+
+    def get_implied_by_mask(self, permission_type):
+        """
+        Return mask of permission types which grant the provided permission type.
+
+        :rtype: ``int``
+        """
+        mask = self._implied_by_masks.get(permission_type, None)
+
+        if mask is None:
+            mask = get_permission_types_mask(self.get_implied_by_permission_types(permission_type))
+
+        return mask
+
+    def _compute_implied_by(self, permission_type):
+        if permission_type == self._view_permission_type:
+            return self._view_grant_permission_types + (permission_type,)
+        elif permission_type != self._all_permission_type:
+            return (self._all_permission_type, permission_type)
+
+        return (permission_type,)
+
+
+# Assign bits to all the known permission types upfront so the assignment is stable
+for _permission_type in sorted(PermissionType.get_valid_values()):
+    get_permission_type_bit(_permission_type)
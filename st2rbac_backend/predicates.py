@@ -0,0 +1,125 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing compiled permission predicates.
+
+A predicate is compiled once for a particular user (e.g. when a st2stream connection is opened)
+and then evaluated for each event which is sent over that connection. Evaluating a predicate
+doesn't access the database, it's only recompiled when RBAC data changes or when it's older than
+``permission_cache_ttl`` seconds.
+
+Changes made by other processes (e.g. st2-apply-rbac-definitions) are only picked up before the
+predicate expires if ``invalidation_events_enable`` or ``generation_check_enable`` is set.
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+
+from oslo_config import cfg
+
+from st2common import log as logging
+
+from st2rbac_backend.cache import get_permission_caches_version
+from st2rbac_backend.resolvers import get_resolver_for_permission_type
+
+LOG = logging.getLogger(__name__)
+
+__all__ = ["ResourcePermissionPredicate"]
+
+
+class ResourcePermissionPredicate(object):
+    """
+    Compiled, self refreshing predicate which returns True if the user has the provided
+    permission on a resource.
+
+    Example usage:
+
+        predicate = ResourcePermissionPredicate(user_db, PermissionType.EXECUTION_VIEW)
+
+        for execution in events:
+            if predicate(execution):
+                send(execution)
+    """
+
+    def __init__(self, user_db, permission_type):
+        """
+        :param user_db: User to compile the predicate for.
+        :type user_db: :class:`UserDB`
+
+        :param permission_type: Permission type to check.
+        :type permission_type: ``str``
+        """
+        self.user_db = user_db
+        self.permission_type = permission_type
+
+        self._resolver = get_resolver_for_permission_type(permission_type=permission_type)
+        self._lock = threading.Lock()
+        self._predicate = None
+        self._version = None
+        self._compiled_at = None
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        Recompile the predicate using the current RBAC data.
+        """
+        with self._lock:
+            # Note: Version is retrieved before compiling so changes which happen while compiling
+            # cause another refresh on the next call
+            version = get_permission_caches_version()
+
+            if not cfg.CONF.rbac.enable:
+                predicate = _allow_all
+            else:
+                predicate = self._resolver.get_resource_db_permission_predicate(
+                    user_db=self.user_db, permission_type=self.permission_type
+                )
+
+            self._predicate = predicate
+            self._version = version
+            self._compiled_at = time.monotonic()
+
+        LOG.debug(
+            'Compiled "%s" permission predicate for user "%s"'
+            % (self.permission_type, self.user_db.name)
+        )
+
+    def is_stale(self):
+        """
+        Return True if RBAC data has been changed since the predicate has been compiled or if the
+        predicate has expired.
+
+        :rtype: ``bool``
+        """
+        if self._version != get_permission_caches_version():
+            return True
+
+        # Note: Changes made by other processes are not visible to this process unless
+        # invalidation events or generation checks are enabled so predicates also expire
+        return self._compiled_at + cfg.CONF.rbac.permission_cache_ttl <= time.monotonic()
+
+    def __call__(self, resource_db):
+        if self.is_stale():
+            self.refresh()
+
+        return self._predicate(resource_db)
+
+
+def _allow_all(resource_db):
+    return True
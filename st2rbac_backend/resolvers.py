@@ -22,15 +22,28 @@ from __future__ import absolute_import
 import sys
 import logging as stdlib_logging
 
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from mongoengine.queryset.visitor import Q
+
 from st2common import log as logging
-from st2common.models.db.pack import PackDB
-from st2common.models.db.webhook import WebhookDB
 from st2common.models.system.common import ResourceReference
 from st2common.constants.keyvalue import FULL_SYSTEM_SCOPE, FULL_USER_SCOPE
 from st2common.constants.triggers import WEBHOOK_TRIGGER_TYPE
-from st2common.persistence.execution import ActionExecution
+from st2common.models.db.execution import ActionExecutionDB
+from st2common.util.uid import parse_uid
 from st2common.rbac.backends.base import BaseRBACPermissionResolver
+from st2rbac_backend.cache import LRUCache
+from st2rbac_backend.cache import get_permission_deny_cache
+from st2rbac_backend.permissions import PermissionImplications
+from st2rbac_backend.permissions import get_permission_types_mask
+from st2rbac_backend.patterns import is_resource_uid_pattern
+from st2rbac_backend.patterns import resource_uid_pattern_to_regex
+from st2rbac_backend.patterns import get_permission_grant_patterns_matcher
+from st2rbac_backend.scope import request_scope
 from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.uid import get_pack_uid
+from st2rbac_backend.uid import get_webhook_uid
 from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
 from st2common.rbac.types import SystemRole
@@ -53,6 +66,7 @@ __all__ = [
     "TriggerPermissionsResolver",
     "StreamPermissionsResolver",
     "InquiryPermissionsResolver",
+    "register_resolver",
     "get_resolver_for_resource_type",
     "get_resolver_for_permission_type",
 ]
@@ -60,6 +74,10 @@ __all__ = [
 # "Read" permission names which are granted to observer role by default
 READ_PERMISSION_NAMES = ["view", "list", "search"]
 
+# Size and TTL (in seconds) of the inquiry parent workflow execution lookup cache
+INQUIRY_PARENT_CACHE_SIZE = 1000
+INQUIRY_PARENT_CACHE_TTL = 600
+
 
 class PermissionsResolver(BaseRBACPermissionResolver):
     """
@@ -71,6 +89,9 @@ class PermissionsResolver(BaseRBACPermissionResolver):
 
     resource_type = None  # Constant for the resource type this resolver refers to
 
+    # True if grants on the resource parent pack also apply to the resource
+    pack_permission_grants_apply = False
+
     def user_has_permission(self, user_db, permission_type):
         """
         Method for checking user permissions which are not tied to a particular resource.
@@ -91,6 +112,110 @@ class PermissionsResolver(BaseRBACPermissionResolver):
         """
         raise NotImplementedError()
 
+    def filter_resource_dbs_by_permission(self, user_db, resource_dbs, permission_type):
+        """
+        Method for filtering a list of existing resources (e.g. results of a list operation) to
+        the ones on which the user has the provided permission.
+
+        Default implementation checks each resource separately inside a request scope which means
+        user roles and permission grants are only retrieved once for the whole batch.
+
+        :rtype: ``list``
+        """
+        with request_scope():
+            return [
+                resource_db
+                for resource_db in resource_dbs
+                if self.user_has_resource_db_permission(
+                    user_db=user_db, resource_db=resource_db, permission_type=permission_type
+                )
+            ]
+
+    def get_resource_db_permission_predicate(self, user_db, permission_type):
+        """
+        Method which compiles user permissions into a predicate function. The predicate is called
+        with a resource database object (or a dict with the same fields) and returns True if the
+        user has the provided permission on that resource.
+
+        Predicates are meant to be compiled once and evaluated many times (e.g. for each event
+        which is sent to a st2stream subscriber). Resolvers which override this method return
+        predicates which don't access the database. Default implementation falls back to
+        user_has_resource_db_permission.
+
+        :rtype: ``callable``
+        """
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return _allow_all
+
+        def predicate(resource_db):
+            return self.user_has_resource_db_permission(
+                user_db=user_db, resource_db=resource_db, permission_type=permission_type
+            )
+
+        return predicate
+
+    def get_usernames_with_resource_db_permission(self, resource_db, permission_type):
+        """
+        Method which returns names of the users which have the provided permission on the provided
+        resource (inverse of user_has_resource_db_permission, used for fan-out such as st2stream
+        event delivery and notifications).
+
+        Default implementation returns members of the system roles which have the permission and
+        users which have been granted one of the permission types returned by
+        _get_permission_grant_lookups on one of the corresponding resources (by default the
+        resource itself and the resource parent pack if pack grants apply to the resource).
+
+        :rtype: ``set`` of ``str``
+        """
+        system_role_names = self._get_system_role_names_with_permission(permission_type)
+        lookups = self._get_permission_grant_lookups(
+            resource_db=resource_db, permission_type=permission_type
+        )
+
+        result = set([])
+
+        for resources, permission_types in lookups:
+            result.update(
+                rbac_service.get_usernames_for_resources(
+                    resources=resources,
+                    permission_types=permission_types,
+                    system_role_names=system_role_names,
+                )
+            )
+
+        return result
+
+    def get_permission_query_filter(self, user_db, permission_type):
+        """
+        Method which returns a database query filter which limits a list query to the resources on
+        which the user has the provided permission.
+
+        This allows callers to push RBAC filtering into the database query instead of filtering
+        the results in Python (which also makes pagination work correctly).
+
+        Default implementation only takes system roles into account and returns a filter which
+        matches no resources for other users. Resolvers which support query filtering for custom
+        roles (e.g. pack content and execution resolvers) override it. For other resource types,
+        callers which need custom role grants to be taken into account should use
+        filter_resource_dbs_by_permission instead.
+
+        :return: Query filter or None if user has access to all the resources and no filtering is
+                 needed.
+        :rtype: :class:`mongoengine.queryset.visitor.Q` or ``None``
+        """
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return None
+
+        return Q(id__in=[])
+
     def _user_has_list_permission(self, user_db, permission_type):
         """
         Common method for checking if a user has specific "list" resource permission (e.g.
@@ -104,11 +229,14 @@ class PermissionsResolver(BaseRBACPermissionResolver):
         Custom method for checking if user has a particular global permission which doesn't apply
         to a specific resource but it's system-wide aka global permission.
         """
-        log_context = {
-            "user_db": user_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user permissions", extra=log_context)
 
         # First check the system role permissions
@@ -124,10 +252,10 @@ class PermissionsResolver(BaseRBACPermissionResolver):
         permission_types = [permission_type]
 
         # Check direct grants
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db, permission_types=permission_types
         )
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a direct grant", extra=log_context)
             return True
 
@@ -140,23 +268,64 @@ class PermissionsResolver(BaseRBACPermissionResolver):
 
         :rtype: ``bool``
         """
-        permission_name = PermissionType.get_permission_name(permission_type)
+        user_role_set = rbac_service.get_role_set_for_user(user_db=user_db)
 
-        user_role_dbs = rbac_service.get_roles_for_user(user_db=user_db)
-        user_role_names = [role_db.name for role_db in user_role_dbs]
-
-        if SystemRole.SYSTEM_ADMIN in user_role_names:
-            # System admin has all the permissions
-            return True
-        elif SystemRole.ADMIN in user_role_names:
-            # Admin has all the permissions
+        if user_role_set.is_admin:
+            # System admin and admin have all the permissions
             return True
-        elif SystemRole.OBSERVER in user_role_names and permission_name in READ_PERMISSION_NAMES:
+        elif user_role_set.is_observer:
             # Observer role has "view" permission on all the resources
-            return True
+            permission_name = PermissionType.get_permission_name(permission_type)
+            return permission_name in READ_PERMISSION_NAMES
 
         return False
 
+    def _get_system_role_names_with_permission(self, permission_type):
+        """
+        Return names of the system roles which have the provided permission (same rules as in
+        _user_has_system_role_permission).
+
+        :rtype: ``list`` of ``str``
+        """
+        role_names = [SystemRole.SYSTEM_ADMIN, SystemRole.ADMIN]
+
+        if PermissionType.get_permission_name(permission_type) in READ_PERMISSION_NAMES:
+            role_names.append(SystemRole.OBSERVER)
+
+        return role_names
+
+    def _get_permission_grant_lookups(self, resource_db, permission_type):
+        """
+        Return a list of (resources, permission types) tuples. User has the provided permission on
+        the provided resource if they have been granted one of the permission types on one of the
+        resources from any of the tuples.
+
+        :rtype: ``list`` of ``tuple``
+        """
+        resources = [(resource_db.get_uid(), self.resource_type)]
+
+        if self.pack_permission_grants_apply:
+            resources.append((get_pack_uid(pack_ref=resource_db.pack), ResourceType.PACK))
+
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        return [(resources, permission_types)]
+
+    def _get_grant_permission_types(self, permission_type):
+        """
+        Return permission types which grant the provided permission type (the permission type
+        itself and "all" permission type for the resolver resource type).
+
+        :rtype: ``list``
+        """
+        try:
+            all_permission_type = PermissionType.get_permission_type(
+                resource_type=self.resource_type, permission_name="all"
+            )
+        except ValueError:
+            return [permission_type]
+
+        return [all_permission_type, permission_type]
+
     def _matches_permission_grant(
         self, resource_db, permission_grant, permission_type, all_permission_type
     ):
@@ -182,10 +351,136 @@ class PermissionsResolver(BaseRBACPermissionResolver):
         )
         return permission_type
 
+    def _get_granted_resource_and_pack_uids(self, user_db, resource_type, permission_types):
+        """
+        Retrieve UIDs of the resources of the provided type and UIDs of the packs on which the user
+        has been granted one of the provided permission types.
+
+        :return: (resource uids, pack uids, pattern grants matcher) tuple. Matcher is None if
+                 pattern grants are disabled or the user has no matching pattern grants.
+        :rtype: ``tuple`` of (``set``, ``set``, :class:`PermissionGrantPatternsMatcher`)
+        """
+        permission_grants = list(
+            rbac_service.get_all_permission_grants_for_user(
+                user_db=user_db,
+                resource_types=[resource_type, ResourceType.PACK],
+                permission_types=permission_types,
+            )
+        )
+
+        resource_uids = set([])
+        pack_uids = set([])
+
+        for permission_grant in permission_grants:
+            if permission_grant.resource_type == ResourceType.PACK:
+                pack_uids.add(permission_grant.resource_uid)
+            else:
+                resource_uids.add(permission_grant.resource_uid)
+
+        cache_key = tuple(
+            [
+                str(permission_grant.id)
+                for permission_grant in permission_grants
+                if is_resource_uid_pattern(permission_grant.resource_uid)
+            ]
+        )
+        patterns_matcher = None
+
+        if cache_key:
+            patterns_matcher = get_permission_grant_patterns_matcher(
+                cache_key=cache_key, get_permission_grant_dbs=lambda: permission_grants
+            )
+
+        return resource_uids, pack_uids, patterns_matcher
+
+    def _matches_granted_resource_or_pack(
+        self, resource_type, resource_uid, pack_uid, resource_uids, pack_uids, patterns_matcher
+    ):
+        """
+        Return True if the provided resource or pack UID is one of the granted UIDs (as returned
+        by _get_granted_resource_and_pack_uids) or matches one of the pattern grants.
+
+        :rtype: ``bool``
+        """
+        if resource_uid in resource_uids or pack_uid in pack_uids:
+            return True
+
+        if not patterns_matcher:
+            return False
+
+        if patterns_matcher.matches(resource_uid=resource_uid, resource_types=[resource_type]):
+            return True
+
+        return patterns_matcher.matches(resource_uid=pack_uid, resource_types=[ResourceType.PACK])
+
+    def _get_resource_or_pack_query_filter(
+        self,
+        resource_uids,
+        pack_uids,
+        uid_field_name,
+        pack_field_name,
+        resource_type=None,
+        patterns_matcher=None,
+    ):
+        """
+        Build query filter which matches resources with one of the provided UIDs or resources which
+        belong to one of the provided packs.
+
+        :rtype: :class:`mongoengine.queryset.visitor.Q`
+        """
+        resource_uid_patterns = []
+        pack_uid_patterns = []
+
+        if patterns_matcher:
+            resource_uid_patterns = patterns_matcher.get_resource_uid_patterns(resource_type)
+            pack_uid_patterns = patterns_matcher.get_resource_uid_patterns(ResourceType.PACK)
+
+            # Note: Pattern grants are matched using regex filters below. If pattern grants are
+            # disabled, wildcard characters are matched literally (same as in permission checks).
+            pack_uids = [uid for uid in pack_uids if not is_resource_uid_pattern(uid)]
+            resource_uids = [uid for uid in resource_uids if not is_resource_uid_pattern(uid)]
+
+        pack_refs = [parse_uid(pack_uid)[1][0] for pack_uid in sorted(pack_uids)]
+        resource_uids = sorted(resource_uids)
+
+        filters = []
+
+        if pack_refs:
+            filters.append(Q(**{pack_field_name + "__in": pack_refs}))
+
+        if resource_uids:
+            filters.append(Q(**{uid_field_name + "__in": resource_uids}))
+
+        for pack_uid_pattern in sorted(pack_uid_patterns):
+            # Pattern is matched against the pack ref (pack uid without the "pack:" prefix)
+            pack_ref_pattern = pack_uid_pattern.split(":", 1)[1]
+            regex = resource_uid_pattern_to_regex(pack_ref_pattern)
+            filters.append(Q(**{pack_field_name + "__regex": regex}))
+
+        for resource_uid_pattern in sorted(resource_uid_patterns):
+            regex = resource_uid_pattern_to_regex(resource_uid_pattern)
+            filters.append(Q(**{uid_field_name + "__regex": regex}))
+
+        if not filters:
+            # User has no access to any of the resources
+            return Q(id__in=[])
+
+        query_filter = filters[0]
+        for item in filters[1:]:
+            query_filter = query_filter | item
+
+        return query_filter
+
     def _log(self, message, extra, level=stdlib_logging.DEBUG, **kwargs):
         """
         Custom logger method which prefix message with the class and caller method name.
+
+        Note: Caller frame inspection and message formatting is skipped if the provided log level
+        is not enabled.
         """
+        if not LOG.isEnabledFor(level):
+            return
+
         class_name = self.__class__.__name__
         method_name = sys._getframe().f_back.f_code.co_name
         message_prefix = "%s.%s: " % (class_name, method_name)
@@ -202,20 +497,36 @@ class ContentPackResourcePermissionsResolver(PermissionsResolver):
 
     resource_type = None
 
+    pack_permission_grants_apply = True
+
     # A list of resource-specific permission types which grant / imply "view" permission type
     view_grant_permission_types = []
 
+    # Precomputed table of permission types which grant / imply a particular permission type
+    permission_implications = None
+
     def _user_has_resource_permission(self, user_db, pack_uid, resource_uid, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "pack_uid": pack_uid,
-            "resource_uid": resource_uid,
-            "resource_type": self.resource_type,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "pack_uid": pack_uid,
+                "resource_uid": resource_uid,
+                "resource_type": self.resource_type,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
+        # Check if the same check has recently been denied
+        deny_cache = get_permission_deny_cache()
+        deny_cache_key = (user_db.name, permission_type, resource_uid, pack_uid)
+
+        if deny_cache is not None and deny_cache.get(deny_cache_key, False):
+            self._log("Found a cached denied check", extra=log_context)
+            return False
+
         # First check the system role permissions
         self._log("Checking grants via system role permissions", extra=log_context)
         has_system_role_permission = self._user_has_system_role_permission(
@@ -227,51 +538,104 @@ class ContentPackResourcePermissionsResolver(PermissionsResolver):
             return True
 
         # Check custom roles
-        view_permission_type = PermissionType.get_permission_type(
-            resource_type=self.resource_type, permission_name="view"
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+
+        # Check direct grants on the specified resource and grants on the parent pack
+        self._log(
+            "Checking direct grants on the specified resource and the parent resource",
+            extra=log_context,
         )
-        all_permission_type = PermissionType.get_permission_type(
-            resource_type=self.resource_type, permission_name="all"
+        resources = [(resource_uid, self.resource_type), (pack_uid, ResourceType.PACK)]
+        has_permission_grant = rbac_service.user_has_matching_permission_grant_for_resources(
+            user_db=user_db, resources=resources, permission_types=permission_types
         )
 
-        if permission_type == view_permission_type:
-            # Note: Some permissions such as "create", "modify", "delete" and "execute" also
-            # grant / imply "view" permission
-            permission_types = self.view_grant_permission_types[:] + [permission_type]
-        elif permission_type not in all_permission_type:
-            permission_types = [all_permission_type, permission_type]
-        else:
-            permission_types = [permission_type]
+        if has_permission_grant:
+            self._log("Found a grant on the resource or its parent pack", extra=log_context)
+            return True
 
-        # Check direct grants on the specified resource
-        self._log("Checking direct grants on the specified resource", extra=log_context)
-        resource_types = [self.resource_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=resource_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
+        if deny_cache is not None:
+            deny_cache.set(deny_cache_key, True)
+
+        self._log("No matching grants found", extra=log_context)
+        return False
+
+    def filter_resource_dbs_by_permission(self, user_db, resource_dbs, permission_type):
+        """
+        Filter the provided resources using a single permission grants lookup.
+
+        Same rules as in _user_has_resource_permission apply - user needs to have a grant either
+        directly on the resource or on the resource parent pack.
+        """
+        resource_dbs = list(resource_dbs)
+
+        if not resource_dbs:
+            return []
+
+        predicate = self.get_resource_db_permission_predicate(
+            user_db=user_db, permission_type=permission_type
         )
-        if len(permission_grants) >= 1:
-            self._log("Found a direct grant on the action", extra=log_context)
-            return True
+        return [resource_db for resource_db in resource_dbs if predicate(resource_db)]
 
-        # Check grants on the parent pack
-        self._log("Checking grants on the parent resource", extra=log_context)
-        resource_types = [ResourceType.PACK]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=pack_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
+    def get_resource_db_permission_predicate(self, user_db, permission_type):
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
         )
 
-        if len(permission_grants) >= 1:
-            self._log("Found a grant on the action parent pack", extra=log_context)
-            return True
+        if has_system_role_permission:
+            return _allow_all
 
-        self._log("No matching grants found", extra=log_context)
-        return False
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        resource_uids, pack_uids, patterns_matcher = self._get_granted_resource_and_pack_uids(
+            user_db=user_db, resource_type=self.resource_type, permission_types=permission_types
+        )
+
+        if not resource_uids and not pack_uids:
+            return _deny_all
+
+        def predicate(resource_db):
+            return self._matches_granted_resource_or_pack(
+                resource_type=self.resource_type,
+                resource_uid=resource_db.get_uid(),
+                pack_uid=get_pack_uid(pack_ref=resource_db.pack),
+                resource_uids=resource_uids,
+                pack_uids=pack_uids,
+                patterns_matcher=patterns_matcher,
+            )
+
+        return predicate
+
+    def get_permission_query_filter(self, user_db, permission_type):
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return None
+
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        resource_uids, pack_uids, patterns_matcher = self._get_granted_resource_and_pack_uids(
+            user_db=user_db, resource_type=self.resource_type, permission_types=permission_types
+        )
+
+        return self._get_resource_or_pack_query_filter(
+            resource_uids=resource_uids,
+            pack_uids=pack_uids,
+            uid_field_name="uid",
+            pack_field_name="pack",
+            resource_type=self.resource_type,
+            patterns_matcher=patterns_matcher,
+        )
+
+    def _get_grant_permission_types(self, permission_type):
+        """
+        Return permission types which grant the provided permission type.
+
+        :rtype: ``tuple``
+        """
+        return self.permission_implications.get_implied_by_permission_types(
+            permission_type=permission_type
+        )
 
 
 class RunnerPermissionsResolver(PermissionsResolver):
@@ -286,12 +650,15 @@ class RunnerPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -307,20 +674,24 @@ class RunnerPermissionsResolver(PermissionsResolver):
         resource_uid = resource_db.get_uid()
         resource_types = [ResourceType.RUNNER]
         permission_types = [permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=resource_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a direct grant on the runner type", extra=log_context)
             return True
 
         self._log("No matching grants found", extra=log_context)
         return False
 
+    def _get_grant_permission_types(self, permission_type):
+        # Note: Only direct grants of the permission type apply to runner types
+        return [permission_type]
+
 
 class PackPermissionsResolver(PermissionsResolver):
     """
@@ -340,12 +711,15 @@ class PackPermissionsResolver(PermissionsResolver):
             )
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -361,20 +735,24 @@ class PackPermissionsResolver(PermissionsResolver):
         resource_uid = resource_db.get_uid()
         resource_types = [ResourceType.PACK]
         permission_types = [permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=resource_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a direct grant on the pack", extra=log_context)
             return True
 
         self._log("No matching grants found", extra=log_context)
         return False
 
+    def _get_grant_permission_types(self, permission_type):
+        # Note: Only direct grants of the permission type apply to packs
+        return [permission_type]
+
 
 class SensorPermissionsResolver(ContentPackResourcePermissionsResolver):
     """
@@ -383,6 +761,9 @@ class SensorPermissionsResolver(ContentPackResourcePermissionsResolver):
 
     resource_type = ResourceType.SENSOR
     view_grant_permission_types = [PermissionType.SENSOR_ALL, PermissionType.SENSOR_MODIFY]
+    permission_implications = PermissionImplications(
+        resource_type=resource_type, view_grant_permission_types=view_grant_permission_types
+    )
 
     def user_has_permission(self, user_db, permission_type):
         assert permission_type in [PermissionType.SENSOR_LIST]
@@ -390,7 +771,7 @@ class SensorPermissionsResolver(ContentPackResourcePermissionsResolver):
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
         sensor_uid = resource_db.get_uid()
-        pack_uid = resource_db.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_db.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -412,6 +793,9 @@ class ActionPermissionsResolver(ContentPackResourcePermissionsResolver):
         PermissionType.ACTION_DELETE,
         PermissionType.ACTION_EXECUTE,
     ]
+    permission_implications = PermissionImplications(
+        resource_type=resource_type, view_grant_permission_types=view_grant_permission_types
+    )
 
     def user_has_permission(self, user_db, permission_type):
         assert permission_type in [PermissionType.ACTION_LIST]
@@ -421,7 +805,7 @@ class ActionPermissionsResolver(ContentPackResourcePermissionsResolver):
         assert permission_type in [PermissionType.ACTION_CREATE]
 
         action_uid = resource_api.get_uid()
-        pack_uid = resource_api.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_api.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -431,7 +815,7 @@ class ActionPermissionsResolver(ContentPackResourcePermissionsResolver):
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
         action_uid = resource_db.get_uid()
-        pack_uid = resource_db.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_db.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -452,6 +836,9 @@ class ActionAliasPermissionsResolver(ContentPackResourcePermissionsResolver):
         PermissionType.ACTION_ALIAS_MODIFY,
         PermissionType.ACTION_ALIAS_DELETE,
     ]
+    permission_implications = PermissionImplications(
+        resource_type=resource_type, view_grant_permission_types=view_grant_permission_types
+    )
 
     def user_has_permission(self, user_db, permission_type):
         assert permission_type in [
@@ -476,7 +863,7 @@ class ActionAliasPermissionsResolver(ContentPackResourcePermissionsResolver):
         assert permission_type in [PermissionType.ACTION_ALIAS_CREATE]
 
         action_alias_uid = resource_api.get_uid()
-        pack_uid = resource_api.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_api.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -486,7 +873,7 @@ class ActionAliasPermissionsResolver(ContentPackResourcePermissionsResolver):
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
         action_alias_uid = resource_db.get_uid()
-        pack_uid = resource_db.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_db.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -507,6 +894,9 @@ class RulePermissionsResolver(ContentPackResourcePermissionsResolver):
         PermissionType.RULE_MODIFY,
         PermissionType.RULE_DELETE,
     ]
+    permission_implications = PermissionImplications(
+        resource_type=resource_type, view_grant_permission_types=view_grant_permission_types
+    )
 
     def user_has_trigger_permission(self, user_db, trigger):
         """
@@ -520,7 +910,13 @@ class RulePermissionsResolver(ContentPackResourcePermissionsResolver):
         :param trigger: "trigger" attribute of the RuleAPI object.
         :type trigger: ``dict``
         """
-        log_context = {"user_db": user_db, "trigger": trigger, "resolver": self.__class__.__name__}
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "trigger": trigger,
+                "resolver": self.__class__.__name__,
+            }
 
         trigger_type = trigger["type"]
         trigger_parameters = trigger.get("parameters", {})
@@ -533,10 +929,10 @@ class RulePermissionsResolver(ContentPackResourcePermissionsResolver):
             return True
 
         resolver = get_resolver_for_resource_type(ResourceType.WEBHOOK)
-        webhook_db = WebhookDB(name=trigger_parameters["url"])
+        webhook_uid = get_webhook_uid(name=trigger_parameters["url"])
         permission_type = PermissionType.WEBHOOK_CREATE
-        result = resolver.user_has_resource_db_permission(
-            user_db=user_db, resource_db=webhook_db, permission_type=permission_type
+        result = resolver.user_has_resource_uid_permission(
+            user_db=user_db, resource_uid=webhook_uid, permission_type=permission_type
         )
 
         if result is True:
@@ -560,7 +956,7 @@ class RulePermissionsResolver(ContentPackResourcePermissionsResolver):
         assert permission_type in [PermissionType.RULE_CREATE]
 
         rule_uid = resource_api.get_uid()
-        pack_uid = resource_api.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_api.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -570,7 +966,7 @@ class RulePermissionsResolver(ContentPackResourcePermissionsResolver):
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
         rule_uid = resource_db.get_uid()
-        pack_uid = resource_db.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_db.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -592,12 +988,15 @@ class RuleEnforcementPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -623,11 +1022,37 @@ class RuleEnforcementPermissionsResolver(PermissionsResolver):
             )
             return False
 
-        # TODO: Add utility methods for constructing uids from parts
-        pack_db = PackDB(ref=rule_pack)
-        rule_pack_uid = pack_db.get_uid()
+        rule_pack_uid = get_pack_uid(pack_ref=rule_pack)
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+
+        # Check grants on the pack of the rule to which enforcement belongs to and on the rule
+        # itself
+        resources = [(rule_pack_uid, ResourceType.PACK), (rule_uid, ResourceType.RULE)]
+        has_permission_grant = rbac_service.user_has_matching_permission_grant_for_resources(
+            user_db=user_db, resources=resources, permission_types=permission_types
+        )
+
+        if has_permission_grant:
+            self._log(
+                "Found a grant on the enforcement's rule or the rule parent pack", extra=log_context
+            )
+            return True
+
+        self._log("No matching grants found", extra=log_context)
+        return False
 
-        rule_permission_type = None
+    def _get_permission_grant_lookups(self, resource_db, permission_type):
+        rule_spec = resource_db.rule
+        rule_pack_uid = get_pack_uid(pack_ref=ResourceReference.get_pack(rule_spec.ref))
+
+        resources = [(rule_pack_uid, ResourceType.PACK), (rule_spec.uid, ResourceType.RULE)]
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        return [(resources, permission_types)]
+
+    def _get_grant_permission_types(self, permission_type):
+        """
+        Return rule permission types which grant the provided rule enforcement permission type.
+        """
         if permission_type == PermissionType.RULE_ENFORCEMENT_VIEW:
             rule_permission_type = PermissionType.RULE_VIEW
         elif permission_type == PermissionType.RULE_ENFORCEMENT_LIST:
@@ -635,46 +1060,11 @@ class RuleEnforcementPermissionsResolver(PermissionsResolver):
         else:
             raise ValueError("Invalid permission type: %s" % (permission_type))
 
-        permission_types = [PermissionType.RULE_ALL, rule_permission_type]
-
-        view_permission_type = PermissionType.get_permission_type(
-            resource_type=ResourceType.RULE, permission_name="view"
-        )
-
-        if rule_permission_type == view_permission_type:
-            permission_types = RulePermissionsResolver.view_grant_permission_types[:] + [
-                rule_permission_type
-            ]
-
-        # Check grants on the pack of the rule to which enforcement belongs to
-        resource_types = [ResourceType.PACK]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=rule_pack_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
-        )
-
-        if len(permission_grants) >= 1:
-            self._log("Found a grant on the enforcement rule parent pack", extra=log_context)
-            return True
-
-        # Check grants on the rule the enforcement belongs to
-        resource_types = [ResourceType.RULE]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=rule_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
+        permission_implications = RulePermissionsResolver.permission_implications
+        return permission_implications.get_implied_by_permission_types(
+            permission_type=rule_permission_type
         )
 
-        if len(permission_grants) >= 1:
-            self._log("Found a grant on the enforcement's rule.", extra=log_context)
-            return True
-
-        self._log("No matching grants found", extra=log_context)
-        return False
-
 
 class KeyValuePermissionsResolver(PermissionsResolver):
     """
@@ -706,12 +1096,15 @@ class KeyValuePermissionsResolver(PermissionsResolver):
         return True
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -719,73 +1112,192 @@ class KeyValuePermissionsResolver(PermissionsResolver):
             user_db=user_db, permission_type=permission_type
         )
 
-        if resource_db.scope == FULL_SYSTEM_SCOPE and has_system_role_permission:
-            self._log("Found a matching grant via system role", extra=log_context)
+        # Second check the scope rules (user scoped key-value pairs)
+        result, message = self._get_scope_permission(
+            user_db=user_db,
+            resource_db=resource_db,
+            has_system_role_permission=has_system_role_permission,
+        )
+
+        if result is not None:
+            self._log(message, extra=log_context)
+            return result
+
+        # Check custom roles and permission grants
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
+            user_db=user_db,
+            resource_uid=resource_db.get_uid(),
+            resource_types=[self.resource_type],
+            permission_types=permission_types,
+        )
+
+        if has_permission_grant:
+            self._log("Found a direct grant on the key value pair", extra=log_context)
             return True
 
-        # Set key prefix to user scope
+        self._log("No matching grants found", extra=log_context)
+        return False
+
+    def filter_resource_dbs_by_permission(self, user_db, resource_dbs, permission_type):
+        """
+        Filter the provided key value pairs in a single pass.
+
+        System role permissions and user key value pair permission grants are retrieved once and
+        grants are compiled into an index of resource uid to a granted permission types mask so
+        checking each key value pair is a dict lookup and a bitwise AND.
+        """
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        permission_types = self._get_grant_permission_types(permission_type=permission_type)
+        permission_types_mask = get_permission_types_mask(permission_types)
+        grants_index = None
+        patterns_matcher = None
+
+        user_scope = "%s:%s" % (FULL_USER_SCOPE, user_db.name)
         key_prefix = user_db.name + ":"
 
-        # Second check if this is for user scoped key-value pairs
-        if (resource_db.scope == "%s:%s" % (FULL_USER_SCOPE, user_db.name)) or (
-            resource_db.scope == FULL_USER_SCOPE and resource_db.name.startswith(key_prefix)
-        ):
-            self._log("Found default grant for the user scoped key value pair", extra=log_context)
-            return True
+        result = []
+        for resource_db in resource_dbs:
+            has_permission, _ = self._get_scope_permission(
+                user_db=user_db,
+                resource_db=resource_db,
+                has_system_role_permission=has_system_role_permission,
+                user_scope=user_scope,
+                key_prefix=key_prefix,
+            )
 
-        # Third check if this is a user scoped key-value pairs for another user
-        # Currently, admin user has access to another user's key-value pairs.
-        if (
-            not has_system_role_permission
-            and resource_db.scope.startswith("%s:" % FULL_USER_SCOPE)
-            and resource_db.scope != "%s:%s" % (FULL_USER_SCOPE, user_db.name)
-        ):
-            self._log("User is trying to access another user's key value pairs", extra=log_context)
-            return False
-        if (
-            not has_system_role_permission
-            and resource_db.scope == FULL_USER_SCOPE
-            and not resource_db.name.startswith(key_prefix)
-        ):
-            self._log("User is trying to access another user's key value pair", extra=log_context)
-            return False
-        if (
-            has_system_role_permission
-            and resource_db.scope.startswith("%s:" % FULL_USER_SCOPE)
-            and resource_db.scope != "%s:%s" % (FULL_USER_SCOPE, user_db.name)
-        ):
-            self._log("User is trying to access another user's key value pairs", extra=log_context)
-            return True
-        if (
-            has_system_role_permission
-            and resource_db.scope == FULL_USER_SCOPE
-            and not resource_db.name.startswith(key_prefix)
+            if has_permission is None:
+                if grants_index is None:
+                    grants_index, patterns_matcher = self._get_permission_grants_index(
+                        user_db=user_db
+                    )
+
+                resource_uid = resource_db.get_uid()
+                granted_mask = grants_index.get(resource_uid, 0)
+                has_permission = bool(granted_mask & permission_types_mask)
+
+                if not has_permission and patterns_matcher:
+                    has_permission = patterns_matcher.matches(
+                        resource_uid=resource_uid,
+                        resource_types=[self.resource_type],
+                        permission_types=permission_types,
+                    )
+
+            if has_permission:
+                result.append(resource_db)
+
+        return result
+
+    def get_usernames_with_resource_db_permission(self, resource_db, permission_type):
+        scope = resource_db.scope
+
+        if scope.startswith(FULL_USER_SCOPE + ":"):
+            owner = scope[len(FULL_USER_SCOPE) + 1 :]
+        elif scope == FULL_USER_SCOPE and ":" in resource_db.name:
+            owner = resource_db.name.split(":", 1)[0]
+        elif scope == FULL_USER_SCOPE:
+            owner = None
+        else:
+            parent = super(KeyValuePermissionsResolver, self)
+            return parent.get_usernames_with_resource_db_permission(
+                resource_db=resource_db, permission_type=permission_type
+            )
+
+        # User scoped key value pairs are only accessible by the owner and the system roles
+        # (permission grants don't apply)
+        result = rbac_service.get_usernames_for_resources(
+            resources=[],
+            permission_types=[],
+            system_role_names=self._get_system_role_names_with_permission(permission_type),
+        )
+
+        if owner:
+            result.add(owner)
+
+        return result
+
+    def _get_scope_permission(
+        self, user_db, resource_db, has_system_role_permission, user_scope=None, key_prefix=None
+    ):
+        """
+        Check the key value pair scope rules.
+
+        :return: (result, log message) tuple where result is None if scope rules don't apply and
+                 permission grants need to be checked.
+        :rtype: ``tuple``
+        """
+        user_scope = user_scope or "%s:%s" % (FULL_USER_SCOPE, user_db.name)
+        key_prefix = key_prefix or user_db.name + ":"
+        scope = resource_db.scope
+
+        if scope == FULL_SYSTEM_SCOPE:
+            if has_system_role_permission:
+                return True, "Found a matching grant via system role"
+
+            return None, None
+
+        # User scoped key-value pairs
+        if scope == user_scope or (
+            scope == FULL_USER_SCOPE and resource_db.name.startswith(key_prefix)
         ):
-            self._log("User is trying to access another user's key value pair", extra=log_context)
-            return True
+            return True, "Found default grant for the user scoped key value pair"
 
-        # Check custom roles and permission grants
+        # User scoped key-value pairs for another user. Currently, admin user has access to
+        # another user's key-value pairs.
+        if scope.startswith(FULL_USER_SCOPE + ":"):
+            message = "User is trying to access another user's key value pairs"
+            return has_system_role_permission, message
+
+        if scope == FULL_USER_SCOPE:
+            message = "User is trying to access another user's key value pair"
+            return has_system_role_permission, message
+
+        return None, None
+
+    def _get_grant_permission_types(self, permission_type):
         if permission_type in self.view_permission_types:
             # Note: Some permissions such as "create", "modify", "delete" and "execute" also
             # grant / imply "view" permission
-            permission_types = self.view_grant_permission_types[:] + [permission_type]
-        else:
-            permission_types = [self.all_permission_type, permission_type]
+            return self.view_grant_permission_types[:] + [permission_type]
 
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=resource_db.get_uid(),
-            resource_types=[self.resource_type],
-            permission_types=permission_types,
+        return [self.all_permission_type, permission_type]
+
+    def _get_permission_grants_index(self, user_db):
+        """
+        Return a map of key value pair uid to a mask of permission types granted to the user and
+        a matcher for the user key value pair pattern grants.
+
+        :rtype: ``tuple`` of (``dict``, :class:`PermissionGrantPatternsMatcher`)
+        """
+        permission_grant_dbs = list(
+            rbac_service.get_all_permission_grants_for_user(
+                user_db=user_db, resource_types=[self.resource_type]
+            )
         )
 
-        if len(permission_grants) >= 1:
-            self._log("Found a direct grant on the key value pair", extra=log_context)
-            return True
+        index = {}
+        pattern_grant_ids = []
 
-        self._log("No matching grants found", extra=log_context)
+        for permission_grant_db in permission_grant_dbs:
+            resource_uid = permission_grant_db.resource_uid
+            permission_types_mask = get_permission_types_mask(permission_grant_db.permission_types)
+            index[resource_uid] = index.get(resource_uid, 0) | permission_types_mask
 
-        return False
+            if is_resource_uid_pattern(resource_uid):
+                pattern_grant_ids.append(str(permission_grant_db.id))
+
+        patterns_matcher = None
+
+        if pattern_grant_ids:
+            patterns_matcher = get_permission_grant_patterns_matcher(
+                cache_key=tuple(pattern_grant_ids),
+                get_permission_grant_dbs=lambda: permission_grant_dbs,
+            )
+
+        return index, patterns_matcher
 
 
 class ExecutionPermissionsResolver(PermissionsResolver):
@@ -803,12 +1315,15 @@ class ExecutionPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -823,12 +1338,121 @@ class ExecutionPermissionsResolver(PermissionsResolver):
         # Check custom roles
         action = resource_db["action"]
 
-        # TODO: Add utility methods for constructing uids from parts
-        pack_db = PackDB(ref=action["pack"])
-
         action_uid = action["uid"]
-        action_pack_uid = pack_db.get_uid()
+        action_pack_uid = get_pack_uid(pack_ref=action["pack"])
+
+        action_permission_type = self._get_action_permission_type(permission_type=permission_type)
+
+        # Check grants on the pack of the action to which execution belongs to and on the action
+        # itself
+        resources = [(action_pack_uid, ResourceType.PACK), (action_uid, ResourceType.ACTION)]
+        permission_types = [PermissionType.ACTION_ALL, action_permission_type]
+        has_permission_grant = rbac_service.user_has_matching_permission_grant_for_resources(
+            user_db=user_db, resources=resources, permission_types=permission_types
+        )
+
+        if has_permission_grant:
+            self._log(
+                "Found a grant on the execution action or the action parent pack",
+                extra=log_context,
+            )
+            return True
 
+        self._log("No matching grants found", extra=log_context)
+        return False
+
+    def filter_resource_dbs_by_permission(self, user_db, resource_dbs, permission_type):
+        """
+        Filter the provided executions using a single permission grants lookup.
+
+        User needs to have a grant either on the execution action or on the action parent pack.
+        """
+        resource_dbs = list(resource_dbs)
+
+        if not resource_dbs:
+            return []
+
+        predicate = self.get_resource_db_permission_predicate(
+            user_db=user_db, permission_type=permission_type
+        )
+        return [resource_db for resource_db in resource_dbs if predicate(resource_db)]
+
+    def get_resource_db_permission_predicate(self, user_db, permission_type):
+        """
+        Note: Returned predicate also works with serialized executions (e.g. st2stream execution
+        event payloads) since it only accesses "action" attribute using item access.
+        """
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return _allow_all
+
+        action_permission_type = self._get_action_permission_type(permission_type=permission_type)
+        action_uids, pack_uids, patterns_matcher = self._get_granted_resource_and_pack_uids(
+            user_db=user_db,
+            resource_type=ResourceType.ACTION,
+            permission_types=[PermissionType.ACTION_ALL, action_permission_type],
+        )
+
+        if not action_uids and not pack_uids:
+            return _deny_all
+
+        def predicate(resource_db):
+            action = resource_db["action"]
+            return self._matches_granted_resource_or_pack(
+                resource_type=ResourceType.ACTION,
+                resource_uid=action["uid"],
+                pack_uid=get_pack_uid(pack_ref=action["pack"]),
+                resource_uids=action_uids,
+                pack_uids=pack_uids,
+                patterns_matcher=patterns_matcher,
+            )
+
+        return predicate
+
+    def get_usernames_with_resource_db_permission(self, resource_db, permission_type):
+        action = resource_db["action"]
+        action_permission_type = self._get_action_permission_type(permission_type=permission_type)
+        resources = [
+            (action["uid"], ResourceType.ACTION),
+            (get_pack_uid(pack_ref=action["pack"]), ResourceType.PACK),
+        ]
+        return rbac_service.get_usernames_for_resources(
+            resources=resources,
+            permission_types=[PermissionType.ACTION_ALL, action_permission_type],
+            system_role_names=self._get_system_role_names_with_permission(permission_type),
+        )
+
+    def get_permission_query_filter(self, user_db, permission_type):
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return None
+
+        action_permission_type = self._get_action_permission_type(permission_type=permission_type)
+        action_uids, pack_uids, patterns_matcher = self._get_granted_resource_and_pack_uids(
+            user_db=user_db,
+            resource_type=ResourceType.ACTION,
+            permission_types=[PermissionType.ACTION_ALL, action_permission_type],
+        )
+
+        return self._get_resource_or_pack_query_filter(
+            resource_uids=action_uids,
+            pack_uids=pack_uids,
+            uid_field_name="action__uid",
+            pack_field_name="action__pack",
+            resource_type=ResourceType.ACTION,
+            patterns_matcher=patterns_matcher,
+        )
+
+    def _get_action_permission_type(self, permission_type):
+        """
+        Return action permission type which grants the provided execution permission type.
+        """
         # Note: "action_execute" also grants / implies "execution_re_run" and "execution_stop"
         if permission_type == PermissionType.EXECUTION_VIEW:
             action_permission_type = PermissionType.ACTION_VIEW
@@ -841,36 +1465,7 @@ class ExecutionPermissionsResolver(PermissionsResolver):
         else:
             raise ValueError("Invalid permission type: %s" % (permission_type))
 
-        # Check grants on the pack of the action to which execution belongs to
-        resource_types = [ResourceType.PACK]
-        permission_types = [PermissionType.ACTION_ALL, action_permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=action_pack_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
-        )
-
-        if len(permission_grants) >= 1:
-            self._log("Found a grant on the execution action parent pack", extra=log_context)
-            return True
-
-        # Check grants on the action the execution belongs to
-        resource_types = [ResourceType.ACTION]
-        permission_types = [PermissionType.ACTION_ALL, action_permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
-            user_db=user_db,
-            resource_uid=action_uid,
-            resource_types=resource_types,
-            permission_types=permission_types,
-        )
-
-        if len(permission_grants) >= 1:
-            self._log("Found a grant on the execution action", extra=log_context)
-            return True
-
-        self._log("No matching grants found", extra=log_context)
-        return False
+        return action_permission_type
 
 
 class WebhookPermissionsResolver(PermissionsResolver):
@@ -882,12 +1477,15 @@ class WebhookPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -901,18 +1499,58 @@ class WebhookPermissionsResolver(PermissionsResolver):
 
         # Check custom roles
         webhook_uid = resource_db.get_uid()
+        return self._user_has_resource_permission(
+            user_db=user_db,
+            resource_uid=webhook_uid,
+            permission_type=permission_type,
+            log_context=log_context,
+        )
+
+    def user_has_resource_uid_permission(self, user_db, resource_uid, permission_type):
+        """
+        Method for checking user permissions on a webhook with the provided UID.
+
+        This allows callers which only know the webhook url (e.g. rule trigger checks) to avoid
+        instantiating WebhookDB objects.
+        """
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_uid": resource_uid,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
+        self._log("Checking user resource permissions", extra=log_context)
+
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            self._log("Found a matching grant via system role", extra=log_context)
+            return True
+
+        return self._user_has_resource_permission(
+            user_db=user_db,
+            resource_uid=resource_uid,
+            permission_type=permission_type,
+            log_context=log_context,
+        )
 
+    def _user_has_resource_permission(self, user_db, resource_uid, permission_type, log_context):
         # Check direct grants on the webhook
         resource_types = [ResourceType.WEBHOOK]
         permission_types = [PermissionType.WEBHOOK_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
-            resource_uid=webhook_uid,
+            resource_uid=resource_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the webhook", extra=log_context)
             return True
 
@@ -932,12 +1570,15 @@ class TimerPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -955,14 +1596,14 @@ class TimerPermissionsResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.TIMER]
         permission_types = [PermissionType.TIMER_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=timer_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the timer", extra=log_context)
             return True
 
@@ -986,12 +1627,15 @@ class ApiKeyPermissionResolver(PermissionsResolver):
         return self._user_has_global_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -1009,14 +1653,14 @@ class ApiKeyPermissionResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.API_KEY]
         permission_types = [PermissionType.API_KEY_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=api_key_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the api key", extra=log_context)
             return True
 
@@ -1036,12 +1680,15 @@ class TracePermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -1059,14 +1706,14 @@ class TracePermissionsResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.TRACE]
         permission_types = [PermissionType.TRACE_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=trace_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the trace", extra=log_context)
             return True
 
@@ -1086,12 +1733,15 @@ class TriggerPermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -1109,14 +1759,14 @@ class TriggerPermissionsResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.TRIGGER]
         permission_types = [PermissionType.TRIGGER_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=timer_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the timer", extra=log_context)
             return True
 
@@ -1136,12 +1786,15 @@ class PolicyTypePermissionsResolver(PermissionsResolver):
         return self._user_has_list_permission(user_db=user_db, permission_type=permission_type)
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -1159,14 +1812,14 @@ class PolicyTypePermissionsResolver(PermissionsResolver):
         # Check direct grants on the webhook
         resource_types = [ResourceType.POLICY_TYPE]
         permission_types = [PermissionType.POLICY_TYPE_ALL, permission_type]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db,
             resource_uid=policy_type_uid,
             resource_types=resource_types,
             permission_types=permission_types,
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the policy type", extra=log_context)
             return True
 
@@ -1186,6 +1839,9 @@ class PolicyPermissionsResolver(ContentPackResourcePermissionsResolver):
         PermissionType.POLICY_MODIFY,
         PermissionType.POLICY_DELETE,
     ]
+    permission_implications = PermissionImplications(
+        resource_type=resource_type, view_grant_permission_types=view_grant_permission_types
+    )
 
     def user_has_permission(self, user_db, permission_type):
         assert permission_type in [PermissionType.POLICY_LIST]
@@ -1195,7 +1851,7 @@ class PolicyPermissionsResolver(ContentPackResourcePermissionsResolver):
         assert permission_type in [PermissionType.POLICY_CREATE]
 
         policy_uid = resource_api.get_uid()
-        pack_uid = resource_api.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_api.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -1205,7 +1861,7 @@ class PolicyPermissionsResolver(ContentPackResourcePermissionsResolver):
 
     def user_has_resource_db_permission(self, user_db, resource_db, permission_type):
         policy_uid = resource_db.get_uid()
-        pack_uid = resource_db.get_pack_uid()
+        pack_uid = get_pack_uid(pack_ref=resource_db.pack)
         return self._user_has_resource_permission(
             user_db=user_db,
             pack_uid=pack_uid,
@@ -1256,12 +1912,15 @@ class InquiryPermissionsResolver(PermissionsResolver):
 
         assert permission_type in permission_types
 
-        log_context = {
-            "user_db": user_db,
-            "resource_db": resource_db,
-            "permission_type": permission_type,
-            "resolver": self.__class__.__name__,
-        }
+        log_context = None
+        if LOG.isEnabledFor(stdlib_logging.DEBUG):
+            log_context = {
+                "user_db": user_db,
+                "resource_db": resource_db,
+                "permission_type": permission_type,
+                "resolver": self.__class__.__name__,
+            }
+
         self._log("Checking user resource permissions", extra=log_context)
 
         # First check the system role permissions
@@ -1275,61 +1934,234 @@ class InquiryPermissionsResolver(PermissionsResolver):
 
         # Check for explicit Inquiry grants first
         resource_types = [ResourceType.INQUIRY]
-        permission_grants = rbac_service.get_all_permission_grants_for_user(
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
             user_db=user_db, resource_types=resource_types, permission_types=permission_types
         )
 
-        if len(permission_grants) >= 1:
+        if has_permission_grant:
             self._log("Found a grant on the inquiry", extra=log_context)
             return True
 
         # If the inquiry has a parent (is in a workflow) we want to
         # check permissions of the parent action and pack, and inherit
         # if applicable
+        parent_uids = None
         if resource_db.parent:
+            parent_uids = self._get_parent_action_and_pack_uids(parent_ids=[resource_db.parent])
+            parent_uids = parent_uids.get(resource_db.parent, None)
 
-            # Retrieve objects for parent workflow action and pack
-            wf_exc = ActionExecution.get(id=resource_db.parent)
-            wf_action = wf_exc["action"]
-            # TODO: Add utility methods for constructing uids from parts
-            wf_pack_db = PackDB(ref=wf_action["pack"])
-            wf_action_uid = wf_action["uid"]
-            wf_action_pack_uid = wf_pack_db.get_uid()
+        if parent_uids:
+            wf_action_uid, wf_action_pack_uid = parent_uids
 
-            # Check grants on the pack of the workflow that the Inquiry was generated from
-            resource_types = [ResourceType.PACK]
+            # Check grants on the workflow that the Inquiry was generated from and on the pack of
+            # the workflow
+            resources = [
+                (wf_action_pack_uid, ResourceType.PACK),
+                (wf_action_uid, ResourceType.ACTION),
+            ]
             permission_types = [PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE]
-            permission_grants = rbac_service.get_all_permission_grants_for_user(
-                user_db=user_db,
-                resource_uid=wf_action_pack_uid,
-                resource_types=resource_types,
-                permission_types=permission_types,
+            has_permission_grant = rbac_service.user_has_matching_permission_grant_for_resources(
+                user_db=user_db, resources=resources, permission_types=permission_types
             )
 
-            if len(permission_grants) >= 1:
-                log_context["wf_action_pack_uid"] = wf_action_pack_uid
+            if has_permission_grant:
+                if log_context is not None:
+                    log_context["wf_action_pack_uid"] = wf_action_pack_uid
+                    log_context["wf_action_uid"] = wf_action_uid
+
                 self._log(
-                    "Found a grant on the parent pack for an inquiry workflow", extra=log_context
+                    "Found a grant on the inquiry workflow or the workflow parent pack",
+                    extra=log_context,
                 )
                 return True
 
-            # Check grants on the workflow that the Inquiry was generated from
-            resource_types = [ResourceType.ACTION]
-            permission_types = [PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE]
-            permission_grants = rbac_service.get_all_permission_grants_for_user(
-                user_db=user_db,
+        self._log("No matching grants found", extra=log_context)
+        return False
+
+    def filter_resource_dbs_by_permission(self, user_db, resource_dbs, permission_type):
+        """
+        Filter the provided inquiries using a single permission grants lookup and a single parent
+        workflow lookup.
+        """
+        permission_types = [
+            PermissionType.INQUIRY_VIEW,
+            PermissionType.INQUIRY_RESPOND,
+            PermissionType.INQUIRY_ALL,
+        ]
+
+        assert permission_type in permission_types
+
+        resource_dbs = list(resource_dbs)
+
+        has_system_role_permission = self._user_has_system_role_permission(
+            user_db=user_db, permission_type=permission_type
+        )
+
+        if has_system_role_permission:
+            return resource_dbs
+
+        has_permission_grant = rbac_service.user_has_matching_permission_grant(
+            user_db=user_db,
+            resource_types=[ResourceType.INQUIRY],
+            permission_types=permission_types,
+        )
+
+        if has_permission_grant:
+            return resource_dbs
+
+        parent_ids = [resource_db.parent for resource_db in resource_dbs if resource_db.parent]
+
+        if not parent_ids:
+            return []
+
+        parents_uids = self._get_parent_action_and_pack_uids(parent_ids=parent_ids)
+        action_uids, pack_uids, patterns_matcher = self._get_granted_resource_and_pack_uids(
+            user_db=user_db,
+            resource_type=ResourceType.ACTION,
+            permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE],
+        )
+
+        result = []
+        for resource_db in resource_dbs:
+            parent_uids = parents_uids.get(resource_db.parent, None)
+
+            if not parent_uids:
+                continue
+
+            wf_action_uid, wf_action_pack_uid = parent_uids
+            matches = self._matches_granted_resource_or_pack(
+                resource_type=ResourceType.ACTION,
                 resource_uid=wf_action_uid,
-                resource_types=resource_types,
-                permission_types=permission_types,
+                pack_uid=wf_action_pack_uid,
+                resource_uids=action_uids,
+                pack_uids=pack_uids,
+                patterns_matcher=patterns_matcher,
             )
 
-            if len(permission_grants) >= 1:
-                log_context["wf_action_uid"] = wf_action_uid
-                self._log("Found a grant on the inquiry workflow", extra=log_context)
-                return True
+            if matches:
+                result.append(resource_db)
+
+        return result
+
+    def _get_permission_grant_lookups(self, resource_db, permission_type):
+        # Note: All the inquiry permission types are global so only grants which are not tied to a
+        # particular inquiry are taken into account
+        lookups = [
+            (
+                [(None, ResourceType.INQUIRY)],
+                [
+                    PermissionType.INQUIRY_VIEW,
+                    PermissionType.INQUIRY_RESPOND,
+                    PermissionType.INQUIRY_ALL,
+                ],
+            )
+        ]
 
-        self._log("No matching grants found", extra=log_context)
-        return False
+        parent_uids = None
+        if resource_db.parent:
+            parent_uids = self._get_parent_action_and_pack_uids(parent_ids=[resource_db.parent])
+            parent_uids = parent_uids.get(resource_db.parent, None)
+
+        if parent_uids:
+            wf_action_uid, wf_action_pack_uid = parent_uids
+            resources = [
+                (wf_action_pack_uid, ResourceType.PACK),
+                (wf_action_uid, ResourceType.ACTION),
+            ]
+            lookups.append((resources, [PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE]))
+
+        return lookups
+
+    def _get_parent_action_and_pack_uids(self, parent_ids):
+        """
+        Retrieve (action_uid, pack_uid) tuples for the provided parent workflow execution ids.
+
+        Only action reference fields are retrieved from the database (execution documents can be
+        very large) and the results are cached since the action of an execution never changes.
+
+        :rtype: ``dict`` of parent id to ``tuple``
+        """
+        result = {}
+        missing_parent_ids = []
+
+        for parent_id in parent_ids:
+            parent_uids = _inquiry_parent_cache.get(parent_id)
+
+            if parent_uids:
+                result[parent_id] = parent_uids
+            else:
+                missing_parent_ids.append(parent_id)
+
+        if not missing_parent_ids:
+            return result
+
+        object_ids = []
+        for parent_id in set(missing_parent_ids):
+            try:
+                object_ids.append(ObjectId(parent_id))
+            except InvalidId:
+                LOG.warning('Invalid inquiry parent execution id "%s"' % (parent_id))
+
+        collection = ActionExecutionDB._get_collection()
+        cursor = collection.find(
+            {"_id": {"$in": object_ids}}, projection={"action.pack": 1, "action.uid": 1}
+        )
+
+        for document in cursor:
+            parent_id = str(document["_id"])
+            action = document.get("action") or {}
+
+            if not action.get("pack") or not action.get("uid"):
+                LOG.warning(
+                    'Inquiry parent execution "%s" is missing action reference' % (parent_id)
+                )
+                continue
+
+            pack_uid = get_pack_uid(pack_ref=action["pack"])
+            parent_uids = (action["uid"], pack_uid)
+
+            _inquiry_parent_cache.set(parent_id, parent_uids)
+            result[parent_id] = parent_uids
+
+        return result
+
+
+# Bounded cache of inquiry parent workflow execution id to (action_uid, pack_uid)
+_inquiry_parent_cache = LRUCache(max_size=INQUIRY_PARENT_CACHE_SIZE, ttl=INQUIRY_PARENT_CACHE_TTL)
+
+# Maps resource type to a resolver instance. Resolvers are stateless which means a single instance
+# can be shared by all the callers.
+_RESOLVERS_REGISTRY = {}
+
+# Maps permission type to a resolver instance. Populated on registration and lazily for permission
+# types which belong to resource types registered by third parties.
+_PERMISSION_TYPE_TO_RESOLVER_MAP = {}
+
+
+def register_resolver(resource_type, resolver_cls):
+    """
+    Register resolver class for the provided resource type.
+
+    This can also be used by third parties to register resolvers for custom resource types or to
+    override the default resolver for a particular resource type.
+
+    :param resource_type: Resource type.
+    :type resource_type: ``str``
+
+    :param resolver_cls: Resolver class.
+    :type resolver_cls: ``type``
+    """
+    _RESOLVERS_REGISTRY[resource_type] = resolver_cls()
+
+    # Permission types need to be re-mapped to pick up the new resolver
+    _PERMISSION_TYPE_TO_RESOLVER_MAP.clear()
+
+    for permission_type in PermissionType.get_valid_values():
+        permission_resource_type = PermissionType.get_resource_type(permission_type=permission_type)
+        resolver_instance = _RESOLVERS_REGISTRY.get(permission_resource_type, None)
+
+        if resolver_instance:
+            _PERMISSION_TYPE_TO_RESOLVER_MAP[permission_type] = resolver_instance
 
 
 def get_resolver_for_resource_type(resource_type):
@@ -1338,46 +2170,11 @@ def get_resolver_for_resource_type(resource_type):
 
     :rtype: Instance of :class:`PermissionsResolver`
     """
-    if resource_type == ResourceType.RUNNER:
-        resolver_cls = RunnerPermissionsResolver
-    elif resource_type == ResourceType.PACK:
-        resolver_cls = PackPermissionsResolver
-    elif resource_type == ResourceType.SENSOR:
-        resolver_cls = SensorPermissionsResolver
-    elif resource_type == ResourceType.ACTION:
-        resolver_cls = ActionPermissionsResolver
-    elif resource_type == ResourceType.ACTION_ALIAS:
-        resolver_cls = ActionAliasPermissionsResolver
-    elif resource_type == ResourceType.RULE:
-        resolver_cls = RulePermissionsResolver
-    elif resource_type == ResourceType.EXECUTION:
-        resolver_cls = ExecutionPermissionsResolver
-    elif resource_type == ResourceType.KEY_VALUE_PAIR:
-        resolver_cls = KeyValuePermissionsResolver
-    elif resource_type == ResourceType.WEBHOOK:
-        resolver_cls = WebhookPermissionsResolver
-    elif resource_type == ResourceType.TIMER:
-        resolver_cls = TimerPermissionsResolver
-    elif resource_type == ResourceType.API_KEY:
-        resolver_cls = ApiKeyPermissionResolver
-    elif resource_type == ResourceType.RULE_ENFORCEMENT:
-        resolver_cls = RuleEnforcementPermissionsResolver
-    elif resource_type == ResourceType.TRACE:
-        resolver_cls = TracePermissionsResolver
-    elif resource_type == ResourceType.TRIGGER:
-        resolver_cls = TriggerPermissionsResolver
-    elif resource_type == ResourceType.POLICY_TYPE:
-        resolver_cls = PolicyTypePermissionsResolver
-    elif resource_type == ResourceType.POLICY:
-        resolver_cls = PolicyPermissionsResolver
-    elif resource_type == ResourceType.STREAM:
-        resolver_cls = StreamPermissionsResolver
-    elif resource_type == ResourceType.INQUIRY:
-        resolver_cls = InquiryPermissionsResolver
-    else:
+    resolver_instance = _RESOLVERS_REGISTRY.get(resource_type, None)
+
+    if not resolver_instance:
         raise ValueError("Unsupported resource: %s" % (resource_type))
 
-    resolver_instance = resolver_cls()
     return resolver_instance
 
 
@@ -1387,6 +2184,39 @@ def get_resolver_for_permission_type(permission_type):
 
     :rtype: Instance of :class:`PermissionsResolver`
     """
-    resource_type = PermissionType.get_resource_type(permission_type=permission_type)
-    resolver_instance = get_resolver_for_resource_type(resource_type=resource_type)
+    resolver_instance = _PERMISSION_TYPE_TO_RESOLVER_MAP.get(permission_type, None)
+
+    if not resolver_instance:
+        resource_type = PermissionType.get_resource_type(permission_type=permission_type)
+        resolver_instance = get_resolver_for_resource_type(resource_type=resource_type)
+        _PERMISSION_TYPE_TO_RESOLVER_MAP[permission_type] = resolver_instance
+
     return resolver_instance
+
+
+def _allow_all(resource_db):
+    return True
+
+
+def _deny_all(resource_db):
+    return False
+
+
+register_resolver(ResourceType.RUNNER, RunnerPermissionsResolver)
+register_resolver(ResourceType.PACK, PackPermissionsResolver)
+register_resolver(ResourceType.SENSOR, SensorPermissionsResolver)
+register_resolver(ResourceType.ACTION, ActionPermissionsResolver)
+register_resolver(ResourceType.ACTION_ALIAS, ActionAliasPermissionsResolver)
+register_resolver(ResourceType.RULE, RulePermissionsResolver)
+register_resolver(ResourceType.EXECUTION, ExecutionPermissionsResolver)
+register_resolver(ResourceType.KEY_VALUE_PAIR, KeyValuePermissionsResolver)
+register_resolver(ResourceType.WEBHOOK, WebhookPermissionsResolver)
+register_resolver(ResourceType.TIMER, TimerPermissionsResolver)
+register_resolver(ResourceType.API_KEY, ApiKeyPermissionResolver)
+register_resolver(ResourceType.RULE_ENFORCEMENT, RuleEnforcementPermissionsResolver)
+register_resolver(ResourceType.TRACE, TracePermissionsResolver)
+register_resolver(ResourceType.TRIGGER, TriggerPermissionsResolver)
+register_resolver(ResourceType.POLICY_TYPE, PolicyTypePermissionsResolver)
+register_resolver(ResourceType.POLICY, PolicyPermissionsResolver)
+register_resolver(ResourceType.STREAM, StreamPermissionsResolver)
+register_resolver(ResourceType.INQUIRY, InquiryPermissionsResolver)
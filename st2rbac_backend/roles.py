@@ -0,0 +1,94 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing a value object which represents the effective roles of a particular user.
+"""
+
+from __future__ import absolute_import
+
+from st2common.rbac.types import SystemRole
+
+__all__ = ["UserRoleSet"]
+
+
+class UserRoleSet(object):
+    """
+    Set of the roles assigned to a particular user with precomputed system role flags.
+
+    Role checks (e.g. RBACUtils.user_is_admin and the resolvers system role checks) retrieve the
+    role set once and then only perform constant time lookups on it.
+    """
+
+    __slots__ = [
+        "username",
+        "role_names",
+        "is_system_admin",
+        "is_admin",
+        "is_observer",
+        "has_system_role",
+    ]
+
+    def __init__(self, username, role_names):
+        """
+        :param username: Name of the user the roles belong to.
+        :type username: ``str``
+
+        :param role_names: Names of the roles assigned to the user.
+        :type role_names: ``iterable`` of ``str``
+        """
+        self.username = username
+        self.role_names = frozenset(role_names)
+
+        # Note: System admin also has all the admin permissions
+        self.is_system_admin = SystemRole.SYSTEM_ADMIN in self.role_names
+        self.is_admin = self.is_system_admin or SystemRole.ADMIN in self.role_names
+        self.is_observer = SystemRole.OBSERVER in self.role_names
+        self.has_system_role = self.is_admin or self.is_observer
+
+    def has_role(self, role_name):
+        """
+        :rtype: ``bool``
+        """
+        return role_name in self.role_names
+
+    def __contains__(self, role_name):
+        return role_name in self.role_names
+
+    def __iter__(self):
+        return iter(self.role_names)
+
+    def __len__(self):
+        return len(self.role_names)
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRoleSet):
+            return NotImplemented
+
+        return self.username == other.username and self.role_names == other.role_names
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def __hash__(self):
+        return hash((self.username, self.role_names))
+
+    def __repr__(self):
+        return "UserRoleSet(username=%r, role_names=%r)" % (self.username, sorted(self.role_names))
@@ -0,0 +1,188 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing request scoped memoization of RBAC lookups.
+
+Inside a request scope, roles and permission grants for a particular user are retrieved from the
+database at most once and all the subsequent lookups for the same user are served from memory.
+Scope data is discarded as soon as the scope is exited which means there are no staleness
+concerns across requests.
+
+Implicit scopes (ones which are entered by the request_scoped decorator around a single RBACUtils
+call) only memoize user roles. Retrieving all the user permission grants upfront only pays off
+when there are many checks for the same user so that is only done inside an explicit scope (e.g.
+one entered by RequestScopeMiddleware or around a batch of checks).
+"""
+
+from __future__ import absolute_import
+
+import functools
+import contextlib
+import contextvars
+
+__all__ = [
+    "RequestScope",
+    "RequestScopeMiddleware",
+    "request_scope",
+    "request_scoped",
+    "get_request_scope",
+]
+
+_request_scope = contextvars.ContextVar("rbac_request_scope", default=None)
+
+
+class RequestScope(object):
+    """
+    Container for RBAC data which has been retrieved during a single request.
+    """
+
+    def __init__(self, implicit=False):
+        # True if the scope has been entered implicitly around a single RBACUtils call
+        self.implicit = implicit
+
+        # Maps username to :class:`UserPermissions`
+        self.user_permissions = {}
+
+        # Maps username to :class:`UserRoleSet`
+        self.user_role_sets = {}
+
+    def invalidate(self, username=None, role_name=None):
+        if username:
+            self.user_permissions.pop(username, None)
+            self.user_role_sets.pop(username, None)
+        elif role_name:
+            for key, user_permissions in list(self.user_permissions.items()):
+                role_names = [role_db.name for role_db in user_permissions.role_dbs]
+
+                if role_name in role_names:
+                    self.user_permissions.pop(key, None)
+
+            for key, user_role_set in list(self.user_role_sets.items()):
+                if role_name in user_role_set:
+                    self.user_role_sets.pop(key, None)
+        else:
+            self.user_permissions.clear()
+            self.user_role_sets.clear()
+
+
+@contextlib.contextmanager
+def request_scope(implicit=False):
+    """
+    Context manager which activates a request scope for the current context.
+
+    Nested usage re-uses the outer scope, unless the outer scope is implicit and the nested one
+    isn't.
+
+    :param implicit: True if the scope is entered implicitly around a single RBACUtils call.
+    :type implicit: ``bool``
+    """
+    scope = _request_scope.get()
+
+    if scope is not None and (implicit or not scope.implicit):
+        yield scope
+        return
+
+    scope = RequestScope(implicit=implicit)
+
+    with _activate_request_scope(scope):
+        yield scope
+
+
+@contextlib.contextmanager
+def _activate_request_scope(scope):
+    """
+    Context manager which activates an existing request scope for the current context.
+    """
+    token = _request_scope.set(scope)
+
+    try:
+        yield scope
+    finally:
+        _request_scope.reset(token)
+
+
+def request_scoped(func):
+    """
+    Decorator which runs the decorated function inside an (implicit) request scope.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_scope(implicit=True):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def get_request_scope():
+    """
+    Return currently active request scope or None if there is no active scope.
+
+    :rtype: :class:`RequestScope` or ``None``
+    """
+    return _request_scope.get()
+
+
+class RequestScopeMiddleware(object):
+    """
+    WSGI middleware which runs each request inside a RBAC request scope.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        with request_scope() as scope:
+            result = self.app(environ, start_response)
+
+        # Lists and tuples are already fully generated, other iterables (e.g. st2stream event
+        # generators) need the scope while they are being iterated over
+        if isinstance(result, (list, tuple)):
+            return result
+
+        return _RequestScopedResponse(result=result, scope=scope)
+
+
+class _RequestScopedResponse(object):
+    """
+    WSGI response iterable which activates the request scope each time the wrapped response is
+    iterated over or closed.
+
+    Note: Scope is only active while the next chunk is being generated so it doesn't leak into the
+    server code which runs between the chunks.
+    """
+
+    def __init__(self, result, scope):
+        self._result = result
+        self._scope = scope
+        self._iterator = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with _activate_request_scope(self._scope):
+            if self._iterator is None:
+                self._iterator = iter(self._result)
+
+            return next(self._iterator)
+
+    def close(self):
+        close = getattr(self._result, "close", None)
+
+        if close is not None:
+            with _activate_request_scope(self._scope):
+                close()
@@ -19,8 +19,11 @@ Module containing utility RBAC service related functions.
 
 from __future__ import absolute_import
 
+from itertools import chain
+
 from mongoengine.queryset.visitor import Q
 from mongoengine import NotUniqueError
+from oslo_config import cfg
 
 from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
@@ -36,6 +39,18 @@ from st2common.models.db.rbac import GroupToRoleMappingDB
 from st2common.exceptions.db import StackStormDBObjectConflictError
 from st2common.rbac.backends.base import BaseRBACService
 
+from st2rbac_backend.cache import UserPermissions
+from st2rbac_backend.claims import RoleClaims
+from st2rbac_backend.claims import get_trusted_role_claims
+from st2rbac_backend.cache import get_user_permissions_cache
+from st2rbac_backend.events import notify_rbac_change
+from st2rbac_backend.generation import get_rbac_generation
+from st2rbac_backend.patterns import get_permission_grant_patterns_matcher
+from st2rbac_backend.roles import UserRoleSet
+from st2rbac_backend.scope import get_request_scope
+from st2rbac_backend.snapshot import get_permission_snapshot
+from st2rbac_backend.snapshot import filter_permission_grants
+
 
 __all__ = ["RBACService"]
 
@@ -81,6 +96,16 @@ class RBACService(BaseRBACService):
 
         :rtype: ``list`` of :class:`RoleDB`
         """
+        snapshot = get_permission_snapshot()
+        if snapshot is not None:
+            return snapshot.get_roles_for_user(username=user_db.name, include_remote=include_remote)
+
+        if include_remote and _use_user_permissions():
+            user_permissions = _get_user_permissions(
+                user_db=user_db, include_permission_grants=False
+            )
+            return list(user_permissions.role_dbs)
+
         if include_remote:
             queryset = UserRoleAssignment.query(user=user_db.name)
         else:
@@ -95,6 +120,78 @@ class RBACService(BaseRBACService):
         result = Role.query(name__in=role_names)
         return result
 
+    @staticmethod
+    def get_role_names_for_user(user_db, include_remote=True):
+        """
+        Retrieve names of all the roles assigned to the provided user.
+
+        Unlike get_roles_for_user, this method uses trusted role claims which are bound to the
+        current request (if any) so no database queries are needed.
+
+        :rtype: ``frozenset`` of ``str``
+        """
+        if include_remote:
+            role_claims = get_trusted_role_claims(username=user_db.name)
+
+            if role_claims is not None:
+                return role_claims.role_names
+
+        snapshot = get_permission_snapshot()
+        if snapshot is not None:
+            return snapshot.get_role_names_for_user(
+                username=user_db.name, include_remote=include_remote
+            )
+
+        role_dbs = RBACService.get_roles_for_user(user_db=user_db, include_remote=include_remote)
+        return frozenset([role_db.name for role_db in role_dbs])
+
+    @staticmethod
+    def get_role_set_for_user(user_db):
+        """
+        Retrieve effective roles of the provided user as a role set.
+
+        Inside a request scope, the role set is memoized so all the role checks for the same user
+        during a single request share a single lookup.
+
+        :rtype: :class:`UserRoleSet`
+        """
+        scope = get_request_scope()
+
+        if scope is not None:
+            user_role_set = scope.user_role_sets.get(user_db.name, None)
+
+            if user_role_set is not None:
+                return user_role_set
+
+        role_names = RBACService.get_role_names_for_user(user_db=user_db)
+        user_role_set = UserRoleSet(username=user_db.name, role_names=role_names)
+
+        if scope is not None:
+            scope.user_role_sets[user_db.name] = user_role_set
+
+        return user_role_set
+
+    @staticmethod
+    def get_role_claims_for_user(user_db):
+        """
+        Compute role claims (effective role names and the current RBAC generation) for the
+        provided user which can be stored in the auth token.
+
+        Note: Data is always retrieved from the database since claims can be trusted for a long
+        time.
+
+        :rtype: :class:`RoleClaims`
+        """
+        # Note: Generation is retrieved before the roles so concurrent changes invalidate claims
+        generation = get_rbac_generation()
+        role_dbs = _load_role_dbs_for_user(user_db=user_db, use_role_claims=False)
+
+        return RoleClaims(
+            username=user_db.name,
+            role_names=frozenset([role_db.name for role_db in role_dbs]),
+            generation=generation,
+        )
+
     @staticmethod
     def get_all_role_assignments(include_remote=True):
         """
@@ -160,6 +257,11 @@ class RBACService(BaseRBACService):
 
         role_db = RoleDB(name=name, description=description)
         role_db = Role.add_or_update(role_db)
+
+        # Note: Role assignments reference roles by name and can exist before the role itself (e.g.
+        # remote group mappings). Cached entries of those users don't reference the new role so
+        # everything needs to be invalidated
+        notify_rbac_change()
         return role_db
 
     @staticmethod
@@ -172,6 +274,8 @@ class RBACService(BaseRBACService):
 
         role_db = Role.get(name=name)
         result = Role.delete(role_db)
+
+        notify_rbac_change(role_name=role_db.name)
         return result
 
     @staticmethod
@@ -223,6 +327,7 @@ class RBACService(BaseRBACService):
                 user=user_db.name, role=role_db.name, source=source, description=description
             ).first()
 
+        notify_rbac_change(username=user_db.name)
         return role_assignment_db
 
     @staticmethod
@@ -241,6 +346,8 @@ class RBACService(BaseRBACService):
         for role_assignment_db in role_assignment_dbs:
             UserRoleAssignment.delete(role_assignment_db)
 
+        notify_rbac_change(username=user_db.name)
+
     @staticmethod
     def get_all_permission_grants_for_user(
         user_db, resource_uid=None, resource_types=None, permission_types=None
@@ -257,25 +364,170 @@ class RBACService(BaseRBACService):
 
         :rtype: ``list`` or :class:`PermissionGrantDB`
         """
-        role_names = UserRoleAssignment.query(user=user_db.name).only("role").scalar("role")
-        permission_grant_ids = Role.query(name__in=role_names).scalar("permission_grants")
-        permission_grant_ids = sum(permission_grant_ids, [])
-
-        permission_grants_filters = {}
-        permission_grants_filters["id__in"] = permission_grant_ids
-
-        if resource_uid:
-            permission_grants_filters["resource_uid"] = resource_uid
+        snapshot = get_permission_snapshot()
+        if snapshot is not None:
+            return snapshot.get_permission_grants_for_user(
+                username=user_db.name,
+                resource_uid=resource_uid,
+                resource_types=resource_types,
+                permission_types=permission_types,
+            )
 
-        if resource_types:
-            permission_grants_filters["resource_type__in"] = resource_types
+        if _use_user_permissions():
+            return filter_permission_grants(
+                permission_grant_dbs=_get_user_permissions(user_db=user_db).permission_grant_dbs,
+                resource_uid=resource_uid,
+                resource_types=resource_types,
+                permission_types=permission_types,
+            )
 
-        if permission_types:
-            permission_grants_filters["permission_types__in"] = permission_types
+        if cfg.CONF.rbac.permission_grants_query_mode == "aggregate":
+            return _aggregate_permission_grant_dbs_for_user(
+                user_db=user_db,
+                resource_uid=resource_uid,
+                resource_types=resource_types,
+                permission_types=permission_types,
+            )
 
+        permission_grants_filters = _get_permission_grants_filters_for_user(
+            user_db=user_db,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+        )
         permission_grant_dbs = PermissionGrant.query(**permission_grants_filters)
         return permission_grant_dbs
 
+    @staticmethod
+    def user_has_matching_permission_grant(
+        user_db, resource_uid=None, resource_types=None, permission_types=None
+    ):
+        """
+        Return True if the user has at least one permission grant which matches the provided
+        filters.
+
+        Unlike get_all_permission_grants_for_user, this method doesn't retrieve all the matching
+        grants, it stops as soon as the first matching grant is found.
+
+        Note: If pattern grants are enabled, resource uid is also matched against pattern grants.
+
+        :rtype: ``bool``
+        """
+        has_permission_grant = _user_has_exact_matching_permission_grant(
+            user_db=user_db,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+        )
+
+        if has_permission_grant or not resource_uid:
+            return has_permission_grant
+
+        return _user_has_matching_pattern_grant(
+            user_db=user_db,
+            resources=[(resource_uid, resource_types)],
+            permission_types=permission_types,
+        )
+
+    @staticmethod
+    def user_has_matching_permission_grant_for_resources(
+        user_db, resources, permission_types=None
+    ):
+        """
+        Return True if the user has at least one permission grant on any of the provided resources.
+
+        This allows callers to check grants on a resource and on its parent resources (e.g. pack)
+        using a single lookup.
+
+        :param resources: List of (resource_uid, resource_type) tuples.
+        :type resources: ``list`` of ``tuple``
+
+        :rtype: ``bool``
+        """
+        has_permission_grant = _user_has_exact_matching_permission_grant_for_resources(
+            user_db=user_db, resources=resources, permission_types=permission_types
+        )
+
+        if has_permission_grant or not resources:
+            return has_permission_grant
+
+        resources = [(resource_uid, [resource_type]) for resource_uid, resource_type in resources]
+        return _user_has_matching_pattern_grant(
+            user_db=user_db, resources=resources, permission_types=permission_types
+        )
+
+    @staticmethod
+    def get_role_names_for_resources(resources, permission_types):
+        """
+        Return names of the roles which have been granted one of the provided permission types on
+        one of the provided resources (inverse of user_has_matching_permission_grant_for_resources).
+
+        Note: System roles have no grants and are not included.
+
+        :param resources: List of (resource_uid, resource_type) tuples. None resource uid refers to
+                          global grants.
+        :type resources: ``list`` of ``tuple``
+
+        :rtype: ``set`` of ``str``
+        """
+        index = get_permission_snapshot(force=True).get_inverted_index()
+        return index.get_role_names(
+            resources=resources,
+            permission_types=permission_types,
+            match_patterns=cfg.CONF.rbac.permission_grant_patterns_enable,
+        )
+
+    @staticmethod
+    def get_usernames_for_resources(resources, permission_types, system_role_names=None):
+        """
+        Return names of the users which have been granted one of the provided permission types on
+        one of the provided resources (e.g. st2stream subscribers which can see an execution).
+
+        The answer comes from an inverted index which is built from the permission snapshot so the
+        cost is proportional to the size of the result and not to the number of users.
+
+        :param resources: List of (resource_uid, resource_type) tuples. None resource uid refers to
+                          global grants.
+        :type resources: ``list`` of ``tuple``
+
+        :param system_role_names: Names of the system roles whose members should also be included.
+        :type system_role_names: ``list`` of ``str``
+
+        :rtype: ``set`` of ``str``
+        """
+        index = get_permission_snapshot(force=True).get_inverted_index()
+        return index.get_usernames(
+            resources=resources,
+            permission_types=permission_types,
+            system_role_names=system_role_names,
+            match_patterns=cfg.CONF.rbac.permission_grant_patterns_enable,
+        )
+
+    @staticmethod
+    def get_permission_grant_patterns_matcher_for_role(role_db):
+        """
+        Return compiled matcher for the pattern grants of the provided role.
+
+        Matchers are cached by role permission grant ids so they are only compiled once.
+
+        :rtype: :class:`PermissionGrantPatternsMatcher` or ``None``
+        """
+        permission_grant_ids = tuple(role_db.permission_grants or [])
+
+        if not permission_grant_ids:
+            return None
+
+        def get_permission_grant_dbs():
+            snapshot = get_permission_snapshot()
+            if snapshot is not None:
+                return snapshot.get_permission_grants_for_role(role_name=role_db.name)
+
+            return PermissionGrant.query(id__in=list(permission_grant_ids))
+
+        return get_permission_grant_patterns_matcher(
+            cache_key=permission_grant_ids, get_permission_grant_dbs=get_permission_grant_dbs
+        )
+
     @staticmethod
     def create_permission_grant_for_resource_db(role_db, resource_db, permission_types):
         """
@@ -321,6 +573,7 @@ class RBACService(BaseRBACService):
         # Add assignment to the role
         role_db.update(push__permission_grants=str(permission_grant_db.id))
 
+        notify_rbac_change(role_name=role_db.name)
         return permission_grant_db
 
     @staticmethod
@@ -348,6 +601,7 @@ class RBACService(BaseRBACService):
         # Remove assignment from a role
         role_db.update(pull__permission_grants=str(permission_grant_db.id))
 
+        notify_rbac_change(role_name=role_db.name)
         return permission_grant_db
 
     @staticmethod
@@ -383,6 +637,342 @@ class RBACService(BaseRBACService):
                 raise ValueError('Role "%s" doesn\'t exist in the database' % (role_name))
 
 
+def _use_user_permissions():
+    """
+    Return True if user roles and permission grants should be retrieved using
+    _get_user_permissions (there is an active explicit request scope or per-user cache is
+    enabled).
+
+    Note: Implicit scopes around a single RBACUtils call use existence-only queries instead since
+    retrieving all the user permission grants doesn't pay off for a single check.
+    """
+    scope = get_request_scope()
+
+    if scope is not None and not scope.implicit:
+        return True
+
+    return get_user_permissions_cache() is not None
+
+
+def _get_user_permissions(user_db, include_permission_grants=True):
+    """
+    Retrieve effective roles and permission grants for the provided user from the active request
+    scope or the per-user cache, loading them from the database on a miss.
+
+    Note: Permission grants are loaded lazily, only when they are needed for the first time.
+
+    :rtype: :class:`UserPermissions`
+    """
+    scope = get_request_scope()
+    cache = get_user_permissions_cache()
+
+    user_permissions = None
+    if scope is not None:
+        user_permissions = scope.user_permissions.get(user_db.name, None)
+
+    if user_permissions is None and cache is not None:
+        user_permissions = cache.get(user_db.name)
+
+    updated = False
+
+    if user_permissions is None:
+        role_dbs = _load_role_dbs_for_user(user_db=user_db)
+        user_permissions = UserPermissions(role_dbs=role_dbs, permission_grant_dbs=None)
+        updated = True
+
+    if include_permission_grants and user_permissions.permission_grant_dbs is None:
+        permission_grant_dbs = _load_permission_grant_dbs_for_roles(
+            role_dbs=user_permissions.role_dbs
+        )
+        user_permissions = user_permissions._replace(permission_grant_dbs=permission_grant_dbs)
+        updated = True
+
+    if updated and cache is not None:
+        cache.set(user_db.name, user_permissions)
+
+    if scope is not None:
+        scope.user_permissions[user_db.name] = user_permissions
+
+    return user_permissions
+
+
+def _load_role_dbs_for_user(user_db, use_role_claims=True):
+    """
+    :param use_role_claims: True to use trusted role claims (if available) instead of retrieving
+                            user role assignments from the database.
+    :type use_role_claims: ``bool``
+
+    :rtype: ``tuple`` of :class:`RoleDB`
+    """
+    role_claims = None
+
+    if use_role_claims:
+        role_claims = get_trusted_role_claims(username=user_db.name)
+
+    if role_claims is not None:
+        role_names = list(role_claims.role_names)
+    else:
+        role_names = UserRoleAssignment.query(user=user_db.name).only("role").scalar("role")
+
+    return tuple(Role.query(name__in=role_names))
+
+
+def _load_permission_grant_dbs_for_roles(role_dbs):
+    """
+    :rtype: ``tuple`` of :class:`PermissionGrantDB`
+    """
+    permission_grant_ids = [role_db.permission_grants or [] for role_db in role_dbs]
+    permission_grant_ids = list(set(chain.from_iterable(permission_grant_ids)))
+    return tuple(PermissionGrant.query(id__in=permission_grant_ids))
+
+
+def _user_has_exact_matching_permission_grant(
+    user_db, resource_uid=None, resource_types=None, permission_types=None
+):
+    """
+    Return True if the user has a permission grant which matches the provided filters (pattern
+    grants are not taken into account).
+
+    :rtype: ``bool``
+    """
+    snapshot = get_permission_snapshot()
+    if snapshot is not None:
+        return snapshot.user_has_permission_grant(
+            username=user_db.name,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+        )
+
+    if _use_user_permissions():
+        permission_grant_dbs = filter_permission_grants(
+            permission_grant_dbs=_get_user_permissions(user_db=user_db).permission_grant_dbs,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+            limit=1,
+        )
+        return len(permission_grant_dbs) >= 1
+
+    if cfg.CONF.rbac.permission_grants_query_mode == "aggregate":
+        permission_grant_dbs = _aggregate_permission_grant_dbs_for_user(
+            user_db=user_db,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+            limit=1,
+        )
+        return len(permission_grant_dbs) >= 1
+
+    permission_grants_filters = _get_permission_grants_filters_for_user(
+        user_db=user_db,
+        resource_uid=resource_uid,
+        resource_types=resource_types,
+        permission_types=permission_types,
+    )
+    permission_grant_db = PermissionGrant.query(**permission_grants_filters).only("id").first()
+    return permission_grant_db is not None
+
+
+def _user_has_exact_matching_permission_grant_for_resources(
+    user_db, resources, permission_types=None
+):
+    """
+    Return True if the user has a permission grant on any of the provided resources (pattern
+    grants are not taken into account).
+
+    :rtype: ``bool``
+    """
+    if not resources:
+        return False
+
+    snapshot = get_permission_snapshot()
+    if snapshot is not None:
+        for resource_uid, resource_type in resources:
+            has_permission_grant = snapshot.user_has_permission_grant(
+                username=user_db.name,
+                resource_uid=resource_uid,
+                resource_types=[resource_type],
+                permission_types=permission_types,
+            )
+
+            if has_permission_grant:
+                return True
+
+        return False
+
+    if _use_user_permissions():
+        user_permissions = _get_user_permissions(user_db=user_db)
+
+        for resource_uid, resource_type in resources:
+            permission_grant_dbs = filter_permission_grants(
+                permission_grant_dbs=user_permissions.permission_grant_dbs,
+                resource_uid=resource_uid,
+                resource_types=[resource_type],
+                permission_types=permission_types,
+                limit=1,
+            )
+
+            if len(permission_grant_dbs) >= 1:
+                return True
+
+        return False
+
+    if cfg.CONF.rbac.permission_grants_query_mode == "aggregate":
+        permission_grant_dbs = _aggregate_permission_grant_dbs_for_user(
+            user_db=user_db, resources=resources, permission_types=permission_types, limit=1
+        )
+        return len(permission_grant_dbs) >= 1
+
+    resources_filter = None
+    for resource_uid, resource_type in resources:
+        resource_filter = Q(resource_uid=resource_uid, resource_type=resource_type)
+
+        if resources_filter is None:
+            resources_filter = resource_filter
+        else:
+            resources_filter = resources_filter | resource_filter
+
+    permission_grants_filters = _get_permission_grants_filters_for_user(
+        user_db=user_db, permission_types=permission_types
+    )
+    permission_grant_db = (
+        PermissionGrant.query(resources_filter, **permission_grants_filters).only("id").first()
+    )
+    return permission_grant_db is not None
+
+
+def _user_has_matching_pattern_grant(user_db, resources, permission_types=None):
+    """
+    Return True if any of the pattern grants assigned to the user matches any of the provided
+    resources.
+
+    :param resources: List of (resource_uid, resource_types) tuples.
+    :type resources: ``list`` of ``tuple``
+
+    :rtype: ``bool``
+    """
+    if not cfg.CONF.rbac.permission_grant_patterns_enable:
+        return False
+
+    for role_db in RBACService.get_roles_for_user(user_db=user_db):
+        matcher = RBACService.get_permission_grant_patterns_matcher_for_role(role_db=role_db)
+
+        if not matcher:
+            continue
+
+        for resource_uid, resource_types in resources:
+            if matcher.matches(
+                resource_uid=resource_uid,
+                resource_types=resource_types,
+                permission_types=permission_types,
+            ):
+                return True
+
+    return False
+
+
+def _get_permission_grants_filters_for_user(
+    user_db, resource_uid=None, resource_types=None, permission_types=None
+):
+    """
+    Return query filters which match permission grants of the provided user.
+
+    :rtype: ``dict``
+    """
+    role_names = UserRoleAssignment.query(user=user_db.name).only("role").scalar("role")
+    permission_grant_ids = Role.query(name__in=role_names).scalar("permission_grants")
+    permission_grant_ids = list(chain.from_iterable(permission_grant_ids))
+
+    permission_grants_filters = {}
+    permission_grants_filters["id__in"] = permission_grant_ids
+
+    if resource_uid:
+        permission_grants_filters["resource_uid"] = resource_uid
+
+    if resource_types:
+        permission_grants_filters["resource_type__in"] = resource_types
+
+    if permission_types:
+        permission_grants_filters["permission_types__in"] = permission_types
+
+    return permission_grants_filters
+
+
+def _aggregate_permission_grant_dbs_for_user(
+    user_db,
+    resource_uid=None,
+    resource_types=None,
+    permission_types=None,
+    resources=None,
+    limit=None,
+):
+    """
+    Retrieve permission grants for the provided user using a single aggregation pipeline which
+    performs role assignment -> role -> permission grant joins on the database server.
+
+    :param resources: Optional list of (resource_uid, resource_type) tuples. If provided, only
+                      grants on one of those resources are returned.
+    :type resources: ``list`` of ``tuple``
+
+    :rtype: ``list`` of :class:`PermissionGrantDB`
+    """
+    permission_grants_match = {}
+
+    if resources:
+        permission_grants_match["$or"] = [
+            {"resource_uid": resource_uid, "resource_type": resource_type}
+            for resource_uid, resource_type in resources
+        ]
+
+    if resource_uid:
+        permission_grants_match["resource_uid"] = resource_uid
+
+    if resource_types:
+        permission_grants_match["resource_type"] = {"$in": list(resource_types)}
+
+    if permission_types:
+        permission_grants_match["permission_types"] = {"$in": list(permission_types)}
+
+    pipeline = [
+        {"$match": {"user": user_db.name}},
+        {
+            "$lookup": {
+                "from": RoleDB._get_collection_name(),
+                "localField": "role",
+                "foreignField": "name",
+                "as": "role",
+            }
+        },
+        {"$unwind": "$role"},
+        {"$unwind": "$role.permission_grants"},
+        # The same grant can be assigned to multiple roles
+        {"$group": {"_id": "$role.permission_grants"}},
+        # Role references grants by string id
+        {"$addFields": {"permission_grant_id": {"$toObjectId": "$_id"}}},
+        {
+            "$lookup": {
+                "from": PermissionGrantDB._get_collection_name(),
+                "localField": "permission_grant_id",
+                "foreignField": "_id",
+                "as": "permission_grant",
+            }
+        },
+        {"$unwind": "$permission_grant"},
+        {"$replaceRoot": {"newRoot": "$permission_grant"}},
+    ]
+
+    if permission_grants_match:
+        pipeline.append({"$match": permission_grants_match})
+
+    if limit:
+        pipeline.append({"$limit": limit})
+
+    collection = UserRoleAssignmentDB._get_collection()
+    result = [PermissionGrantDB._from_son(son) for son in collection.aggregate(pipeline)]
+    return result
+
+
 def _validate_resource_type(resource_db):
     """
     Validate that the permissions can be manipulated for the provided resource type.
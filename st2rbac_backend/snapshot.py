@@ -0,0 +1,390 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing an immutable in-memory snapshot of the RBAC policy (roles, user role assignments
+and permission grants) which allows permission checks to be resolved without hitting the database.
+"""
+
+from __future__ import absolute_import
+
+import time
+import threading
+import contextlib
+import contextvars
+from collections import defaultdict
+
+from oslo_config import cfg
+
+from st2common import log as logging
+from st2common.persistence.rbac import Role
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.generation import get_current_rbac_generation
+from st2rbac_backend.permissions import get_permission_types_mask
+
+LOG = logging.getLogger(__name__)
+
+__all__ = [
+    "PermissionSnapshot",
+    "get_permission_snapshot",
+    "invalidate_permission_snapshot",
+    "use_permission_snapshot",
+    "filter_permission_grants",
+]
+
+# Process wide snapshot which is lazily (re-)built when "permission_snapshot_enable" is set
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+# Snapshot which has been explicitly pinned for the current context (e.g. tests, async checks)
+_pinned_snapshot = contextvars.ContextVar("rbac_pinned_permission_snapshot", default=None)
+
+
+class PermissionSnapshot(object):
+    """
+    Immutable in-memory view of all the roles, user role assignments and permission grants.
+
+    Permission grants are indexed by (user, resource_type, resource_uid) and a mask of granted
+    permission types so checks which are normally answered by
+    RBACService.get_all_permission_grants_for_user can be answered with a dict lookup, a bitwise
+    AND and zero database queries.
+    """
+
+    def __init__(
+        self, role_dbs, role_assignment_dbs, permission_grant_dbs, created_at=None, generation=None
+    ):
+        self.created_at = created_at if created_at is not None else time.monotonic()
+
+        # RBAC generation the snapshot has been built from (if known)
+        self.generation = generation
+
+        self._role_dbs = dict([(role_db.name, role_db) for role_db in role_dbs])
+
+        # Note: Permission grant ids are stored as strings on the RoleDB objects
+        permission_grant_dbs_by_id = {}
+        for permission_grant_db in permission_grant_dbs:
+            permission_grant_dbs_by_id[str(permission_grant_db.id)] = permission_grant_db
+
+        self._role_permission_grants = {}
+        for role_db in role_dbs:
+            grant_ids = role_db.permission_grants or []
+            self._role_permission_grants[role_db.name] = tuple(
+                [
+                    permission_grant_dbs_by_id[grant_id]
+                    for grant_id in grant_ids
+                    if grant_id in permission_grant_dbs_by_id
+                ]
+            )
+
+        user_role_names = defaultdict(set)
+        user_local_role_names = defaultdict(set)
+
+        for role_assignment_db in role_assignment_dbs:
+            # Assignments which reference roles which don't exist are ignored (same as
+            # RBACService.get_roles_for_user)
+            if role_assignment_db.role not in self._role_dbs:
+                continue
+
+            user_role_names[role_assignment_db.user].add(role_assignment_db.role)
+
+            if not getattr(role_assignment_db, "is_remote", False):
+                user_local_role_names[role_assignment_db.user].add(role_assignment_db.role)
+
+        self._user_role_names = self._freeze_role_names(user_role_names)
+        self._user_local_role_names = self._freeze_role_names(user_local_role_names)
+
+        # Inverted (resource -> users) index which is lazily built on first use
+        self._inverted_index = None
+
+        self._user_permission_grants = {}
+        self._user_permission_grants_index = {}
+
+        for username, role_names in self._user_role_names.items():
+            permission_grant_dbs = self._get_permission_grants_for_roles(role_names=role_names)
+            self._user_permission_grants[username] = permission_grant_dbs
+            self._user_permission_grants_index[username] = self._build_index(
+                permission_grant_dbs=permission_grant_dbs
+            )
+
+    @classmethod
+    def build(cls):
+        """
+        Build a new snapshot using the current data from the database.
+
+        :rtype: :class:`PermissionSnapshot`
+        """
+        # Note: Generation is retrieved before the data so concurrent changes result in a rebuild
+        generation = get_current_rbac_generation()
+
+        role_dbs = list(Role.get_all())
+        role_assignment_dbs = list(UserRoleAssignment.get_all())
+        permission_grant_dbs = list(PermissionGrant.get_all())
+
+        LOG.debug(
+            "Built RBAC permission snapshot (%s roles, %s role assignments, %s grants)"
+            % (len(role_dbs), len(role_assignment_dbs), len(permission_grant_dbs))
+        )
+
+        return cls(
+            role_dbs=role_dbs,
+            role_assignment_dbs=role_assignment_dbs,
+            permission_grant_dbs=permission_grant_dbs,
+            generation=generation,
+        )
+
+    def is_expired(self, ttl):
+        """
+        Return True if this snapshot is older than the provided TTL (in seconds).
+        """
+        return (time.monotonic() - self.created_at) >= ttl
+
+    def get_role_names_for_user(self, username, include_remote=True):
+        """
+        :rtype: ``frozenset`` of ``str``
+        """
+        if include_remote:
+            return self._user_role_names.get(username, frozenset())
+
+        return self._user_local_role_names.get(username, frozenset())
+
+    def get_roles_for_user(self, username, include_remote=True):
+        """
+        :rtype: ``list`` of :class:`RoleDB`
+        """
+        role_names = self.get_role_names_for_user(username=username, include_remote=include_remote)
+        return [self._role_dbs[role_name] for role_name in role_names]
+
+    def get_permission_grants_for_role(self, role_name):
+        """
+        :rtype: ``tuple`` of :class:`PermissionGrantDB`
+        """
+        return self._role_permission_grants.get(role_name, ())
+
+    def get_inverted_index(self):
+        """
+        Return inverted (resource -> users and roles) permission grants index for this snapshot.
+
+        :rtype: :class:`PermissionGrantsInvertedIndex`
+        """
+        # Note: Imported here to avoid a circular import (index -> patterns -> cache -> snapshot)
+        from st2rbac_backend.index import PermissionGrantsInvertedIndex
+
+        # Note: Snapshot is immutable so a concurrent build results in an equivalent index
+        if self._inverted_index is None:
+            self._inverted_index = PermissionGrantsInvertedIndex(
+                role_permission_grants=self._role_permission_grants,
+                user_role_names=self._user_role_names,
+            )
+
+        return self._inverted_index
+
+    def get_permission_grants_for_user(
+        self, username, resource_uid=None, resource_types=None, permission_types=None
+    ):
+        """
+        Retrieve permission grants for the provided user. Filters have the same semantics as the
+        ones in RBACService.get_all_permission_grants_for_user.
+
+        :rtype: ``list`` of :class:`PermissionGrantDB`
+        """
+        permission_grant_dbs = self._user_permission_grants.get(username, ())
+        return filter_permission_grants(
+            permission_grant_dbs=permission_grant_dbs,
+            resource_uid=resource_uid,
+            resource_types=resource_types,
+            permission_types=permission_types,
+        )
+
+    def user_has_permission_grant(
+        self, username, resource_uid=None, resource_types=None, permission_types=None
+    ):
+        """
+        Return True if the user has at least one permission grant which matches the provided
+        filters.
+
+        :rtype: ``bool``
+        """
+        if not permission_types:
+            permission_grant_dbs = self.get_permission_grants_for_user(
+                username=username, resource_uid=resource_uid, resource_types=resource_types
+            )
+            return len(permission_grant_dbs) >= 1
+
+        index = self._user_permission_grants_index.get(username, None)
+
+        if not index:
+            return False
+
+        permission_types_mask = get_permission_types_mask(permission_types)
+        resource_uid = resource_uid or None
+        resource_types = resource_types or [None]
+
+        for resource_type in resource_types:
+            if index.get((resource_type, resource_uid), 0) & permission_types_mask:
+                return True
+
+        return False
+
+    def _freeze_role_names(self, user_role_names):
+        result = {}
+
+        for username, role_names in user_role_names.items():
+            result[username] = frozenset(role_names)
+
+        return result
+
+    def _get_permission_grants_for_roles(self, role_names):
+        result = []
+        seen_ids = set([])
+
+        for role_name in role_names:
+            for permission_grant_db in self._role_permission_grants.get(role_name, ()):
+                if permission_grant_db.id in seen_ids:
+                    continue
+
+                seen_ids.add(permission_grant_db.id)
+                result.append(permission_grant_db)
+
+        return tuple(result)
+
+    def _build_index(self, permission_grant_dbs):
+        """
+        Build a map of (resource_type, resource_uid) tuples to a mask of granted permission types
+        where None acts as a wildcard for the resource type and resource uid.
+        """
+        index = defaultdict(int)
+
+        for permission_grant_db in permission_grant_dbs:
+            resource_type = permission_grant_db.resource_type
+            resource_uid = permission_grant_db.resource_uid
+            permission_types_mask = get_permission_types_mask(permission_grant_db.permission_types)
+
+            if not permission_types_mask:
+                continue
+
+            index[(None, None)] |= permission_types_mask
+            index[(resource_type, None)] |= permission_types_mask
+
+            if resource_uid:
+                index[(None, resource_uid)] |= permission_types_mask
+                index[(resource_type, resource_uid)] |= permission_types_mask
+
+        return dict(index)
+
+
+def filter_permission_grants(
+    permission_grant_dbs, resource_uid=None, resource_types=None, permission_types=None, limit=None
+):
+    """
+    Filter the provided permission grants in memory.
+
+    Note: Permission types are matched using precomputed permission type masks.
+
+    :param limit: Optional maximum number of grants to return.
+    :type limit: ``int``
+
+    :rtype: ``list`` of :class:`PermissionGrantDB`
+    """
+    result = []
+    permission_types_mask = get_permission_types_mask(permission_types)
+
+    for permission_grant_db in permission_grant_dbs:
+        if resource_uid and permission_grant_db.resource_uid != resource_uid:
+            continue
+
+        if resource_types and permission_grant_db.resource_type not in resource_types:
+            continue
+
+        if permission_types_mask:
+            grant_permission_types_mask = get_permission_types_mask(
+                permission_grant_db.permission_types
+            )
+
+            if not grant_permission_types_mask & permission_types_mask:
+                continue
+
+        result.append(permission_grant_db)
+
+        if limit and len(result) >= limit:
+            break
+
+    return result
+
+
+def get_permission_snapshot(force=False):
+    """
+    Return permission snapshot which should be used for resolving permissions or None if
+    permissions should be resolved using the database.
+
+    :param force: True to return the process wide snapshot even if "permission_snapshot_enable"
+                  is not set. This is used by functionality which always needs all the RBAC data
+                  (e.g. the inverted index).
+    :type force: ``bool``
+
+    :rtype: :class:`PermissionSnapshot` or ``None``
+    """
+    global _snapshot
+
+    snapshot = _pinned_snapshot.get()
+    if snapshot is not None:
+        return snapshot
+
+    if not force and not cfg.CONF.rbac.permission_snapshot_enable:
+        return None
+
+    ttl = cfg.CONF.rbac.permission_snapshot_ttl
+    generation = get_current_rbac_generation()
+    snapshot = _snapshot
+
+    if _is_snapshot_stale(snapshot=snapshot, ttl=ttl, generation=generation):
+        with _snapshot_lock:
+            if _is_snapshot_stale(snapshot=_snapshot, ttl=ttl, generation=generation):
+                _snapshot = PermissionSnapshot.build()
+
+            snapshot = _snapshot
+
+    return snapshot
+
+
+def _is_snapshot_stale(snapshot, ttl, generation=None):
+    if snapshot is None or snapshot.is_expired(ttl=ttl):
+        return True
+
+    return generation is not None and snapshot.generation != generation
+
+
+def invalidate_permission_snapshot():
+    """
+    Invalidate process wide permission snapshot. Snapshot will be re-built on next use.
+    """
+    global _snapshot
+    _snapshot = None
+
+
+@contextlib.contextmanager
+def use_permission_snapshot(snapshot):
+    """
+    Context manager which makes all the permission checks inside the block use the provided
+    snapshot.
+    """
+    token = _pinned_snapshot.set(snapshot)
+
+    try:
+        yield snapshot
+    finally:
+        _pinned_snapshot.reset(token)
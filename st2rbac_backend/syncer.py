@@ -28,9 +28,11 @@ if six.PY3:
 else:
     from itertools import izip_longest  # pylint: disable=no-name-in-module
 
+from collections import OrderedDict
 from collections import defaultdict
 
 from mongoengine.queryset.visitor import Q
+from oslo_config import cfg
 
 from st2common import log as logging
 from st2common.models.db.auth import UserDB
@@ -43,7 +45,11 @@ from st2common.persistence.rbac import GroupToRoleMapping
 from st2common.rbac.backends.base import BaseRBACRemoteGroupToRoleSyncer
 from st2common.util.uid import parse_uid
 
+from st2rbac_backend import config  # noqa: F401 pylint: disable=unused-import
+from st2rbac_backend.loader import get_role_definitions_in_inheritance_order
 from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.events import notify_rbac_change
+from st2rbac_backend.events import suppress_rbac_change_notifications
 
 
 LOG = logging.getLogger(__name__)
@@ -74,12 +80,16 @@ class RBACDefinitionsDBSyncer(object):
         """
         result = {}
 
-        result["roles"] = self.sync_roles(role_definition_apis)
-        result["role_assignments"] = self.sync_users_role_assignments(role_assignment_apis)
-        result["group_to_role_maps"] = self.sync_group_to_role_maps(  # pylint: disable=E1111
-            group_to_role_map_apis
-        )
+        # Note: Changes are made in bulk so a single notification which invalidates everything is
+        # sent at the end instead of a notification for each created role and permission grant
+        with suppress_rbac_change_notifications():
+            result["roles"] = self.sync_roles(role_definition_apis)
+            result["role_assignments"] = self.sync_users_role_assignments(role_assignment_apis)
+            result["group_to_role_maps"] = self.sync_group_to_role_maps(  # pylint: disable=E1111
+                group_to_role_map_apis
+            )
 
+        notify_rbac_change()
         return result
 
     def sync_roles(self, role_definition_apis):
@@ -124,8 +134,10 @@ class RBACDefinitionsDBSyncer(object):
             role_db for role_db in role_dbs if role_db.name in role_names_to_delete
         ]
 
-        # Build a list of roles to create
+        # Build a list of roles to create. Roles are created in the inheritance order so grants of
+        # all the extended roles are already available when creating a role.
         role_names_to_create = new_role_names.union(updated_role_names)
+        role_definition_apis = get_role_definitions_in_inheritance_order(role_definition_apis)
         role_apis_to_create = [
             role_definition_api
             for role_definition_api in role_definition_apis
@@ -162,6 +174,7 @@ class RBACDefinitionsDBSyncer(object):
 
         # Create new roles
         created_role_dbs = []
+        created_role_dbs_map = {}
         for role_api in role_apis_to_create:
             role_db = rbac_service.create_role(name=role_api.name, description=role_api.description)
 
@@ -184,7 +197,27 @@ class RBACDefinitionsDBSyncer(object):
                 )
 
                 role_db.permission_grants.append(str(assignment_db.id))
+
+            # Store flattened transitive closure of the extended roles grants on the role so
+            # resolving role permissions stays a single lookup. Note: Grants are shared and not
+            # duplicated.
+            inherited_permission_grant_ids = []
+            for extended_role_name in getattr(role_api, "extends", None) or []:
+                extended_role_db = created_role_dbs_map[extended_role_name]
+                inherited_permission_grant_ids.extend(extended_role_db.permission_grants)
+
+            inherited_permission_grant_ids = [
+                permission_grant_id
+                for permission_grant_id in OrderedDict.fromkeys(inherited_permission_grant_ids)
+                if permission_grant_id not in role_db.permission_grants
+            ]
+
+            if inherited_permission_grant_ids:
+                role_db.update(push__permission_grants=inherited_permission_grant_ids)
+                role_db.permission_grants.extend(inherited_permission_grant_ids)
+
             created_role_dbs.append(role_db)
+            created_role_dbs_map[role_db.name] = role_db
 
         LOG.debug("Created %s new roles" % (len(created_role_dbs)))
         LOG.info(
@@ -392,6 +425,11 @@ class RBACRemoteGroupToRoleSyncer(BaseRBACRemoteGroupToRoleSyncer):
     provided by the auth backend and based on the group to role mapping definitions on disk.
     """
 
+    # Role claims for the user which has been synchronized last (only computed when
+    # "role_claims_enable" is set). Those can be stored in the token which is issued for the login
+    # using store_role_claims_in_token.
+    role_claims = None
+
     def sync(self, user_db, groups):
         """
         :param user_db: User to sync the assignments for.
@@ -421,7 +459,13 @@ class RBACRemoteGroupToRoleSyncer(BaseRBACRemoteGroupToRoleSyncer):
             LOG.debug('No group to role mappings found for user "%s"' % (str(user_db)), extra=extra)
 
         # 2. Remove all the existing remote role assignments
-        remote_assignment_dbs = UserRoleAssignment.query(user=user_db.name, is_remote=True)
+        assignment_dbs = UserRoleAssignment.query(user=user_db.name)
+        remote_assignment_dbs = [
+            assignment_db for assignment_db in assignment_dbs if assignment_db.is_remote
+        ]
+        local_role_names = set(
+            [assignment_db.role for assignment_db in assignment_dbs if not assignment_db.is_remote]
+        )
 
         existing_role_names = [assignment_db.role for assignment_db in remote_assignment_dbs]
         existing_role_names = set(existing_role_names)
@@ -463,35 +507,39 @@ class RBACRemoteGroupToRoleSyncer(BaseRBACRemoteGroupToRoleSyncer):
 
         # 3. Create role assignments for all the current groups
         created_assignments_dbs = []
-        for mapping_db in enabled_mapping_dbs:
-            extra["mapping_db"] = mapping_db
-
-            for role_name in mapping_db.roles:
-                role_db = rbac_service.get_role_by_name(name=role_name)
-
-                if not role_db:
-                    # Gracefully skip assignment for role which doesn't exist in the db
-                    LOG.info(
-                        'Role with name "%s" for mapping "%s" not found, skipping assignment.'
-                        % (role_name, str(mapping_db)),
-                        extra=extra,
-                    )
-                    continue
 
-                description = (
-                    "Automatic role assignment based on the remote user membership in "
-                    'group "%s"' % (mapping_db.group)
-                )
-                assignment_db = rbac_service.assign_role_to_user(
-                    role_db=role_db,
-                    user_db=user_db,
-                    description=description,
-                    is_remote=True,
-                    source=mapping_db.source,
-                    ignore_already_exists_error=True,
-                )
-                assert assignment_db.is_remote is True
-                created_assignments_dbs.append(assignment_db)
+        # Note: A single notification is sent at the end (and only if the effective user roles
+        # have changed) instead of a notification for each created assignment
+        with suppress_rbac_change_notifications():
+            for mapping_db in enabled_mapping_dbs:
+                extra["mapping_db"] = mapping_db
+
+                for role_name in mapping_db.roles:
+                    role_db = rbac_service.get_role_by_name(name=role_name)
+
+                    if not role_db:
+                        # Gracefully skip assignment for role which doesn't exist in the db
+                        LOG.info(
+                            'Role with name "%s" for mapping "%s" not found, skipping assignment.'
+                            % (role_name, str(mapping_db)),
+                            extra=extra,
+                        )
+                        continue
+
+                    description = (
+                        "Automatic role assignment based on the remote user membership in "
+                        'group "%s"' % (mapping_db.group)
+                    )
+                    assignment_db = rbac_service.assign_role_to_user(
+                        role_db=role_db,
+                        user_db=user_db,
+                        description=description,
+                        is_remote=True,
+                        source=mapping_db.source,
+                        ignore_already_exists_error=True,
+                    )
+                    assert assignment_db.is_remote is True
+                    created_assignments_dbs.append(assignment_db)
 
         LOG.debug(
             'Created %s new remote role assignments for user "%s"'
@@ -499,4 +547,21 @@ class RBACRemoteGroupToRoleSyncer(BaseRBACRemoteGroupToRoleSyncer):
             extra=extra,
         )
 
+        # Only notify about the change if effective user roles have changed. Notifying on every
+        # login would increment the RBAC generation and invalidate caches (and role claims of all
+        # the other users) even if nothing has changed.
+        previous_effective_role_names = local_role_names.union(existing_role_names)
+        effective_role_names = local_role_names.union(
+            [assignment_db.role for assignment_db in created_assignments_dbs]
+        )
+
+        if effective_role_names != previous_effective_role_names:
+            notify_rbac_change(username=user_db.name)
+
+        # Note: Claims are computed after notifying about the change so they include the new
+        # RBAC generation
+        self.role_claims = None
+        if cfg.CONF.rbac.role_claims_enable:
+            self.role_claims = rbac_service.get_role_claims_for_user(user_db=user_db)
+
         return (created_assignments_dbs, role_assignment_dbs_to_delete)
@@ -0,0 +1,73 @@
+# Copyright 2020 The StackStorm Authors
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Module containing utility functions for constructing resource UIDs from parts.
+
+Instantiating a mongoengine document just to call get_uid() on it is relatively expensive so
+resolvers use those functions instead. Results are memoized since the same pack and webhook
+UIDs are constructed over and over again (e.g. for each execution in a list of executions).
+"""
+
+from __future__ import absolute_import
+
+import sys
+from functools import lru_cache
+
+from st2common.models.db.pack import PackDB
+from st2common.models.db.stormbase import UIDFieldMixin
+from st2common.models.db.webhook import WebhookDB
+
+__all__ = [
+    "get_resource_uid",
+    "get_pack_uid",
+    "get_webhook_uid",
+]
+
+# Maximum number of memoized UIDs per resource type
+UID_CACHE_SIZE = 10000
+
+
+def get_resource_uid(resource_type, *parts):
+    """
+    Construct UID for the provided resource type from the provided UID field values.
+
+    :rtype: ``str``
+    """
+    parts = [resource_type] + [part or "" for part in parts]
+    return sys.intern(UIDFieldMixin.UID_SEPARATOR.join(parts))
+
+
+@lru_cache(maxsize=UID_CACHE_SIZE)
+def get_pack_uid(pack_ref):
+    """
+    Return UID of the pack with the provided reference.
+
+    :rtype: ``str``
+    """
+    return get_resource_uid(PackDB.RESOURCE_TYPE, pack_ref)
+
+
+@lru_cache(maxsize=UID_CACHE_SIZE)
+def get_webhook_uid(name):
+    """
+    Return UID of the webhook with the provided name (url).
+
+    Note: WebhookDB normalizes the name on instantiation so we still construct the document, but
+    only once per distinct name.
+
+    :rtype: ``str``
+    """
+    return sys.intern(WebhookDB(name=name).get_uid())
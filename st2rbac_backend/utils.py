@@ -29,16 +29,26 @@ from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
 from st2common.rbac.types import SystemRole
 from st2common.util import action_db as action_utils
-from st2common.rbac.backends import get_rbac_backend
 from st2common.rbac.backends.base import BaseRBACUtils
 
+from st2rbac_backend.predicates import ResourcePermissionPredicate
+from st2rbac_backend.resolvers import get_resolver_for_permission_type
+from st2rbac_backend.resolvers import get_resolver_for_resource_type
+from st2rbac_backend.scope import request_scoped
 from st2rbac_backend.service import RBACService as rbac_service
 
 __all__ = ["RBACUtils"]
 
 
 class RBACUtils(BaseRBACUtils):
+    """
+    Note: All the methods run inside an (implicit) RBAC request scope which means roles for a
+    particular user are retrieved from the database at most once per (outer most) call. Permission
+    grants are only memoized inside an explicit request scope (e.g. RequestScopeMiddleware).
+    """
+
     @staticmethod
+    @request_scoped
     def assert_user_is_admin(user_db):
         """
         Assert that the currently logged in user is an administrator.
@@ -51,6 +61,7 @@ class RBACUtils(BaseRBACUtils):
             raise AccessDeniedError(message="Administrator access required", user_db=user_db)
 
     @staticmethod
+    @request_scoped
     def assert_user_is_system_admin(user_db):
         """
         Assert that the currently logged in user is a system administrator.
@@ -63,6 +74,7 @@ class RBACUtils(BaseRBACUtils):
             raise AccessDeniedError(message="System Administrator access required", user_db=user_db)
 
     @staticmethod
+    @request_scoped
     def assert_user_is_admin_or_operating_on_own_resource(user_db, user=None):
         """
         Assert that the currently logged in user is an administrator or operating on a resource
@@ -80,6 +92,7 @@ class RBACUtils(BaseRBACUtils):
             )
 
     @staticmethod
+    @request_scoped
     def assert_user_has_permission(user_db, permission_type):
         """
         Check that currently logged-in user has specified permission.
@@ -94,6 +107,7 @@ class RBACUtils(BaseRBACUtils):
             raise ResourceTypeAccessDeniedError(user_db=user_db, permission_type=permission_type)
 
     @staticmethod
+    @request_scoped
     def assert_user_has_resource_api_permission(user_db, resource_api, permission_type):
         """
         Check that currently logged-in user has specified permission for the resource which is to be
@@ -110,6 +124,7 @@ class RBACUtils(BaseRBACUtils):
             )
 
     @staticmethod
+    @request_scoped
     def assert_user_has_resource_db_permission(user_db, resource_db, permission_type):
         """
         Check that currently logged-in user has specified permission on the provied resource.
@@ -126,6 +141,7 @@ class RBACUtils(BaseRBACUtils):
             )
 
     @staticmethod
+    @request_scoped
     def assert_user_has_rule_trigger_and_action_permission(user_db, rule_api):
         """
         Check that the currently logged-in has necessary permissions on trhe trigger and action
@@ -169,6 +185,7 @@ class RBACUtils(BaseRBACUtils):
         return True
 
     @staticmethod
+    @request_scoped
     def assert_user_is_admin_if_user_query_param_is_provided(user_db, user, require_rbac=False):
         """
         Function which asserts that the request user is administator if "user" query parameter is
@@ -188,6 +205,7 @@ class RBACUtils(BaseRBACUtils):
 
     # Regular methods
     @staticmethod
+    @request_scoped
     def user_is_admin(user_db):
         """
         Return True if the provided user has admin role (either system admin or admin), false
@@ -198,17 +216,14 @@ class RBACUtils(BaseRBACUtils):
 
         :rtype: ``bool``
         """
-        is_system_admin = RBACUtils.user_is_system_admin(user_db=user_db)
-        if is_system_admin:
-            return True
-
-        is_admin = RBACUtils.user_has_role(user_db=user_db, role=SystemRole.ADMIN)
-        if is_admin:
+        if not cfg.CONF.rbac.enable:
             return True
 
-        return False
+        # Note: System admin also has all the admin permissions
+        return rbac_service.get_role_set_for_user(user_db=user_db).is_admin
 
     @staticmethod
+    @request_scoped
     def user_is_system_admin(user_db):
         """
         Return True if the provided user has system admin rule, false otherwise.
@@ -221,6 +236,7 @@ class RBACUtils(BaseRBACUtils):
         return RBACUtils.user_has_role(user_db=user_db, role=SystemRole.SYSTEM_ADMIN)
 
     @staticmethod
+    @request_scoped
     def user_has_role(user_db, role):
         """
         :param user: User object to check for.
@@ -236,12 +252,10 @@ class RBACUtils(BaseRBACUtils):
         if not cfg.CONF.rbac.enable:
             return True
 
-        user_role_dbs = rbac_service.get_roles_for_user(user_db=user_db)
-        user_role_names = [role_db.name for role_db in user_role_dbs]
-
-        return role in user_role_names
+        return role in rbac_service.get_role_set_for_user(user_db=user_db)
 
     @staticmethod
+    @request_scoped
     def user_has_system_role(user_db):
         """
         :param user: User object to check for.
@@ -249,19 +263,10 @@ class RBACUtils(BaseRBACUtils):
 
         :rtype: ``bool``
         """
-        user_role_dbs = rbac_service.get_roles_for_user(user_db=user_db)
-        user_role_names = [role_db.name for role_db in user_role_dbs]
-
-        if (
-            SystemRole.SYSTEM_ADMIN in user_role_names
-            or SystemRole.ADMIN in user_role_names
-            or SystemRole.OBSERVER in user_role_names
-        ):
-            return True
-
-        return False
+        return rbac_service.get_role_set_for_user(user_db=user_db).has_system_role
 
     @staticmethod
+    @request_scoped
     def user_has_permission(user_db, permission_type):
         """
         Check that the provided user has specified permission.
@@ -270,13 +275,12 @@ class RBACUtils(BaseRBACUtils):
             return True
 
         # TODO Verify permission type for the provided resource type
-        rbac_backend = get_rbac_backend()
-
-        resolver = rbac_backend.get_resolver_for_permission_type(permission_type=permission_type)
+        resolver = get_resolver_for_permission_type(permission_type=permission_type)
         result = resolver.user_has_permission(user_db=user_db, permission_type=permission_type)
         return result
 
     @staticmethod
+    @request_scoped
     def user_has_resource_api_permission(user_db, resource_api, permission_type):
         """
         Check that the provided user has specified permission on the provided resource API.
@@ -285,15 +289,14 @@ class RBACUtils(BaseRBACUtils):
             return True
 
         # TODO Verify permission type for the provided resource type
-        rbac_backend = get_rbac_backend()
-
-        resolver = rbac_backend.get_resolver_for_permission_type(permission_type=permission_type)
+        resolver = get_resolver_for_permission_type(permission_type=permission_type)
         result = resolver.user_has_resource_api_permission(
             user_db=user_db, resource_api=resource_api, permission_type=permission_type
         )
         return result
 
     @staticmethod
+    @request_scoped
     def user_has_resource_db_permission(user_db, resource_db, permission_type):
         """
         Check that the provided user has specified permission on the provided resource.
@@ -302,15 +305,66 @@ class RBACUtils(BaseRBACUtils):
             return True
 
         # TODO Verify permission type for the provided resource type
-        rbac_backend = get_rbac_backend()
-
-        resolver = rbac_backend.get_resolver_for_permission_type(permission_type=permission_type)
+        resolver = get_resolver_for_permission_type(permission_type=permission_type)
         result = resolver.user_has_resource_db_permission(
             user_db=user_db, resource_db=resource_db, permission_type=permission_type
         )
         return result
 
     @staticmethod
+    @request_scoped
+    def filter_resource_dbs_by_permission(user_db, resource_dbs, permission_type):
+        """
+        Filter the provided resources to the ones on which the user has the specified permission.
+
+        User roles and permission grants are only retrieved once for the whole batch which makes
+        this method much cheaper than calling user_has_resource_db_permission for each resource.
+
+        :rtype: ``list``
+        """
+        if not cfg.CONF.rbac.enable:
+            return list(resource_dbs)
+
+        resolver = get_resolver_for_permission_type(permission_type=permission_type)
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=user_db, resource_dbs=resource_dbs, permission_type=permission_type
+        )
+        return result
+
+    @staticmethod
+    @request_scoped
+    def get_permission_query_filter(user_db, permission_type):
+        """
+        Return a database query filter which limits a list query to the resources on which the user
+        has the specified permission or None if no filtering is needed.
+
+        :rtype: :class:`mongoengine.queryset.visitor.Q` or ``None``
+        """
+        if not cfg.CONF.rbac.enable:
+            return None
+
+        resolver = get_resolver_for_permission_type(permission_type=permission_type)
+        result = resolver.get_permission_query_filter(
+            user_db=user_db, permission_type=permission_type
+        )
+        return result
+
+    @staticmethod
+    def get_resource_db_permission_predicate(user_db, permission_type):
+        """
+        Return compiled predicate which checks if the provided user has the specified permission on
+        a resource.
+
+        Predicate is meant to be created once per long lived connection (e.g. st2stream subscriber)
+        and evaluated for each event. It doesn't access the database and is recompiled
+        automatically when RBAC data changes.
+
+        :rtype: :class:`ResourcePermissionPredicate`
+        """
+        return ResourcePermissionPredicate(user_db=user_db, permission_type=permission_type)
+
+    @staticmethod
+    @request_scoped
     def user_has_rule_trigger_permission(user_db, trigger):
         """
         Check that the currently logged-in has necessary permissions on the trigger used /
@@ -319,8 +373,7 @@ class RBACUtils(BaseRBACUtils):
         if not cfg.CONF.rbac.enable:
             return True
 
-        rbac_backend = get_rbac_backend()
-        rules_resolver = rbac_backend.get_resolver_for_resource_type(ResourceType.RULE)
+        rules_resolver = get_resolver_for_resource_type(resource_type=ResourceType.RULE)
         has_trigger_permission = rules_resolver.user_has_trigger_permission(
             user_db=user_db, trigger=trigger
         )
@@ -331,6 +384,7 @@ class RBACUtils(BaseRBACUtils):
         return False
 
     @staticmethod
+    @request_scoped
     def user_has_rule_action_permission(user_db, action_ref):
         """
         Check that the currently logged-in has necessary permissions on the action used / referenced
@@ -349,8 +403,7 @@ class RBACUtils(BaseRBACUtils):
             ref = ResourceReference.from_string_reference(ref=action_ref)
             action_db = ActionDB(pack=ref.pack, name=ref.name, ref=action_ref)
 
-        rbac_backend = get_rbac_backend()
-        action_resolver = rbac_backend.get_resolver_for_resource_type(ResourceType.ACTION)
+        action_resolver = get_resolver_for_resource_type(resource_type=ResourceType.ACTION)
         has_action_permission = action_resolver.user_has_resource_db_permission(
             user_db=user_db, resource_db=action_db, permission_type=PermissionType.ACTION_EXECUTE
         )
@@ -14,28 +14,72 @@
 # limitations under the License.
 
 """
-Module containing base classes for API controller RBAC tests.
+Module containing base classes and helpers for RBAC tests.
 """
 
 from __future__ import absolute_import
 
+from bson.objectid import ObjectId
 from oslo_config import cfg
 
 from st2common.rbac.types import SystemRole
 from st2common.persistence.auth import User
 from st2common.persistence.rbac import UserRoleAssignment
 from st2common.models.db.auth import UserDB
+from st2common.models.db.rbac import RoleDB
 from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.models.db.rbac import PermissionGrantDB
 from st2common.rbac.migrations import run_all as run_all_rbac_migrations
 from st2tests.api import BaseFunctionalTest
 from st2tests.base import CleanDbTestCase
 
+from st2rbac_backend.snapshot import PermissionSnapshot
+
 
 __all__ = [
-    'APIControllerWithRBACTestCase'
+    'APIControllerWithRBACTestCase',
+    'build_permission_snapshot'
 ]
 
 
+def build_permission_snapshot(roles, assignments):
+    """
+    Build permission snapshot from in-memory objects (no database is needed).
+
+    :param roles: Map of role name to a list of (resource_uid, resource_type, permission_types)
+                  tuples.
+    :param assignments: Map of username to a list of role names.
+    """
+    role_dbs = []
+    permission_grant_dbs = []
+
+    for role_name, grants in roles.items():
+        grant_ids = []
+
+        for resource_uid, resource_type, permission_types in grants:
+            grant_db = PermissionGrantDB(
+                id=ObjectId(),
+                resource_uid=resource_uid,
+                resource_type=resource_type,
+                permission_types=permission_types)
+            permission_grant_dbs.append(grant_db)
+            grant_ids.append(str(grant_db.id))
+
+        role_dbs.append(RoleDB(name=role_name, permission_grants=grant_ids))
+
+    role_assignment_dbs = []
+    for username, role_names in assignments.items():
+        for role_name in role_names:
+            role_assignment_db = UserRoleAssignmentDB(
+                user=username, role=role_name, source='assignments/%s.yaml' % (username))
+            role_assignment_dbs.append(role_assignment_db)
+
+    return PermissionSnapshot(
+        role_dbs=role_dbs,
+        role_assignment_dbs=role_assignment_dbs,
+        permission_grant_dbs=permission_grant_dbs)
+
+
 class BaseAPIControllerWithRBACTestCase(BaseFunctionalTest, CleanDbTestCase):
     """
     Base test case class for testing API controllers with RBAC enabled.
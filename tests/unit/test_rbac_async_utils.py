@@ -0,0 +1,134 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import asyncio
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.rbac.types import SystemRole
+from st2common.models.db.auth import UserDB
+from st2common.models.db.rule import RuleDB
+from st2tests import config as tests_config
+
+from st2rbac_backend.async_utils import AsyncRBACChecker
+from tests.base import build_permission_snapshot
+
+__all__ = ["AsyncRBACCheckerTestCase"]
+
+
+class AsyncRBACCheckerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(AsyncRBACCheckerTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def setUp(self):
+        super(AsyncRBACCheckerTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+
+        self.rule_1_db = RuleDB(pack="test_pack_1", name="rule1", ref="test_pack_1.rule1")
+        self.rule_2_db = RuleDB(pack="test_pack_2", name="rule2", ref="test_pack_2.rule2")
+
+        roles = {
+            SystemRole.ADMIN: [],
+            SystemRole.OBSERVER: [],
+            "rule_1_view": [
+                (self.rule_1_db.get_uid(), ResourceType.RULE, [PermissionType.RULE_VIEW])
+            ],
+            "pack_2_all": [("pack:test_pack_2", ResourceType.PACK, [PermissionType.RULE_ALL])],
+        }
+        assignments = {
+            "admin": [SystemRole.ADMIN],
+            "observer": [SystemRole.OBSERVER],
+            "rule_1_view": ["rule_1_view"],
+            "pack_2_all": ["pack_2_all"],
+            "no_roles": [],
+        }
+
+        self.snapshot = build_permission_snapshot(roles=roles, assignments=assignments)
+        self.users = dict([(username, UserDB(name=username)) for username in assignments])
+
+    def test_check(self):
+        checker = AsyncRBACChecker(snapshot=self.snapshot)
+
+        async def run():
+            return await asyncio.gather(
+                checker.check(self.users["admin"], PermissionType.RULE_LIST),
+                checker.check(self.users["no_roles"], PermissionType.RULE_LIST),
+                checker.check(self.users["rule_1_view"], PermissionType.RULE_VIEW, self.rule_1_db),
+                checker.check(self.users["rule_1_view"], PermissionType.RULE_VIEW, self.rule_2_db),
+                checker.check(self.users["pack_2_all"], PermissionType.RULE_DELETE, self.rule_2_db),
+            )
+
+        result = asyncio.run(run())
+        self.assertEqual(result, [True, False, True, False, True])
+
+    def test_filter_users(self):
+        checker = AsyncRBACChecker(snapshot=self.snapshot)
+        user_dbs = list(self.users.values())
+
+        result = asyncio.run(
+            checker.filter_users(
+                user_dbs=user_dbs, permission_type=PermissionType.RULE_VIEW, resource=self.rule_1_db
+            )
+        )
+        self.assertEqual(
+            sorted([user_db.name for user_db in result]), ["admin", "observer", "rule_1_view"]
+        )
+
+        result = asyncio.run(
+            checker.filter_users(
+                user_dbs=user_dbs, permission_type=PermissionType.RULE_VIEW, resource=self.rule_2_db
+            )
+        )
+        self.assertEqual(
+            sorted([user_db.name for user_db in result]), ["admin", "observer", "pack_2_all"]
+        )
+
+    def test_filter_resource_dbs(self):
+        checker = AsyncRBACChecker(snapshot=self.snapshot)
+        resource_dbs = [self.rule_1_db, self.rule_2_db]
+
+        result = asyncio.run(
+            checker.filter_resource_dbs(
+                user_db=self.users["rule_1_view"],
+                resource_dbs=resource_dbs,
+                permission_type=PermissionType.RULE_VIEW,
+            )
+        )
+        self.assertEqual(result, [self.rule_1_db])
+
+    @mock.patch("st2rbac_backend.snapshot.PermissionSnapshot.build")
+    def test_checks_dont_use_the_database(self, mock_build):
+        checker = AsyncRBACChecker(snapshot=self.snapshot)
+
+        result = asyncio.run(
+            checker.check_many(
+                [
+                    (self.users["observer"], PermissionType.RULE_VIEW, self.rule_1_db),
+                    (self.users["observer"], PermissionType.RULE_DELETE, self.rule_1_db),
+                ]
+            )
+        )
+        self.assertEqual(result, [True, False])
+        self.assertEqual(mock_build.call_count, 0)
@@ -0,0 +1,243 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.persistence.auth import User
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rule import Rule
+from st2common.models.db.auth import UserDB
+from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.models.db.rule import RuleDB
+from st2tests.base import CleanDbTestCase
+
+from st2rbac_backend.cache import LRUCache
+from st2rbac_backend.cache import get_permission_deny_cache
+from st2rbac_backend.cache import get_user_permissions_cache
+from st2rbac_backend.cache import invalidate_permission_caches
+from st2rbac_backend.resolvers import RulePermissionsResolver
+from st2rbac_backend.service import RBACService as rbac_service
+
+__all__ = ["LRUCacheTestCase", "UserPermissionsCacheTestCase", "PermissionDenyCacheTestCase"]
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_get_and_set(self):
+        cache = LRUCache(max_size=10, ttl=60)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", "default"), "default")
+
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertTrue("a" in cache)
+        self.assertEqual(len(cache), 1)
+
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_size=2, ttl=60)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Mark "a" as recently used so "b" is evicted
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_hit_and_miss_counters(self):
+        cache = LRUCache(max_size=2, ttl=60)
+
+        cache.get("a")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+
+        # Membership checks don't affect the counters
+        self.assertTrue("a" in cache)
+        self.assertEqual(cache.hits, 2)
+
+    @mock.patch("st2rbac_backend.cache.time")
+    def test_expired_entries_are_not_returned(self, mock_time):
+        mock_time.monotonic.return_value = 100
+        cache = LRUCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+
+        mock_time.monotonic.return_value = 109
+        self.assertEqual(cache.get("a"), 1)
+
+        mock_time.monotonic.return_value = 110
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class UserPermissionsCacheTestCase(CleanDbTestCase):
+    def setUp(self):
+        super(UserPermissionsCacheTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+        cfg.CONF.set_override(name="permission_cache_enable", override=True, group="rbac")
+        invalidate_permission_caches()
+
+        self.user_db = User.add_or_update(UserDB(name="cached_user"))
+        self.role_db = rbac_service.create_role(name="custom_role_1")
+
+        rule_db = RuleDB(pack="test1", name="rule1", ref="test1.rule1")
+        self.rule_db = Rule.add_or_update(rule_db)
+
+    def tearDown(self):
+        super(UserPermissionsCacheTestCase, self).tearDown()
+
+        invalidate_permission_caches()
+        cfg.CONF.set_override(name="permission_cache_enable", override=False, group="rbac")
+
+    def test_roles_are_only_retrieved_once(self):
+        rbac_service.assign_role_to_user(role_db=self.role_db, user_db=self.user_db)
+
+        with mock.patch.object(
+            UserRoleAssignment, "query", wraps=UserRoleAssignment.query
+        ) as mock_query:
+            for index in range(0, 5):
+                role_dbs = rbac_service.get_roles_for_user(user_db=self.user_db)
+                self.assertEqual([role_db.name for role_db in role_dbs], ["custom_role_1"])
+
+                permission_grant_dbs = rbac_service.get_all_permission_grants_for_user(
+                    user_db=self.user_db
+                )
+                self.assertEqual(list(permission_grant_dbs), [])
+
+            self.assertEqual(mock_query.call_count, 1)
+
+        self.assertTrue(self.user_db.name in get_user_permissions_cache())
+
+    def test_create_role_invalidates_cache_for_existing_assignments(self):
+        # Assignment can exist before the role (e.g. remote group to role mappings)
+        role_assignment_db = UserRoleAssignmentDB(
+            user=self.user_db.name, role="custom_role_2", source="mappings/group_1.yaml"
+        )
+        UserRoleAssignment.add_or_update(role_assignment_db)
+
+        self.assertEqual(rbac_service.get_roles_for_user(user_db=self.user_db), [])
+        self.assertTrue(self.user_db.name in get_user_permissions_cache())
+
+        rbac_service.create_role(name="custom_role_2")
+        role_dbs = rbac_service.get_roles_for_user(user_db=self.user_db)
+        self.assertEqual([role_db.name for role_db in role_dbs], ["custom_role_2"])
+
+    def test_service_mutators_invalidate_cache(self):
+        self.assertEqual(rbac_service.get_roles_for_user(user_db=self.user_db), [])
+
+        # Assign role
+        rbac_service.assign_role_to_user(role_db=self.role_db, user_db=self.user_db)
+        role_dbs = rbac_service.get_roles_for_user(user_db=self.user_db)
+        self.assertEqual([role_db.name for role_db in role_dbs], ["custom_role_1"])
+
+        # Create permission grant
+        rbac_service.create_permission_grant_for_resource_db(
+            role_db=self.role_db,
+            resource_db=self.rule_db,
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+        permission_grant_dbs = rbac_service.get_all_permission_grants_for_user(
+            user_db=self.user_db,
+            resource_uid=self.rule_db.get_uid(),
+            resource_types=[ResourceType.RULE],
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+        self.assertEqual(len(permission_grant_dbs), 1)
+
+        # Remove permission grant
+        self.role_db.reload()
+        rbac_service.remove_permission_grant_for_resource_db(
+            role_db=self.role_db,
+            resource_db=self.rule_db,
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+        permission_grant_dbs = rbac_service.get_all_permission_grants_for_user(
+            user_db=self.user_db
+        )
+        self.assertEqual(len(permission_grant_dbs), 0)
+
+        # Revoke role
+        rbac_service.revoke_role_from_user(role_db=self.role_db, user_db=self.user_db)
+        self.assertEqual(rbac_service.get_roles_for_user(user_db=self.user_db), [])
+
+
+class PermissionDenyCacheTestCase(CleanDbTestCase):
+    def setUp(self):
+        super(PermissionDenyCacheTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+        cfg.CONF.set_override(name="permission_deny_cache_enable", override=True, group="rbac")
+        invalidate_permission_caches()
+
+        self.user_db = User.add_or_update(UserDB(name="denied_user"))
+        self.role_db = rbac_service.create_role(name="custom_role_1")
+        rbac_service.assign_role_to_user(role_db=self.role_db, user_db=self.user_db)
+
+        rule_db = RuleDB(pack="test1", name="rule1", ref="test1.rule1")
+        self.rule_db = Rule.add_or_update(rule_db)
+
+    def tearDown(self):
+        super(PermissionDenyCacheTestCase, self).tearDown()
+
+        invalidate_permission_caches()
+        cfg.CONF.set_override(name="permission_deny_cache_enable", override=False, group="rbac")
+
+    def test_denied_checks_are_cached_and_invalidated(self):
+        resolver = RulePermissionsResolver()
+        deny_cache = get_permission_deny_cache()
+        hits = deny_cache.hits
+
+        for index in range(0, 3):
+            result = resolver.user_has_resource_db_permission(
+                user_db=self.user_db,
+                resource_db=self.rule_db,
+                permission_type=PermissionType.RULE_VIEW,
+            )
+            self.assertFalse(result)
+
+        self.assertEqual(deny_cache.hits, hits + 2)
+
+        # Creating a grant invalidates cached denied checks
+        rbac_service.create_permission_grant_for_resource_db(
+            role_db=self.role_db,
+            resource_db=self.rule_db,
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+
+        result = resolver.user_has_resource_db_permission(
+            user_db=self.user_db, resource_db=self.rule_db, permission_type=PermissionType.RULE_VIEW
+        )
+        self.assertTrue(result)
+        self.assertEqual(len(get_permission_deny_cache()), 0)
@@ -0,0 +1,123 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import SystemRole
+from st2common.models.db.auth import TokenDB
+from st2common.models.db.auth import UserDB
+from st2tests import config as tests_config
+
+from st2rbac_backend.claims import RoleClaims
+from st2rbac_backend.claims import get_role_claims_from_token
+from st2rbac_backend.claims import get_trusted_role_claims
+from st2rbac_backend.claims import store_role_claims_in_token
+from st2rbac_backend.claims import use_role_claims
+from st2rbac_backend.service import RBACService
+from st2rbac_backend.utils import RBACUtils
+
+__all__ = ["RoleClaimsTestCase"]
+
+
+@mock.patch("st2rbac_backend.claims.get_current_rbac_generation", mock.Mock(return_value=5))
+class RoleClaimsTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(RoleClaimsTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def setUp(self):
+        super(RoleClaimsTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+        cfg.CONF.set_override(name="role_claims_enable", override=True, group="rbac")
+
+    def tearDown(self):
+        super(RoleClaimsTestCase, self).tearDown()
+
+        cfg.CONF.set_override(name="role_claims_enable", override=False, group="rbac")
+
+    @mock.patch("st2rbac_backend.claims.Token")
+    def test_store_and_retrieve_role_claims_from_token(self, mock_token):
+        mock_token.add_or_update.side_effect = lambda token_db: token_db
+
+        token_db = TokenDB(user="user_1", token="token", metadata={"foo": "bar"})
+        role_claims = RoleClaims(
+            username="user_1", role_names=frozenset(["role_2", "role_1"]), generation=5
+        )
+
+        token_db = store_role_claims_in_token(token_db=token_db, role_claims=role_claims)
+        self.assertEqual(token_db.metadata["foo"], "bar")
+        self.assertEqual(
+            token_db.metadata["rbac_role_claims"], {"roles": ["role_1", "role_2"], "generation": 5}
+        )
+        self.assertEqual(get_role_claims_from_token(token_db=token_db), role_claims)
+
+        # Token without claims and token with invalid claims
+        token_db = TokenDB(user="user_1", token="token")
+        self.assertIsNone(get_role_claims_from_token(token_db=token_db))
+
+        token_db = TokenDB(user="user_1", token="token", metadata={"rbac_role_claims": "invalid"})
+        self.assertIsNone(get_role_claims_from_token(token_db=token_db))
+
+    def test_get_trusted_role_claims(self):
+        role_claims = RoleClaims(username="user_1", role_names=frozenset(["role_1"]), generation=5)
+
+        self.assertIsNone(get_trusted_role_claims(username="user_1"))
+
+        with use_role_claims(role_claims):
+            self.assertEqual(get_trusted_role_claims(username="user_1"), role_claims)
+
+            # Claims are only trusted for the user they have been issued for
+            self.assertIsNone(get_trusted_role_claims(username="user_2"))
+
+            cfg.CONF.set_override(name="role_claims_enable", override=False, group="rbac")
+            self.assertIsNone(get_trusted_role_claims(username="user_1"))
+
+        self.assertIsNone(get_trusted_role_claims(username="user_1"))
+
+    def test_stale_role_claims_are_not_trusted(self):
+        role_claims = RoleClaims(username="user_1", role_names=frozenset(["role_1"]), generation=4)
+
+        with use_role_claims(role_claims):
+            self.assertIsNone(get_trusted_role_claims(username="user_1"))
+
+    @mock.patch.object(RBACService, "get_roles_for_user")
+    def test_role_lookups_use_role_claims(self, mock_get_roles_for_user):
+        user_db = UserDB(name="user_1")
+        role_claims = RoleClaims(
+            username="user_1", role_names=frozenset([SystemRole.ADMIN]), generation=5
+        )
+
+        with use_role_claims(role_claims):
+            self.assertEqual(
+                RBACService.get_role_names_for_user(user_db=user_db), frozenset([SystemRole.ADMIN])
+            )
+            self.assertTrue(RBACUtils.user_is_admin(user_db=user_db))
+            self.assertTrue(RBACUtils.user_has_system_role(user_db=user_db))
+            self.assertTrue(
+                RBACUtils.user_has_permission(
+                    user_db=user_db, permission_type=PermissionType.ACTION_LIST
+                )
+            )
+
+        self.assertEqual(mock_get_roles_for_user.call_count, 0)
@@ -0,0 +1,140 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+from kombu import Connection
+from oslo_config import cfg
+
+from st2common.models.db.rbac import RoleDB
+from st2tests import config as tests_config
+
+from st2rbac_backend import backend
+from st2rbac_backend import events
+from st2rbac_backend.cache import LRUCache
+from st2rbac_backend.cache import UserPermissions
+from st2rbac_backend.events import RBACInvalidationConsumer
+from st2rbac_backend.events import RBACInvalidationPublisher
+
+__all__ = ["RBACInvalidationEventsTestCase", "RBACInvalidationListenerTestCase"]
+
+
+class RBACInvalidationEventsTestCase(unittest.TestCase):
+    def setUp(self):
+        super(RBACInvalidationEventsTestCase, self).setUp()
+
+        self.connection = Connection("memory://")
+
+    def tearDown(self):
+        super(RBACInvalidationEventsTestCase, self).tearDown()
+
+        self.connection.release()
+
+    def _publish_and_consume(self, **kwargs):
+        consumer = RBACInvalidationConsumer(connection=self.connection)
+        # Queue needs to exist before the event is published
+        consumer.queue(self.connection.default_channel).declare()
+
+        publisher = RBACInvalidationPublisher(connection=self.connection)
+        publisher.publish(**kwargs)
+
+        for _ in consumer.consume(limit=1, timeout=5):
+            pass
+
+    @mock.patch.object(events, "invalidate_permission_caches")
+    def test_publish_and_consume_user_event(self, mock_invalidate):
+        self._publish_and_consume(username="user1")
+        mock_invalidate.assert_called_once_with(username="user1", role_name=None)
+
+    @mock.patch.object(events, "invalidate_permission_caches")
+    def test_publish_and_consume_role_event(self, mock_invalidate):
+        self._publish_and_consume(role_name="role1")
+        mock_invalidate.assert_called_once_with(username=None, role_name="role1")
+
+    @mock.patch.object(events, "invalidate_permission_caches")
+    def test_publish_and_consume_all_event(self, mock_invalidate):
+        self._publish_and_consume()
+        mock_invalidate.assert_called_once_with(username=None, role_name=None)
+
+    @mock.patch.object(events, "transport_utils")
+    def test_publisher_reuses_connection(self, mock_transport_utils):
+        mock_transport_utils.get_connection.return_value = self.connection
+
+        publisher = RBACInvalidationPublisher()
+        publisher.publish(username="user1")
+        publisher.publish(role_name="role1")
+        publisher.publish()
+
+        self.assertEqual(mock_transport_utils.get_connection.call_count, 1)
+
+    @mock.patch.object(events, "publish_rbac_invalidation")
+    @mock.patch.object(events, "invalidate_permission_caches")
+    def test_suppress_rbac_change_notifications(self, mock_invalidate, mock_publish):
+        with events.suppress_rbac_change_notifications():
+            events.notify_rbac_change(username="user1")
+
+        self.assertEqual(mock_invalidate.call_count, 0)
+        self.assertEqual(mock_publish.call_count, 0)
+
+        events.notify_rbac_change(username="user1")
+        mock_invalidate.assert_called_once_with(username="user1", role_name=None)
+
+    def test_role_event_only_invalidates_affected_users(self):
+        role_1_db = RoleDB(name="role1")
+        role_2_db = RoleDB(name="role2")
+
+        cache = LRUCache(max_size=10, ttl=60)
+        cache.set("user1", UserPermissions(role_dbs=(role_1_db,), permission_grant_dbs=()))
+        cache.set("user2", UserPermissions(role_dbs=(role_2_db,), permission_grant_dbs=()))
+
+        with mock.patch("st2rbac_backend.cache._user_permissions_cache", cache):
+            events.apply_rbac_invalidation(payload={"username": None, "role_name": "role1"})
+
+        self.assertFalse("user1" in cache)
+        self.assertTrue("user2" in cache)
+
+
+class RBACInvalidationListenerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(RBACInvalidationListenerTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def tearDown(self):
+        super(RBACInvalidationListenerTestCase, self).tearDown()
+
+        for name in [
+            "permission_cache_enable",
+            "permission_snapshot_enable",
+            "invalidation_events_enable",
+        ]:
+            cfg.CONF.clear_override(name=name, group="rbac")
+
+    @mock.patch.object(backend, "start_rbac_invalidation_listener")
+    def test_listener_is_started_without_caches(self, mock_start_listener):
+        # Compiled permission predicates rely on invalidation events even if caches are disabled
+        cfg.CONF.set_override(name="permission_cache_enable", override=False, group="rbac")
+        cfg.CONF.set_override(name="permission_snapshot_enable", override=False, group="rbac")
+
+        cfg.CONF.set_override(name="invalidation_events_enable", override=False, group="rbac")
+        backend.RBACBackend()
+        self.assertEqual(mock_start_listener.call_count, 0)
+
+        cfg.CONF.set_override(name="invalidation_events_enable", override=True, group="rbac")
+        backend.RBACBackend()
+        self.assertEqual(mock_start_listener.call_count, 1)
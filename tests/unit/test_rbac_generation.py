@@ -0,0 +1,105 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+from oslo_config import cfg
+
+from st2common.persistence.auth import User
+from st2common.models.db.auth import UserDB
+from st2tests.base import CleanDbTestCase
+
+from st2rbac_backend.cache import get_user_permissions_cache
+from st2rbac_backend.cache import invalidate_permission_caches
+from st2rbac_backend.generation import get_rbac_generation
+from st2rbac_backend.generation import get_current_rbac_generation
+from st2rbac_backend.generation import increment_rbac_generation
+from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.snapshot import get_permission_snapshot
+
+__all__ = ["RBACGenerationTestCase"]
+
+
+class RBACGenerationTestCase(CleanDbTestCase):
+    def setUp(self):
+        super(RBACGenerationTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+        cfg.CONF.set_override(name="generation_check_enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="generation_check_interval", override=0, group="rbac")
+        invalidate_permission_caches()
+
+        self.user_db = User.add_or_update(UserDB(name="generation_user"))
+
+    def tearDown(self):
+        super(RBACGenerationTestCase, self).tearDown()
+
+        invalidate_permission_caches()
+        cfg.CONF.set_override(name="generation_check_enable", override=False, group="rbac")
+        cfg.CONF.set_override(name="permission_cache_enable", override=False, group="rbac")
+        cfg.CONF.set_override(name="permission_snapshot_enable", override=False, group="rbac")
+
+    def test_increment_rbac_generation(self):
+        generation = get_rbac_generation()
+
+        self.assertEqual(increment_rbac_generation(), generation + 1)
+        self.assertEqual(increment_rbac_generation(), generation + 2)
+        self.assertEqual(get_rbac_generation(), generation + 2)
+        self.assertEqual(get_current_rbac_generation(), generation + 2)
+
+    def test_service_mutators_increment_generation(self):
+        generation = get_rbac_generation()
+
+        role_db = rbac_service.create_role(name="generation_role")
+        self.assertEqual(get_rbac_generation(), generation + 1)
+
+        rbac_service.assign_role_to_user(role_db=role_db, user_db=self.user_db)
+        self.assertEqual(get_rbac_generation(), generation + 2)
+
+        rbac_service.revoke_role_from_user(role_db=role_db, user_db=self.user_db)
+        self.assertEqual(get_rbac_generation(), generation + 3)
+
+    def test_service_mutators_dont_increment_generation_when_checks_are_disabled(self):
+        cfg.CONF.set_override(name="generation_check_enable", override=False, group="rbac")
+        generation = get_rbac_generation()
+
+        role_db = rbac_service.create_role(name="generation_role")
+        rbac_service.assign_role_to_user(role_db=role_db, user_db=self.user_db)
+        self.assertEqual(get_rbac_generation(), generation)
+
+    def test_user_permissions_cache_is_cleared_on_generation_change(self):
+        cfg.CONF.set_override(name="permission_cache_enable", override=True, group="rbac")
+
+        rbac_service.get_roles_for_user(user_db=self.user_db)
+        self.assertTrue(self.user_db.name in get_user_permissions_cache())
+
+        # Simulate change made by a different process
+        increment_rbac_generation()
+        self.assertFalse(self.user_db.name in get_user_permissions_cache())
+
+    def test_permission_snapshot_is_rebuilt_on_generation_change(self):
+        cfg.CONF.set_override(name="permission_snapshot_enable", override=True, group="rbac")
+
+        snapshot_1 = get_permission_snapshot()
+        snapshot_2 = get_permission_snapshot()
+        self.assertTrue(snapshot_1 is snapshot_2)
+
+        # Simulate change made by a different process
+        increment_rbac_generation()
+
+        snapshot_3 = get_permission_snapshot()
+        self.assertFalse(snapshot_1 is snapshot_3)
+        self.assertEqual(snapshot_3.generation, get_rbac_generation())
@@ -0,0 +1,47 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import sys
+import pkgutil
+import unittest
+import subprocess
+
+import st2rbac_backend
+
+__all__ = ["ModuleImportsTestCase"]
+
+
+class ModuleImportsTestCase(unittest.TestCase):
+    def test_all_modules_can_be_imported_first(self):
+        # Note: Each module is imported in a fresh interpreter since circular imports only fail
+        # for some import orders
+        module_names = [
+            "st2rbac_backend.%s" % (name)
+            for _, name, _ in pkgutil.iter_modules(st2rbac_backend.__path__)
+        ]
+        self.assertTrue(module_names)
+
+        for module_name in module_names:
+            process = subprocess.Popen(
+                [sys.executable, "-c", "import %s" % (module_name)],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            _, stderr = process.communicate()
+            self.assertEqual(
+                process.returncode, 0, "Failed to import %s: %s" % (module_name, stderr)
+            )
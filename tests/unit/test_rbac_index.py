@@ -0,0 +1,292 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+from oslo_config import cfg
+
+from st2common.constants.keyvalue import FULL_SYSTEM_SCOPE, FULL_USER_SCOPE
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.rbac.types import SystemRole
+from st2common.models.db.action import ActionDB
+from st2common.models.db.auth import UserDB
+from st2common.models.db.keyvalue import KeyValuePairDB
+from st2common.models.db.trace import TraceDB
+from st2tests import config as tests_config
+
+from st2rbac_backend.resolvers import ActionPermissionsResolver
+from st2rbac_backend.resolvers import ExecutionPermissionsResolver
+from st2rbac_backend.resolvers import KeyValuePermissionsResolver
+from st2rbac_backend.resolvers import TracePermissionsResolver
+from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.snapshot import use_permission_snapshot
+from tests.base import build_permission_snapshot
+
+__all__ = ["PermissionGrantsInvertedIndexTestCase"]
+
+
+class PermissionGrantsInvertedIndexTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(PermissionGrantsInvertedIndexTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def setUp(self):
+        super(PermissionGrantsInvertedIndexTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+
+        roles = {
+            SystemRole.ADMIN: [],
+            SystemRole.OBSERVER: [],
+            "action_1_view": [
+                ("action:pack_1:action_1", ResourceType.ACTION, [PermissionType.ACTION_VIEW])
+            ],
+            "action_1_execute": [
+                ("action:pack_1:action_1", ResourceType.ACTION, [PermissionType.ACTION_EXECUTE])
+            ],
+            "pack_2_all": [("pack:pack_2", ResourceType.PACK, [PermissionType.ACTION_ALL])],
+            "action_list": [(None, None, [PermissionType.ACTION_LIST])],
+            "deploy_actions_execute": [
+                ("action:pack_1:deploy_*", ResourceType.ACTION, [PermissionType.ACTION_EXECUTE]),
+                ("action:pack_?:deploy_app", ResourceType.ACTION, [PermissionType.ACTION_VIEW]),
+            ],
+            "trace_1_view": [("trace:trace_1", ResourceType.TRACE, [PermissionType.TRACE_VIEW])],
+            "kvp_1_all": [
+                (
+                    "key_value_pair:%s:key1" % (FULL_SYSTEM_SCOPE),
+                    ResourceType.KEY_VALUE_PAIR,
+                    [PermissionType.KEY_VALUE_PAIR_ALL],
+                )
+            ],
+        }
+        assignments = {
+            "admin": [SystemRole.ADMIN],
+            "observer": [SystemRole.OBSERVER],
+            "action_1_view": ["action_1_view"],
+            "action_1_execute": ["action_1_execute"],
+            "pack_2_all": ["pack_2_all", "action_list"],
+            "deploy_actions": ["deploy_actions_execute"],
+            "trace_1_view": ["trace_1_view"],
+            "kvp_1_all": ["kvp_1_all"],
+            "no_roles": [],
+        }
+        self.snapshot = build_permission_snapshot(roles=roles, assignments=assignments)
+
+        self.action_1_db = ActionDB(pack="pack_1", name="action_1", ref="pack_1.action_1")
+        self.action_2_db = ActionDB(pack="pack_2", name="action_1", ref="pack_2.action_1")
+
+    def test_get_role_names_and_usernames(self):
+        index = self.snapshot.get_inverted_index()
+
+        resources = [("action:pack_1:action_1", ResourceType.ACTION)]
+        permission_types = [PermissionType.ACTION_VIEW]
+        self.assertEqual(
+            index.get_role_names(resources=resources, permission_types=permission_types),
+            set(["action_1_view"]),
+        )
+        self.assertEqual(
+            index.get_usernames(resources=resources, permission_types=permission_types),
+            set(["action_1_view"]),
+        )
+        self.assertEqual(
+            index.get_usernames(
+                resources=resources,
+                permission_types=permission_types,
+                system_role_names=[SystemRole.ADMIN],
+            ),
+            set(["action_1_view", "admin"]),
+        )
+
+        # Global grants
+        self.assertEqual(
+            index.get_usernames(
+                resources=[(None, None)], permission_types=[PermissionType.ACTION_LIST]
+            ),
+            set(["pack_2_all"]),
+        )
+
+        # No matching grants
+        self.assertEqual(
+            index.get_usernames(
+                resources=[("action:pack_3:action_1", ResourceType.ACTION)],
+                permission_types=[PermissionType.ACTION_VIEW],
+            ),
+            set([]),
+        )
+
+        self.assertEqual(index.get_usernames_for_role(SystemRole.OBSERVER), set(["observer"]))
+
+    def test_get_role_names_pattern_grants(self):
+        index = self.snapshot.get_inverted_index()
+
+        resources = [("action:pack_1:deploy_app", ResourceType.ACTION)]
+        self.assertEqual(
+            index.get_role_names(
+                resources=resources,
+                permission_types=[PermissionType.ACTION_EXECUTE],
+                match_patterns=True,
+            ),
+            set(["deploy_actions_execute"]),
+        )
+
+        # Pattern grants are only matched when requested
+        self.assertEqual(
+            index.get_role_names(
+                resources=resources, permission_types=[PermissionType.ACTION_EXECUTE]
+            ),
+            set([]),
+        )
+
+        # Permission types need to match
+        self.assertEqual(
+            index.get_role_names(
+                resources=[("action:pack_3:deploy_app", ResourceType.ACTION)],
+                permission_types=[PermissionType.ACTION_EXECUTE],
+                match_patterns=True,
+            ),
+            set([]),
+        )
+        self.assertEqual(
+            index.get_usernames(
+                resources=[("action:pack_3:deploy_app", ResourceType.ACTION)],
+                permission_types=[PermissionType.ACTION_VIEW],
+                match_patterns=True,
+            ),
+            set(["deploy_actions"]),
+        )
+
+        # No pattern grants for other resource types
+        self.assertEqual(
+            index.get_role_names(
+                resources=[("rule:pack_1:deploy_app", ResourceType.RULE)],
+                permission_types=[PermissionType.ACTION_EXECUTE],
+                match_patterns=True,
+            ),
+            set([]),
+        )
+
+    def test_generic_resolver_implementation(self):
+        trace_1_db = TraceDB(uid="trace:trace_1", trace_tag="trace_1")
+        trace_2_db = TraceDB(uid="trace:trace_2", trace_tag="trace_2")
+        resolver = TracePermissionsResolver()
+
+        with use_permission_snapshot(self.snapshot):
+            result = resolver.get_usernames_with_resource_db_permission(
+                resource_db=trace_1_db, permission_type=PermissionType.TRACE_VIEW
+            )
+            self.assertEqual(result, set(["admin", "observer", "trace_1_view"]))
+
+            result = resolver.get_usernames_with_resource_db_permission(
+                resource_db=trace_2_db, permission_type=PermissionType.TRACE_VIEW
+            )
+            self.assertEqual(result, set(["admin", "observer"]))
+
+    def test_key_value_pair_scopes(self):
+        resolver = KeyValuePermissionsResolver()
+
+        system_kvp_db = KeyValuePairDB(
+            uid="key_value_pair:%s:key1" % (FULL_SYSTEM_SCOPE), scope=FULL_SYSTEM_SCOPE, name="key1"
+        )
+        user_kvp_db = KeyValuePairDB(
+            uid="key_value_pair:%s:kvp_1_all:key1" % (FULL_USER_SCOPE),
+            scope=FULL_USER_SCOPE,
+            name="kvp_1_all:key1",
+        )
+
+        with use_permission_snapshot(self.snapshot):
+            result = resolver.get_usernames_with_resource_db_permission(
+                resource_db=system_kvp_db, permission_type=PermissionType.KEY_VALUE_PAIR_SET
+            )
+            self.assertEqual(result, set(["admin", "kvp_1_all"]))
+
+            # User scoped key value pairs are only accessible by the owner and system roles
+            result = resolver.get_usernames_with_resource_db_permission(
+                resource_db=user_kvp_db, permission_type=PermissionType.KEY_VALUE_PAIR_VIEW
+            )
+            self.assertEqual(result, set(["admin", "observer", "kvp_1_all"]))
+
+    def test_rbac_service(self):
+        resources = [
+            ("action:pack_1:action_1", ResourceType.ACTION),
+            ("pack:pack_1", ResourceType.PACK),
+        ]
+
+        with use_permission_snapshot(self.snapshot):
+            result = rbac_service.get_usernames_for_resources(
+                resources=resources,
+                permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE],
+            )
+            self.assertEqual(result, set(["action_1_execute"]))
+
+            result = rbac_service.get_role_names_for_resources(
+                resources=resources,
+                permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE],
+            )
+            self.assertEqual(result, set(["action_1_execute"]))
+
+    def test_resolvers_match_permission_checks(self):
+        resolver = ActionPermissionsResolver()
+        executions_resolver = ExecutionPermissionsResolver()
+        usernames = ["admin", "observer", "action_1_view", "action_1_execute", "pack_2_all"]
+
+        with use_permission_snapshot(self.snapshot):
+            for action_db in [self.action_1_db, self.action_2_db]:
+                execution = {"action": {"uid": action_db.get_uid(), "pack": action_db.pack}}
+
+                for permission_type in [
+                    PermissionType.ACTION_VIEW,
+                    PermissionType.ACTION_EXECUTE,
+                    PermissionType.ACTION_DELETE,
+                ]:
+                    expected = set(
+                        [
+                            username
+                            for username in usernames
+                            if resolver.user_has_resource_db_permission(
+                                user_db=UserDB(name=username),
+                                resource_db=action_db,
+                                permission_type=permission_type,
+                            )
+                        ]
+                    )
+                    result = resolver.get_usernames_with_resource_db_permission(
+                        resource_db=action_db, permission_type=permission_type
+                    )
+                    self.assertEqual(result, expected)
+
+                for permission_type in [
+                    PermissionType.EXECUTION_VIEW,
+                    PermissionType.EXECUTION_STOP,
+                ]:
+                    expected = set(
+                        [
+                            username
+                            for username in usernames
+                            if executions_resolver.user_has_resource_db_permission(
+                                user_db=UserDB(name=username),
+                                resource_db=execution,
+                                permission_type=permission_type,
+                            )
+                        ]
+                    )
+                    result = executions_resolver.get_usernames_with_resource_db_permission(
+                        resource_db=execution, permission_type=permission_type
+                    )
+                    self.assertEqual(result, expected)
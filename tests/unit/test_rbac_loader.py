@@ -19,10 +19,13 @@ import os
 import unittest
 import mock
 import jsonschema
+from oslo_config import cfg
 
+from st2common.models.api.rbac import RoleDefinitionFileFormatAPI
 from st2tests import config
 from st2tests.fixturesloader import get_fixtures_base_path
 from st2rbac_backend.loader import RBACDefinitionsLoader
+from st2rbac_backend.loader import get_role_definitions_in_inheritance_order
 
 __all__ = [
     'RBACDefinitionsLoaderTestCase'
@@ -254,6 +257,88 @@ class RBACDefinitionsLoaderTestCase(unittest.TestCase):
         self.assertFalse(role_mapping_api.enabled)
         self.assertEqual(role_mapping_api.file_path, 'mappings/mapping_two.yaml')
 
+    def test_load_role_definition_permission_grant_patterns(self):
+        loader = RBACDefinitionsLoader()
+        loader._meta_loader = mock.Mock()
+
+        content = {
+            'name': 'role_patterns',
+            'permission_grants': [
+                {
+                    'resource_uid': 'action:examples:deploy_*',
+                    'permission_types': ['action_execute']
+                }
+            ]
+        }
+        loader._meta_loader.load.return_value = content
+
+        cfg.CONF.set_override(name='permission_grant_patterns_enable', override=True,
+                              group='rbac')
+        self.addCleanup(cfg.CONF.set_override, name='permission_grant_patterns_enable',
+                        override=False, group='rbac')
+
+        role_definition_api = loader.load_role_definition_from_file(file_path='roles/a.yaml')
+        self.assertEqual(role_definition_api.permission_grants[0]['resource_uid'],
+                         'action:examples:deploy_*')
+
+        # Resource type part of the pattern can't contain wildcards
+        content['permission_grants'][0]['resource_uid'] = 'act*:examples:deploy_*'
+        self.assertRaises(ValueError, loader.load_role_definition_from_file,
+                          file_path='roles/a.yaml')
+
+    def test_load_role_definitions_role_inheritance(self):
+        loader = RBACDefinitionsLoader()
+        loader._meta_loader = mock.Mock()
+
+        contents = {
+            'roles/base.yaml': {'name': 'base'},
+            'roles/team_1.yaml': {'name': 'team_1', 'extends': 'base'},
+            'roles/team_lead.yaml': {'name': 'team_lead', 'extends': ['team_1', 'base']}
+        }
+        loader._meta_loader.load.side_effect = lambda file_path: contents[file_path]
+        loader._get_role_definitions_file_paths = mock.Mock()
+        loader._get_role_definitions_file_paths.return_value = sorted(contents.keys())
+
+        result = loader.load_role_definitions()
+        self.assertEqual(result['base'].extends, [])
+        self.assertEqual(result['team_1'].extends, ['base'])
+        self.assertEqual(result['team_lead'].extends, ['team_1', 'base'])
+
+        # Extended role doesn't exist
+        contents['roles/team_1.yaml']['extends'] = ['unknown']
+        expected_msg = 'Role "team_1" extends role "unknown" which doesn\'t exist'
+        self.assertRaisesRegex(ValueError, expected_msg, loader.load_role_definitions)
+
+        # Inheritance cycle
+        contents['roles/team_1.yaml']['extends'] = ['team_lead']
+        expected_msg = 'Role inheritance cycle detected: team_1 -> team_lead -> team_1'
+        self.assertRaisesRegex(ValueError, expected_msg, loader.load_role_definitions)
+
+        # Invalid value
+        contents['roles/team_1.yaml']['extends'] = {'name': 'base'}
+        expected_msg = '"extends" needs to be a list of role names'
+        self.assertRaisesRegex(ValueError, expected_msg, loader.load_role_definitions)
+
+    def test_get_role_definitions_in_inheritance_order(self):
+        role_definition_apis = []
+        for name, extends in [('d', ['b', 'c']), ('c', ['a']), ('b', ['a']), ('a', [])]:
+            role_definition_api = RoleDefinitionFileFormatAPI(name=name)
+            role_definition_api.extends = extends
+            role_definition_apis.append(role_definition_api)
+
+        result = get_role_definitions_in_inheritance_order(role_definition_apis)
+        self.assertEqual([api.name for api in result], ['a', 'b', 'c', 'd'])
+
+        role_definition_apis[3].extends = ['d']
+        expected_msg = 'Role inheritance cycle detected: d -> b -> a -> d'
+        self.assertRaisesRegex(ValueError, expected_msg,
+                               get_role_definitions_in_inheritance_order, role_definition_apis)
+
+        role_definition_apis[3].extends = ['admin']
+        expected_msg = 'system roles can\'t be extended'
+        self.assertRaisesRegex(ValueError, expected_msg,
+                               get_role_definitions_in_inheritance_order, role_definition_apis)
+
     @mock.patch('glob.glob')
     def test_file_paths_sorting(self, mock_glob):
         mock_glob.return_value = [
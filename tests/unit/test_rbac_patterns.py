@@ -0,0 +1,297 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import re
+import unittest
+
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.persistence.auth import User
+from st2common.persistence.rbac import Role
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+from st2common.persistence.action import Action
+from st2common.models.db.auth import UserDB
+from st2common.models.db.rbac import RoleDB
+from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.models.db.rbac import PermissionGrantDB
+from st2common.models.db.action import ActionDB
+
+from st2rbac_backend.patterns import compile_permission_grant_patterns
+from st2rbac_backend.patterns import is_resource_uid_pattern
+from st2rbac_backend.patterns import resource_uid_pattern_to_regex
+from st2rbac_backend.patterns import validate_resource_uid_pattern
+from st2rbac_backend.resolvers import ActionPermissionsResolver
+from st2rbac_backend.service import RBACService as rbac_service
+from tests.unit.test_rbac_resolvers import BasePermissionsResolverTestCase
+
+__all__ = ["PermissionGrantPatternsTestCase", "PermissionGrantPatternsResolverTestCase"]
+
+
+class PermissionGrantPatternsTestCase(unittest.TestCase):
+    def test_is_resource_uid_pattern(self):
+        self.assertTrue(is_resource_uid_pattern("action:examples:deploy_*"))
+        self.assertTrue(is_resource_uid_pattern("action:examples:deploy_?"))
+        self.assertFalse(is_resource_uid_pattern("action:examples:deploy"))
+        self.assertFalse(is_resource_uid_pattern(None))
+
+    def test_validate_resource_uid_pattern(self):
+        validate_resource_uid_pattern("action:examples:deploy_*")
+        validate_resource_uid_pattern("key_value_pair:st2kv.system:app1:*")
+
+        invalid_patterns = ["*:examples:deploy", "act*on:examples", "invalid:*", "action:", "*"]
+        for resource_uid in invalid_patterns:
+            self.assertRaises(ValueError, validate_resource_uid_pattern, resource_uid)
+
+        self.assertRaises(
+            ValueError,
+            validate_resource_uid_pattern,
+            "action:examples:*",
+            resource_type=ResourceType.RULE,
+        )
+
+    def test_query_filter_matches_pattern_characters_literally_when_disabled(self):
+        resolver = ActionPermissionsResolver()
+
+        query_filter = resolver._get_resource_or_pack_query_filter(
+            resource_uids=set(["action:examples:deploy_*"]),
+            pack_uids=set([]),
+            uid_field_name="uid",
+            pack_field_name="pack",
+            resource_type=ResourceType.ACTION,
+            patterns_matcher=None,
+        )
+        self.assertEqual(query_filter.query, {"uid__in": ["action:examples:deploy_*"]})
+
+    def test_resource_uid_pattern_to_regex(self):
+        regex = re.compile(resource_uid_pattern_to_regex("action:examples.1:deploy_*"))
+
+        self.assertTrue(regex.match("action:examples.1:deploy_"))
+        self.assertTrue(regex.match("action:examples.1:deploy_app"))
+        self.assertFalse(regex.match("action:examples11:deploy_app"))
+        self.assertFalse(regex.match("action:examples.1:undeploy_app"))
+
+        regex = re.compile(resource_uid_pattern_to_regex("action:examples:run?"))
+        self.assertTrue(regex.match("action:examples:run1"))
+        self.assertFalse(regex.match("action:examples:run"))
+        self.assertFalse(regex.match("action:examples:run12"))
+
+    def test_compile_permission_grant_patterns(self):
+        permission_grant_dbs = [
+            PermissionGrantDB(
+                resource_uid="action:examples:deploy",
+                resource_type=ResourceType.ACTION,
+                permission_types=[PermissionType.ACTION_EXECUTE],
+            ),
+        ]
+        self.assertIsNone(compile_permission_grant_patterns(permission_grant_dbs))
+
+        permission_grant_dbs.extend(
+            [
+                PermissionGrantDB(
+                    resource_uid="action:examples:deploy_*",
+                    resource_type=ResourceType.ACTION,
+                    permission_types=[PermissionType.ACTION_EXECUTE],
+                ),
+                PermissionGrantDB(
+                    resource_uid="action:examples:view_*",
+                    resource_type=ResourceType.ACTION,
+                    permission_types=[PermissionType.ACTION_VIEW],
+                ),
+                PermissionGrantDB(
+                    resource_uid="pack:team_*",
+                    resource_type=ResourceType.PACK,
+                    permission_types=[PermissionType.ACTION_ALL],
+                ),
+            ]
+        )
+        matcher = compile_permission_grant_patterns(permission_grant_dbs)
+
+        self.assertTrue(matcher.matches("action:examples:deploy_app"))
+        self.assertTrue(
+            matcher.matches(
+                "action:examples:deploy_app",
+                resource_types=[ResourceType.ACTION],
+                permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE],
+            )
+        )
+        self.assertFalse(
+            matcher.matches(
+                "action:examples:deploy_app",
+                resource_types=[ResourceType.ACTION],
+                permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_DELETE],
+            )
+        )
+        self.assertFalse(
+            matcher.matches("action:examples:deploy_app", resource_types=[ResourceType.PACK])
+        )
+        self.assertTrue(
+            matcher.matches(
+                "action:examples:view_app", permission_types=[PermissionType.ACTION_VIEW]
+            )
+        )
+        self.assertTrue(matcher.matches("pack:team_1", resource_types=[ResourceType.PACK]))
+        self.assertFalse(matcher.matches("pack:other", resource_types=[ResourceType.PACK]))
+
+        self.assertEqual(
+            matcher.get_resource_uid_patterns(ResourceType.ACTION),
+            ["action:examples:deploy_*", "action:examples:view_*"],
+        )
+        self.assertEqual(matcher.get_resource_uid_patterns(ResourceType.RULE), [])
+
+
+class PermissionGrantPatternsResolverTestCase(BasePermissionsResolverTestCase):
+    def setUp(self):
+        super(PermissionGrantPatternsResolverTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="permission_grant_patterns_enable", override=True, group="rbac")
+
+        for pack, name in [
+            ("examples", "deploy_app"),
+            ("examples", "deploy_db"),
+            ("examples", "undeploy_app"),
+            ("team_1", "cleanup"),
+            ("other", "cleanup"),
+        ]:
+            action_db = ActionDB(
+                pack=pack, name=name, entry_point="", runner_type={"name": "local-shell-cmd"}
+            )
+            action_db = Action.add_or_update(action_db)
+            self.resources["%s.%s" % (pack, name)] = action_db
+
+        grant_1_db = PermissionGrantDB(
+            resource_uid="action:examples:deploy_*",
+            resource_type=ResourceType.ACTION,
+            permission_types=[PermissionType.ACTION_EXECUTE],
+        )
+        grant_1_db = PermissionGrant.add_or_update(grant_1_db)
+
+        grant_2_db = PermissionGrantDB(
+            resource_uid="pack:team_*",
+            resource_type=ResourceType.PACK,
+            permission_types=[PermissionType.ACTION_ALL],
+        )
+        grant_2_db = PermissionGrant.add_or_update(grant_2_db)
+
+        role_db = RoleDB(
+            name="pattern_grants", permission_grants=[str(grant_1_db.id), str(grant_2_db.id)]
+        )
+        self.roles["pattern_grants"] = Role.add_or_update(role_db)
+
+        user_db = User.add_or_update(UserDB(name="pattern_grants"))
+        self.users["pattern_grants"] = user_db
+
+        role_assignment_db = UserRoleAssignmentDB(
+            user=user_db.name,
+            role=role_db.name,
+            source="assignments/%s.yaml" % user_db.name,
+        )
+        UserRoleAssignment.add_or_update(role_assignment_db)
+
+    def tearDown(self):
+        super(PermissionGrantPatternsResolverTestCase, self).tearDown()
+
+        cfg.CONF.set_override(name="permission_grant_patterns_enable", override=False, group="rbac")
+
+    def test_user_has_matching_permission_grant(self):
+        user_db = self.users["pattern_grants"]
+
+        self.assertTrue(
+            rbac_service.user_has_matching_permission_grant(
+                user_db=user_db,
+                resource_uid="action:examples:deploy_app",
+                resource_types=[ResourceType.ACTION],
+                permission_types=[PermissionType.ACTION_EXECUTE],
+            )
+        )
+        self.assertFalse(
+            rbac_service.user_has_matching_permission_grant(
+                user_db=user_db,
+                resource_uid="action:examples:undeploy_app",
+                resource_types=[ResourceType.ACTION],
+                permission_types=[PermissionType.ACTION_EXECUTE],
+            )
+        )
+
+        # Patterns are ignored when the feature is disabled
+        cfg.CONF.set_override(name="permission_grant_patterns_enable", override=False, group="rbac")
+        self.assertFalse(
+            rbac_service.user_has_matching_permission_grant(
+                user_db=user_db,
+                resource_uid="action:examples:deploy_app",
+                resource_types=[ResourceType.ACTION],
+                permission_types=[PermissionType.ACTION_EXECUTE],
+            )
+        )
+
+    def test_user_has_resource_db_permission(self):
+        resolver = ActionPermissionsResolver()
+        user_db = self.users["pattern_grants"]
+
+        for name in ["examples.deploy_app", "examples.deploy_db", "team_1.cleanup"]:
+            self.assertUserHasResourceDbPermission(
+                resolver=resolver,
+                user_db=user_db,
+                resource_db=self.resources[name],
+                permission_type=PermissionType.ACTION_EXECUTE,
+            )
+
+        for name in ["examples.undeploy_app", "other.cleanup"]:
+            self.assertUserDoesntHaveResourceDbPermission(
+                resolver=resolver,
+                user_db=user_db,
+                resource_db=self.resources[name],
+                permission_type=PermissionType.ACTION_EXECUTE,
+            )
+
+        # "action_execute" grant doesn't imply "action_delete"
+        self.assertUserDoesntHaveResourceDbPermission(
+            resolver=resolver,
+            user_db=user_db,
+            resource_db=self.resources["examples.deploy_app"],
+            permission_type=PermissionType.ACTION_DELETE,
+        )
+
+    def test_filter_resource_dbs_and_query_filter(self):
+        resolver = ActionPermissionsResolver()
+        user_db = self.users["pattern_grants"]
+        resource_dbs = list(Action.get_all())
+
+        for permission_type in [PermissionType.ACTION_VIEW, PermissionType.ACTION_EXECUTE]:
+            expected = [
+                resource_db
+                for resource_db in resource_dbs
+                if resolver.user_has_resource_db_permission(
+                    user_db=user_db, resource_db=resource_db, permission_type=permission_type
+                )
+            ]
+
+            result = resolver.filter_resource_dbs_by_permission(
+                user_db=user_db, resource_dbs=resource_dbs, permission_type=permission_type
+            )
+            self.assertEqual(result, expected)
+
+            query_filter = resolver.get_permission_query_filter(
+                user_db=user_db, permission_type=permission_type
+            )
+            result = list(Action.query(query_filter))
+            self.assertEqual(
+                sorted([resource_db.id for resource_db in result]),
+                sorted([resource_db.id for resource_db in expected]),
+            )
@@ -0,0 +1,125 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.models.db.rbac import PermissionGrantDB
+
+from st2rbac_backend.permissions import PermissionImplications
+from st2rbac_backend.permissions import get_permission_type_bit
+from st2rbac_backend.permissions import get_permission_types_mask
+from st2rbac_backend.resolvers import ActionPermissionsResolver
+from st2rbac_backend.snapshot import filter_permission_grants
+
+__all__ = ["PermissionsTestCase"]
+
+
+class PermissionsTestCase(unittest.TestCase):
+    def test_permission_type_bits_are_unique(self):
+        bits = [
+            get_permission_type_bit(permission_type)
+            for permission_type in PermissionType.get_valid_values()
+        ]
+        self.assertEqual(len(bits), len(set(bits)))
+
+        for bit in bits:
+            # Each permission type is represented by a single bit
+            self.assertEqual(bin(bit).count("1"), 1)
+
+        # Unknown permission types are assigned a new bit on first use
+        bit = get_permission_type_bit("custom_view")
+        self.assertFalse(bit in bits)
+        self.assertEqual(get_permission_type_bit("custom_view"), bit)
+
+    def test_get_permission_types_mask(self):
+        self.assertEqual(get_permission_types_mask([]), 0)
+        self.assertEqual(get_permission_types_mask(None), 0)
+
+        mask = get_permission_types_mask([PermissionType.ACTION_VIEW, PermissionType.ACTION_ALL])
+        self.assertTrue(mask & get_permission_type_bit(PermissionType.ACTION_VIEW))
+        self.assertTrue(mask & get_permission_type_bit(PermissionType.ACTION_ALL))
+        self.assertFalse(mask & get_permission_type_bit(PermissionType.ACTION_EXECUTE))
+
+    def test_permission_implications(self):
+        view_grant_permission_types = ActionPermissionsResolver.view_grant_permission_types
+        implications = PermissionImplications(
+            resource_type=ResourceType.ACTION,
+            view_grant_permission_types=view_grant_permission_types,
+        )
+
+        # "view" is implied by the view grant permission types
+        implied_by = implications.get_implied_by_permission_types(PermissionType.ACTION_VIEW)
+        self.assertEqual(
+            implied_by, tuple(view_grant_permission_types) + (PermissionType.ACTION_VIEW,)
+        )
+
+        # Other permission types are implied by "all"
+        implied_by = implications.get_implied_by_permission_types(PermissionType.ACTION_EXECUTE)
+        self.assertEqual(implied_by, (PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE))
+
+        implied_by = implications.get_implied_by_permission_types(PermissionType.ACTION_ALL)
+        self.assertEqual(implied_by, (PermissionType.ACTION_ALL,))
+
+        # Masks
+        mask = implications.get_implied_by_mask(PermissionType.ACTION_EXECUTE)
+        self.assertTrue(mask & get_permission_type_bit(PermissionType.ACTION_ALL))
+        self.assertTrue(mask & get_permission_type_bit(PermissionType.ACTION_EXECUTE))
+        self.assertFalse(mask & get_permission_type_bit(PermissionType.ACTION_VIEW))
+
+    def test_filter_permission_grants(self):
+        permission_grant_dbs = [
+            PermissionGrantDB(
+                resource_uid="pack:test1",
+                resource_type=ResourceType.PACK,
+                permission_types=[PermissionType.ACTION_VIEW],
+            ),
+            PermissionGrantDB(
+                resource_uid="action:test1:action1",
+                resource_type=ResourceType.ACTION,
+                permission_types=[PermissionType.ACTION_VIEW, PermissionType.ACTION_EXECUTE],
+            ),
+            PermissionGrantDB(
+                resource_uid="action:test1:action2",
+                resource_type=ResourceType.ACTION,
+                permission_types=[],
+            ),
+        ]
+
+        result = filter_permission_grants(permission_grant_dbs=permission_grant_dbs)
+        self.assertEqual(result, permission_grant_dbs)
+
+        result = filter_permission_grants(
+            permission_grant_dbs=permission_grant_dbs,
+            permission_types=[PermissionType.ACTION_ALL, PermissionType.ACTION_EXECUTE],
+        )
+        self.assertEqual(result, [permission_grant_dbs[1]])
+
+        result = filter_permission_grants(
+            permission_grant_dbs=permission_grant_dbs,
+            resource_types=[ResourceType.ACTION],
+            permission_types=[PermissionType.ACTION_VIEW],
+        )
+        self.assertEqual(result, [permission_grant_dbs[1]])
+
+        result = filter_permission_grants(
+            permission_grant_dbs=permission_grant_dbs,
+            permission_types=[PermissionType.ACTION_VIEW],
+            limit=1,
+        )
+        self.assertEqual(result, [permission_grant_dbs[0]])
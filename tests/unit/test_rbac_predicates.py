@@ -0,0 +1,164 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.rbac.types import SystemRole
+from st2common.models.db.auth import UserDB
+from st2tests import config as tests_config
+
+from st2rbac_backend.cache import invalidate_permission_caches
+from st2rbac_backend.predicates import ResourcePermissionPredicate
+from st2rbac_backend.resolvers import ExecutionPermissionsResolver
+from st2rbac_backend.snapshot import use_permission_snapshot
+from tests.base import build_permission_snapshot
+
+__all__ = ["ResourcePermissionPredicateTestCase"]
+
+
+class ResourcePermissionPredicateTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(ResourcePermissionPredicateTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def setUp(self):
+        super(ResourcePermissionPredicateTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+
+        self.roles = {
+            SystemRole.OBSERVER: [],
+            "action_1_view": [
+                ("action:pack_1:action_1", ResourceType.ACTION, [PermissionType.ACTION_VIEW])
+            ],
+            "pack_2_all": [("pack:pack_2", ResourceType.PACK, [PermissionType.ACTION_ALL])],
+        }
+        self.assignments = {
+            "observer": [SystemRole.OBSERVER],
+            "action_1_view": ["action_1_view"],
+            "pack_2_all": ["pack_2_all"],
+            "no_roles": [],
+        }
+        self.snapshot = build_permission_snapshot(roles=self.roles, assignments=self.assignments)
+
+        # Serialized executions, same as execution events which are sent over st2stream
+        self.execution_1 = {"action": {"uid": "action:pack_1:action_1", "pack": "pack_1"}}
+        self.execution_2 = {"action": {"uid": "action:pack_1:action_2", "pack": "pack_1"}}
+        self.execution_3 = {"action": {"uid": "action:pack_2:action_1", "pack": "pack_2"}}
+        self.executions = [self.execution_1, self.execution_2, self.execution_3]
+
+    def test_predicate(self):
+        expected = {
+            "observer": [True, True, True],
+            "action_1_view": [True, False, False],
+            "pack_2_all": [False, False, True],
+            "no_roles": [False, False, False],
+        }
+
+        with use_permission_snapshot(self.snapshot):
+            for username, expected_result in expected.items():
+                predicate = ResourcePermissionPredicate(
+                    user_db=UserDB(name=username), permission_type=PermissionType.EXECUTION_VIEW
+                )
+                result = [predicate(execution) for execution in self.executions]
+                self.assertEqual(result, expected_result, username)
+
+    def test_predicate_is_only_compiled_once(self):
+        resolver = ExecutionPermissionsResolver
+
+        with use_permission_snapshot(self.snapshot):
+            with mock.patch.object(
+                resolver,
+                "get_resource_db_permission_predicate",
+                wraps=resolver().get_resource_db_permission_predicate,
+            ) as mock_compile:
+                predicate = ResourcePermissionPredicate(
+                    user_db=UserDB(name="action_1_view"),
+                    permission_type=PermissionType.EXECUTION_VIEW,
+                )
+
+                for _ in range(0, 100):
+                    for execution in self.executions:
+                        predicate(execution)
+
+                self.assertEqual(mock_compile.call_count, 1)
+
+    def test_predicate_is_refreshed_on_rbac_invalidation(self):
+        user_db = UserDB(name="action_1_view")
+
+        with use_permission_snapshot(self.snapshot):
+            predicate = ResourcePermissionPredicate(
+                user_db=user_db, permission_type=PermissionType.EXECUTION_VIEW
+            )
+            self.assertFalse(predicate(self.execution_3))
+            self.assertFalse(predicate.is_stale())
+
+        # User is granted a new role
+        self.assignments["action_1_view"].append("pack_2_all")
+        snapshot = build_permission_snapshot(roles=self.roles, assignments=self.assignments)
+
+        with use_permission_snapshot(snapshot):
+            # Predicate is not refreshed until RBAC data is invalidated
+            self.assertFalse(predicate(self.execution_3))
+
+            invalidate_permission_caches(username=user_db.name)
+            self.assertTrue(predicate.is_stale())
+            self.assertTrue(predicate(self.execution_3))
+            self.assertFalse(predicate.is_stale())
+
+    @mock.patch("st2rbac_backend.predicates.time")
+    def test_predicate_is_refreshed_when_expired(self, mock_time):
+        cfg.CONF.set_override(name="permission_cache_ttl", override=30, group="rbac")
+        self.addCleanup(cfg.CONF.clear_override, name="permission_cache_ttl", group="rbac")
+        mock_time.monotonic.return_value = 100
+        user_db = UserDB(name="action_1_view")
+
+        with use_permission_snapshot(self.snapshot):
+            predicate = ResourcePermissionPredicate(
+                user_db=user_db, permission_type=PermissionType.EXECUTION_VIEW
+            )
+            self.assertFalse(predicate(self.execution_3))
+
+        # User is granted a new role by a different process (no invalidation)
+        self.assignments["action_1_view"].append("pack_2_all")
+        snapshot = build_permission_snapshot(roles=self.roles, assignments=self.assignments)
+
+        with use_permission_snapshot(snapshot):
+            mock_time.monotonic.return_value = 129
+            self.assertFalse(predicate.is_stale())
+            self.assertFalse(predicate(self.execution_3))
+
+            mock_time.monotonic.return_value = 130
+            self.assertTrue(predicate.is_stale())
+            self.assertTrue(predicate(self.execution_3))
+            self.assertFalse(predicate.is_stale())
+
+    def test_rbac_disabled(self):
+        cfg.CONF.set_override(name="enable", override=False, group="rbac")
+
+        with use_permission_snapshot(self.snapshot):
+            predicate = ResourcePermissionPredicate(
+                user_db=UserDB(name="no_roles"), permission_type=PermissionType.EXECUTION_VIEW
+            )
+            self.assertTrue(predicate(self.execution_1))
@@ -16,6 +16,8 @@
 from __future__ import absolute_import
 
 import six
+import mock
+import logging
 import unittest
 from oslo_config import cfg
 
@@ -35,6 +37,7 @@ from st2common.models.db.pack import PackDB
 from st2common.rbac.migrations import insert_system_roles
 from st2tests.base import CleanDbTestCase
 
+from st2rbac_backend import resolvers
 from st2rbac_backend.backend import RBACBackend
 from st2rbac_backend.service import RBACService as rbac_service
 
@@ -356,3 +359,52 @@ class PermissionsResolverUtilsTestCase(unittest.TestCase):
             self.backend.get_resolver_for_resource_type,
             resource_type="alias",
         )
+
+    def test_resolver_instances_are_reused(self):
+        resolver_1 = self.backend.get_resolver_for_resource_type(resource_type=ResourceType.ACTION)
+        resolver_2 = self.backend.get_resolver_for_resource_type(resource_type=ResourceType.ACTION)
+        resolver_3 = self.backend.get_resolver_for_permission_type(
+            permission_type=PermissionType.ACTION_EXECUTE
+        )
+        self.assertTrue(resolver_1 is resolver_2)
+        self.assertTrue(resolver_1 is resolver_3)
+
+        # All the valid permission types are mapped to the same resolver as their resource type
+        for permission_type in PermissionType.get_valid_values():
+            resource_type = PermissionType.get_resource_type(permission_type=permission_type)
+            resolver_1 = self.backend.get_resolver_for_permission_type(
+                permission_type=permission_type
+            )
+            resolver_2 = self.backend.get_resolver_for_resource_type(resource_type=resource_type)
+            self.assertTrue(resolver_1 is resolver_2)
+
+    @mock.patch.dict(resolvers._RESOLVERS_REGISTRY)
+    @mock.patch.dict(resolvers._PERMISSION_TYPE_TO_RESOLVER_MAP)
+    def test_register_resolver_for_custom_resource_type(self):
+        class CustomPermissionsResolver(resolvers.PermissionsResolver):
+            resource_type = "custom"
+
+        resolvers.register_resolver("custom", CustomPermissionsResolver)
+
+        resolver_1 = self.backend.get_resolver_for_resource_type(resource_type="custom")
+        resolver_2 = self.backend.get_resolver_for_permission_type(permission_type="custom_view")
+        self.assertTrue(isinstance(resolver_1, CustomPermissionsResolver))
+        self.assertTrue(resolver_1 is resolver_2)
+
+    @mock.patch.object(resolvers, "LOG")
+    def test_log_is_skipped_when_log_level_is_disabled(self, mock_log):
+        resolver = self.backend.get_resolver_for_resource_type(resource_type=ResourceType.PACK)
+        log_context = {"permission_type": PermissionType.PACK_INSTALL}
+
+        mock_log.isEnabledFor.return_value = False
+        resolver._log("Checking user permissions", extra=log_context)
+        self.assertEqual(mock_log.log.call_count, 0)
+
+        mock_log.isEnabledFor.return_value = True
+        resolver._log("Checking user permissions", extra=log_context)
+        mock_log.log.assert_called_once_with(
+            logging.DEBUG,
+            "PackPermissionsResolver.test_log_is_skipped_when_log_level_is_disabled: "
+            "Checking user permissions",
+            extra=log_context,
+        )
@@ -623,3 +623,109 @@ class ActionPermissionsResolverTestCase(BasePermissionsResolverTestCase):
             resource_db=resource_db,
             permission_types=permission_types,
         )
+
+    def test_filter_resource_dbs_by_permission(self):
+        resolver = ActionPermissionsResolver()
+        resource_dbs = [
+            self.resources["action_1"],
+            self.resources["action_2"],
+            self.resources["action_3"],
+        ]
+
+        # Admin and observer have access to all the actions
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=self.users["observer"],
+            resource_dbs=resource_dbs,
+            permission_type=PermissionType.ACTION_VIEW,
+        )
+        self.assertEqual(result, resource_dbs)
+
+        # "action_view" grant on pack_1
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=self.users["custom_role_action_pack_grant"],
+            resource_dbs=resource_dbs,
+            permission_type=PermissionType.ACTION_VIEW,
+        )
+        self.assertEqual(result, [self.resources["action_1"], self.resources["action_2"]])
+
+        # "action_view" grant on action_3
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=self.users["custom_role_action_grant"],
+            resource_dbs=resource_dbs,
+            permission_type=PermissionType.ACTION_VIEW,
+        )
+        self.assertEqual(result, [self.resources["action_3"]])
+
+        # No grants
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=self.users["no_roles"],
+            resource_dbs=resource_dbs,
+            permission_type=PermissionType.ACTION_VIEW,
+        )
+        self.assertEqual(result, [])
+
+        # Batch result needs to match result of the individual checks
+        permission_types = [
+            PermissionType.ACTION_VIEW,
+            PermissionType.ACTION_CREATE,
+            PermissionType.ACTION_MODIFY,
+            PermissionType.ACTION_DELETE,
+            PermissionType.ACTION_EXECUTE,
+            PermissionType.ACTION_ALL,
+        ]
+
+        for user_db in self.users.values():
+            for permission_type in permission_types:
+                expected = [
+                    resource_db
+                    for resource_db in resource_dbs
+                    if resolver.user_has_resource_db_permission(
+                        user_db=user_db, resource_db=resource_db, permission_type=permission_type
+                    )
+                ]
+                result = resolver.filter_resource_dbs_by_permission(
+                    user_db=user_db, resource_dbs=resource_dbs, permission_type=permission_type
+                )
+                self.assertEqual(result, expected)
+
+    def test_get_permission_query_filter(self):
+        resolver = ActionPermissionsResolver()
+
+        # Admin and observer have access to all the actions so no filtering is needed
+        query_filter = resolver.get_permission_query_filter(
+            user_db=self.users["observer"], permission_type=PermissionType.ACTION_VIEW
+        )
+        self.assertIsNone(query_filter)
+
+        # No grants, nothing should be returned
+        query_filter = resolver.get_permission_query_filter(
+            user_db=self.users["no_roles"], permission_type=PermissionType.ACTION_VIEW
+        )
+        self.assertEqual(list(Action.query(query_filter)), [])
+
+        # Result of the query needs to match result of the in-memory filtering
+        resource_dbs = list(Action.get_all())
+        permission_types = [
+            PermissionType.ACTION_VIEW,
+            PermissionType.ACTION_EXECUTE,
+            PermissionType.ACTION_ALL,
+        ]
+
+        for user_db in self.users.values():
+            for permission_type in permission_types:
+                expected = resolver.filter_resource_dbs_by_permission(
+                    user_db=user_db, resource_dbs=resource_dbs, permission_type=permission_type
+                )
+                query_filter = resolver.get_permission_query_filter(
+                    user_db=user_db, permission_type=permission_type
+                )
+
+                if query_filter is None:
+                    result = resource_dbs
+                else:
+                    result = list(Action.query(query_filter))
+
+                self.assertEqual(
+                    sorted([resource_db.id for resource_db in result]),
+                    sorted([resource_db.id for resource_db in expected]),
+                )
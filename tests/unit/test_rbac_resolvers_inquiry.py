@@ -15,6 +15,9 @@
 
 from __future__ import absolute_import
 
+import mock
+from bson.objectid import ObjectId
+
 from st2common.constants import action as action_constants
 from st2common.rbac.types import PermissionType
 from st2common.rbac.types import ResourceType
@@ -366,3 +369,66 @@ class InquiryPermissionsResolverTestCase(BasePermissionsResolverTestCase):
             resource_db=self.resources["inquiry_2"],
             permission_type=PermissionType.INQUIRY_RESPOND,
         )
+
+    def test_parent_workflow_lookup_is_cached(self):
+        resolver = InquiryPermissionsResolver()
+        parent_id = self.resources["inquiry_2"].parent
+
+        result = resolver._get_parent_action_and_pack_uids(parent_ids=[parent_id])
+        self.assertEqual(result, {parent_id: (self.resources["wf"].get_uid(), "pack:examples")})
+
+        # Second lookup should be served from the cache
+        with mock.patch.object(ActionExecutionDB, "_get_collection") as mock_get_collection:
+            result = resolver._get_parent_action_and_pack_uids(parent_ids=[parent_id])
+            self.assertEqual(result, {parent_id: (self.resources["wf"].get_uid(), "pack:examples")})
+            self.assertEqual(mock_get_collection.call_count, 0)
+
+        # Invalid and unknown ids are ignored
+        result = resolver._get_parent_action_and_pack_uids(
+            parent_ids=["invalid", "5a1d1ea3a6f5a12c3b8e9d61"]
+        )
+        self.assertEqual(result, {})
+
+    def test_parent_workflow_lookup_skips_documents_without_action(self):
+        resolver = InquiryPermissionsResolver()
+        parent_id_1 = "5a1d1ea3a6f5a12c3b8e9d62"
+        parent_id_2 = "5a1d1ea3a6f5a12c3b8e9d63"
+        documents = [
+            {"_id": ObjectId(parent_id_1)},
+            {"_id": ObjectId(parent_id_2), "action": {"uid": "action:examples:wf"}},
+        ]
+
+        with mock.patch.object(ActionExecutionDB, "_get_collection") as mock_get_collection:
+            mock_get_collection.return_value.find.return_value = documents
+            result = resolver._get_parent_action_and_pack_uids(
+                parent_ids=[parent_id_1, parent_id_2]
+            )
+
+        self.assertEqual(result, {})
+
+    def test_filter_resource_dbs_by_permission(self):
+        resolver = InquiryPermissionsResolver()
+        resource_dbs = [self.resources["inquiry_1"], self.resources["inquiry_2"]]
+
+        for user_db in self.users.values():
+            for permission_type in [PermissionType.INQUIRY_VIEW, PermissionType.INQUIRY_RESPOND]:
+                expected = [
+                    resource_db
+                    for resource_db in resource_dbs
+                    if resolver.user_has_resource_db_permission(
+                        user_db=user_db, resource_db=resource_db, permission_type=permission_type
+                    )
+                ]
+                result = resolver.filter_resource_dbs_by_permission(
+                    user_db=user_db, resource_dbs=resource_dbs, permission_type=permission_type
+                )
+                self.assertEqual(result, expected)
+
+        # Workflow grant is inherited only by the inquiry which has a parent
+        user_db = self.users["custom_role_inquiry_inherit"]
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=user_db,
+            resource_dbs=resource_dbs,
+            permission_type=PermissionType.INQUIRY_RESPOND,
+        )
+        self.assertEqual(result, [self.resources["inquiry_2"]])
@@ -37,6 +37,7 @@ __all__ = [
     "KeyValuePermissionsResolverTestCase",
     "KeyValueSystemScopePermissionsResolverTestCase",
     "KeyValueUserScopePermissionsResolverTestCase",
+    "KeyValueFilterResourceDbsTestCase",
 ]
 
 
@@ -83,6 +84,26 @@ class KeyValueSystemScopePermissionsResolverTestCase(KeyValuePermissionsResolver
         kvp_2_db = KeyValuePair.add_or_update(kvp_2_db)
         self.resources[kvp_2_db.uid] = kvp_2_db
 
+    def test_get_permission_query_filter(self):
+        resolver = KeyValuePermissionsResolver()
+
+        # System roles have access to all the key value pairs so no filtering is needed
+        query_filter = resolver.get_permission_query_filter(
+            user_db=self.users["admin"], permission_type=PermissionType.KEY_VALUE_PAIR_SET
+        )
+        self.assertIsNone(query_filter)
+
+        query_filter = resolver.get_permission_query_filter(
+            user_db=self.users["observer"], permission_type=PermissionType.KEY_VALUE_PAIR_VIEW
+        )
+        self.assertIsNone(query_filter)
+
+        # Query filters are not supported for custom roles, nothing should be returned
+        query_filter = resolver.get_permission_query_filter(
+            user_db=self.users["no_roles"], permission_type=PermissionType.KEY_VALUE_PAIR_VIEW
+        )
+        self.assertEqual(list(KeyValuePair.query(query_filter)), [])
+
     def test_admin_permissions_for_system_scope_kvps(self):
         resolver = KeyValuePermissionsResolver()
 
@@ -818,3 +839,89 @@ class KeyValueUserScopePermissionsResolverTestCase(KeyValuePermissionsResolverTe
             resource_db=kvp_1_db,
             permission_types=self.write_permission_types,
         )
+
+
+class KeyValueFilterResourceDbsTestCase(KeyValuePermissionsResolverTestCase):
+    def setUp(self):
+        super(KeyValueFilterResourceDbsTestCase, self).setUp()
+
+        user_1_db = User.add_or_update(UserDB(name="user201"))
+        self.users[user_1_db.name] = user_1_db
+
+        user_2_db = User.add_or_update(UserDB(name="user202"))
+        self.users[user_2_db.name] = user_2_db
+
+        self.kvp_dbs = []
+
+        for name in ["key1", "key2", "key3"]:
+            kvp_db = KeyValuePairDB(
+                uid="%s:%s:%s" % (ResourceType.KEY_VALUE_PAIR, FULL_SYSTEM_SCOPE, name),
+                scope=FULL_SYSTEM_SCOPE,
+                name=name,
+                value="val",
+            )
+            self.kvp_dbs.append(KeyValuePair.add_or_update(kvp_db))
+
+        for user_db in [user_1_db, user_2_db]:
+            key_ref = get_key_reference(FULL_USER_SCOPE, "mykey", user_db.name)
+            kvp_db = KeyValuePairDB(
+                uid="%s:%s:%s" % (ResourceType.KEY_VALUE_PAIR, FULL_USER_SCOPE, key_ref),
+                scope=FULL_USER_SCOPE,
+                name=key_ref,
+                value="myval",
+            )
+            self.kvp_dbs.append(KeyValuePair.add_or_update(kvp_db))
+
+        # user201 can read system kvp key1 and write system kvp key2
+        grant_1_db = PermissionGrantDB(
+            resource_uid=self.kvp_dbs[0].get_uid(),
+            resource_type=ResourceType.KEY_VALUE_PAIR,
+            permission_types=self.read_permission_types,
+        )
+        grant_1_db = PermissionGrant.add_or_update(grant_1_db)
+
+        grant_2_db = PermissionGrantDB(
+            resource_uid=self.kvp_dbs[1].get_uid(),
+            resource_type=ResourceType.KEY_VALUE_PAIR,
+            permission_types=[PermissionType.KEY_VALUE_PAIR_SET],
+        )
+        grant_2_db = PermissionGrant.add_or_update(grant_2_db)
+
+        role_db = RoleDB(
+            name="custom_role_system_kvps",
+            permission_grants=[str(grant_1_db.id), str(grant_2_db.id)],
+        )
+        role_db = Role.add_or_update(role_db)
+        self.roles[role_db.name] = role_db
+
+        role_assignment_db = UserRoleAssignmentDB(
+            user=user_1_db.name,
+            role=role_db.name,
+            source="assignments/%s.yaml" % user_1_db.name,
+        )
+        UserRoleAssignment.add_or_update(role_assignment_db)
+
+    def test_filter_resource_dbs_by_permission(self):
+        resolver = KeyValuePermissionsResolver()
+
+        for user_db in self.users.values():
+            for permission_type in self.all_permission_types:
+                expected = [
+                    kvp_db
+                    for kvp_db in self.kvp_dbs
+                    if resolver.user_has_resource_db_permission(
+                        user_db=user_db, resource_db=kvp_db, permission_type=permission_type
+                    )
+                ]
+                result = resolver.filter_resource_dbs_by_permission(
+                    user_db=user_db, resource_dbs=self.kvp_dbs, permission_type=permission_type
+                )
+                self.assertEqual(result, expected)
+
+        # user201 can see system kvp key1 and key2 (set implies view) and own kvp
+        result = resolver.filter_resource_dbs_by_permission(
+            user_db=self.users["user201"],
+            resource_dbs=self.kvp_dbs,
+            permission_type=PermissionType.KEY_VALUE_PAIR_VIEW,
+        )
+        self.assertEqual(result, [self.kvp_dbs[0], self.kvp_dbs[1], self.kvp_dbs[3]])
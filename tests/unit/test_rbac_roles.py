@@ -0,0 +1,114 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import SystemRole
+from st2common.models.db.auth import UserDB
+from st2tests import config as tests_config
+
+from st2rbac_backend.resolvers import ActionPermissionsResolver
+from st2rbac_backend.roles import UserRoleSet
+from st2rbac_backend.scope import get_request_scope
+from st2rbac_backend.scope import request_scope
+from st2rbac_backend.service import RBACService
+from st2rbac_backend.utils import RBACUtils
+
+__all__ = ["UserRoleSetTestCase"]
+
+
+class UserRoleSetTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super(UserRoleSetTestCase, cls).setUpClass()
+        tests_config.parse_args()
+
+    def setUp(self):
+        super(UserRoleSetTestCase, self).setUp()
+
+        cfg.CONF.set_override(name="enable", override=True, group="rbac")
+        cfg.CONF.set_override(name="backend", override="default", group="rbac")
+
+    def test_flags(self):
+        role_set = UserRoleSet(username="user_1", role_names=[SystemRole.SYSTEM_ADMIN])
+        self.assertTrue(role_set.is_system_admin)
+        self.assertTrue(role_set.is_admin)
+        self.assertFalse(role_set.is_observer)
+        self.assertTrue(role_set.has_system_role)
+
+        role_set = UserRoleSet(username="user_1", role_names=[SystemRole.ADMIN, "role_1"])
+        self.assertFalse(role_set.is_system_admin)
+        self.assertTrue(role_set.is_admin)
+        self.assertTrue(role_set.has_system_role)
+        self.assertTrue("role_1" in role_set)
+        self.assertTrue(role_set.has_role("role_1"))
+        self.assertFalse(role_set.has_role("role_2"))
+        self.assertEqual(len(role_set), 2)
+
+        role_set = UserRoleSet(username="user_1", role_names=[SystemRole.OBSERVER])
+        self.assertFalse(role_set.is_admin)
+        self.assertTrue(role_set.is_observer)
+        self.assertTrue(role_set.has_system_role)
+
+        role_set = UserRoleSet(username="user_1", role_names=[])
+        self.assertFalse(role_set.is_admin)
+        self.assertFalse(role_set.is_observer)
+        self.assertFalse(role_set.has_system_role)
+
+    def test_equality(self):
+        role_set_1 = UserRoleSet(username="user_1", role_names=["role_1", "role_2"])
+        role_set_2 = UserRoleSet(username="user_1", role_names=("role_2", "role_1"))
+        role_set_3 = UserRoleSet(username="user_2", role_names=["role_1", "role_2"])
+
+        self.assertEqual(role_set_1, role_set_2)
+        self.assertEqual(hash(role_set_1), hash(role_set_2))
+        self.assertNotEqual(role_set_1, role_set_3)
+
+    @mock.patch.object(
+        RBACService,
+        "get_role_names_for_user",
+        mock.Mock(return_value=frozenset([SystemRole.ADMIN])),
+    )
+    def test_role_set_is_retrieved_once_per_request_scope(self):
+        user_db = UserDB(name="user_1")
+        resolver = ActionPermissionsResolver()
+
+        with request_scope():
+            self.assertTrue(RBACUtils.user_is_admin(user_db=user_db))
+            self.assertFalse(RBACUtils.user_is_system_admin(user_db=user_db))
+            self.assertTrue(RBACUtils.user_has_role(user_db=user_db, role=SystemRole.ADMIN))
+            self.assertTrue(RBACUtils.user_has_system_role(user_db=user_db))
+            self.assertTrue(
+                resolver.user_has_permission(
+                    user_db=user_db, permission_type=PermissionType.ACTION_LIST
+                )
+            )
+
+            self.assertEqual(RBACService.get_role_names_for_user.call_count, 1)
+
+            # Role assignment change invalidates memoized role set
+            get_request_scope().invalidate(role_name=SystemRole.ADMIN)
+            self.assertTrue(RBACUtils.user_is_admin(user_db=user_db))
+            self.assertEqual(RBACService.get_role_names_for_user.call_count, 2)
+
+        # Role sets are not shared across request scopes
+        self.assertTrue(RBACUtils.user_is_admin(user_db=user_db))
+        self.assertEqual(RBACService.get_role_names_for_user.call_count, 3)
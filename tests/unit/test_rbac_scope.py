@@ -0,0 +1,181 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import mock
+
+from st2common.rbac.types import PermissionType
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+
+from st2rbac_backend.resolvers import PackPermissionsResolver
+from st2rbac_backend.scope import RequestScopeMiddleware
+from st2rbac_backend.scope import get_request_scope
+from st2rbac_backend.scope import request_scope
+from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.utils import RBACUtils as rbac_utils
+from tests.unit.test_rbac_resolvers import BasePermissionsResolverTestCase
+
+__all__ = ["RequestScopeTestCase"]
+
+
+class RequestScopeTestCase(BasePermissionsResolverTestCase):
+    def test_lookups_are_memoized_inside_request_scope(self):
+        user_db = self.users["custom_role_pack_grant"]
+        resolver = PackPermissionsResolver()
+
+        with mock.patch.object(
+            UserRoleAssignment, "query", wraps=UserRoleAssignment.query
+        ) as mock_assignment_query, mock.patch.object(
+            PermissionGrant, "query", wraps=PermissionGrant.query
+        ) as mock_grant_query:
+            with request_scope():
+                self.assertFalse(rbac_utils.user_is_admin(user_db=user_db))
+                self.assertFalse(rbac_utils.user_is_system_admin(user_db=user_db))
+                self.assertFalse(rbac_utils.user_has_system_role(user_db=user_db))
+
+                self.assertUserHasResourceDbPermission(
+                    resolver=resolver,
+                    user_db=user_db,
+                    resource_db=self.resources["pack_1"],
+                    permission_type=PermissionType.PACK_CREATE,
+                )
+                self.assertUserDoesntHaveResourceDbPermission(
+                    resolver=resolver,
+                    user_db=user_db,
+                    resource_db=self.resources["pack_2"],
+                    permission_type=PermissionType.PACK_CREATE,
+                )
+
+            self.assertEqual(mock_assignment_query.call_count, 1)
+            self.assertEqual(mock_grant_query.call_count, 1)
+
+    def test_user_is_admin_retrieves_roles_once(self):
+        with mock.patch.object(
+            UserRoleAssignment, "query", wraps=UserRoleAssignment.query
+        ) as mock_query:
+            self.assertFalse(rbac_utils.user_is_admin(user_db=self.users["observer"]))
+            self.assertEqual(mock_query.call_count, 1)
+
+    def test_implicit_scope_uses_existence_queries(self):
+        user_db = self.users["custom_role_pack_grant"]
+
+        with mock.patch(
+            "st2rbac_backend.service._load_permission_grant_dbs_for_roles"
+        ) as mock_load_permission_grants:
+            result = rbac_utils.user_has_resource_db_permission(
+                user_db=user_db,
+                resource_db=self.resources["pack_1"],
+                permission_type=PermissionType.PACK_CREATE,
+            )
+            self.assertTrue(result)
+            self.assertEqual(mock_load_permission_grants.call_count, 0)
+
+    def test_explicit_scope_nested_inside_implicit_scope(self):
+        with request_scope(implicit=True) as scope_1:
+            self.assertTrue(scope_1.implicit)
+
+            # Implicit scope re-uses the outer scope
+            with request_scope(implicit=True) as scope_2:
+                self.assertEqual(scope_1, scope_2)
+
+            # Explicit scope doesn't re-use implicit outer scope
+            with request_scope() as scope_3:
+                self.assertNotEqual(scope_1, scope_3)
+                self.assertFalse(scope_3.implicit)
+
+                with request_scope(implicit=True) as scope_4:
+                    self.assertEqual(scope_3, scope_4)
+
+            self.assertEqual(get_request_scope(), scope_1)
+
+    def test_scope_is_discarded_on_exit(self):
+        user_db = self.users["no_roles"]
+
+        with request_scope() as scope_1:
+            self.assertEqual(rbac_service.get_roles_for_user(user_db=user_db), [])
+
+            # Nested scopes re-use the outer scope
+            with request_scope() as scope_2:
+                self.assertEqual(scope_1, scope_2)
+
+        self.assertIsNone(get_request_scope())
+
+        rbac_service.assign_role_to_user(role_db=self.roles["observer_role"], user_db=user_db)
+
+        with request_scope():
+            role_dbs = rbac_service.get_roles_for_user(user_db=user_db)
+            self.assertEqual([role_db.name for role_db in role_dbs], ["observer"])
+
+    def test_service_mutators_invalidate_request_scope(self):
+        user_db = self.users["no_roles"]
+
+        with request_scope():
+            self.assertEqual(rbac_service.get_roles_for_user(user_db=user_db), [])
+            rbac_service.assign_role_to_user(role_db=self.roles["observer_role"], user_db=user_db)
+
+            role_dbs = rbac_service.get_roles_for_user(user_db=user_db)
+            self.assertEqual([role_db.name for role_db in role_dbs], ["observer"])
+
+    def test_middleware(self):
+        scopes = []
+
+        def app(environ, start_response):
+            scopes.append(get_request_scope())
+            return [b"ok"]
+
+        middleware = RequestScopeMiddleware(app)
+        self.assertEqual(middleware({}, None), [b"ok"])
+        self.assertEqual(middleware({}, None), [b"ok"])
+
+        self.assertEqual(len(scopes), 2)
+        self.assertIsNotNone(scopes[0])
+        self.assertIsNotNone(scopes[1])
+        self.assertNotEqual(scopes[0], scopes[1])
+        self.assertIsNone(get_request_scope())
+
+    def test_middleware_generator_response(self):
+        scopes = []
+        closed = []
+
+        def body():
+            try:
+                for chunk in [b"a", b"b"]:
+                    scopes.append(get_request_scope())
+                    yield chunk
+            finally:
+                closed.append(get_request_scope())
+
+        def app(environ, start_response):
+            scopes.append(get_request_scope())
+            return body()
+
+        middleware = RequestScopeMiddleware(app)
+        response = middleware({}, None)
+
+        # Scope is only active while the response is being generated
+        self.assertIsNone(get_request_scope())
+        self.assertEqual(next(response), b"a")
+        self.assertIsNone(get_request_scope())
+        self.assertEqual(list(response), [b"b"])
+        response.close()
+
+        self.assertEqual(len(scopes), 3)
+        self.assertIsNotNone(scopes[0])
+        self.assertEqual(scopes[1], scopes[0])
+        self.assertEqual(scopes[2], scopes[0])
+        self.assertEqual(closed, [scopes[0]])
+        self.assertIsNone(get_request_scope())
@@ -332,6 +332,158 @@ class RBACServiceTestCase(CleanDbTestCase):
         )
         self.assertCountEqual(permission_grants, [permission_grant])
 
+    def test_get_all_permission_grants_for_user_aggregate_query_mode(self):
+        user_db = self.users["1_custom_role"]
+        role_db = self.roles["custom_role_1"]
+
+        resource_db = self.resources["rule_1"]
+        permission_grant_1 = rbac_service.create_permission_grant_for_resource_db(
+            role_db=role_db, resource_db=resource_db, permission_types=[PermissionType.RULE_VIEW]
+        )
+        permission_grant_2 = rbac_service.create_permission_grant(
+            role_db=role_db,
+            resource_uid="pack:test1",
+            resource_type=ResourceType.PACK,
+            permission_types=[PermissionType.RULE_VIEW, PermissionType.RULE_CREATE],
+        )
+
+        filters = [
+            {},
+            {"resource_types": [ResourceType.RULE]},
+            {"resource_types": [ResourceType.PACK, ResourceType.RULE]},
+            {"resource_uid": resource_db.get_uid()},
+            {"permission_types": [PermissionType.RULE_CREATE]},
+            {"permission_types": [PermissionType.RULE_DELETE]},
+        ]
+
+        expected_results = []
+        for kwargs in filters:
+            permission_grants = rbac_service.get_all_permission_grants_for_user(
+                user_db=user_db, **kwargs
+            )
+            expected_results.append(sorted([str(grant.id) for grant in permission_grants]))
+
+        cfg.CONF.set_override(
+            name="permission_grants_query_mode", override="aggregate", group="rbac"
+        )
+
+        try:
+            for kwargs, expected in zip(filters, expected_results):
+                permission_grants = rbac_service.get_all_permission_grants_for_user(
+                    user_db=user_db, **kwargs
+                )
+                self.assertEqual(sorted([str(grant.id) for grant in permission_grants]), expected)
+
+            permission_grants = rbac_service.get_all_permission_grants_for_user(user_db=user_db)
+            self.assertCountEqual(permission_grants, [permission_grant_1, permission_grant_2])
+
+            permission_grants = rbac_service.get_all_permission_grants_for_user(
+                user_db=self.users["no_roles"]
+            )
+            self.assertEqual(permission_grants, [])
+        finally:
+            cfg.CONF.set_override(
+                name="permission_grants_query_mode", override="query", group="rbac"
+            )
+
+    def test_user_has_matching_permission_grant(self):
+        user_db = self.users["1_custom_role"]
+        role_db = self.roles["custom_role_1"]
+        resource_db = self.resources["rule_1"]
+
+        self.assertFalse(rbac_service.user_has_matching_permission_grant(user_db=user_db))
+
+        rbac_service.create_permission_grant_for_resource_db(
+            role_db=role_db, resource_db=resource_db, permission_types=[PermissionType.RULE_VIEW]
+        )
+
+        for query_mode in ["query", "aggregate"]:
+            cfg.CONF.set_override(
+                name="permission_grants_query_mode", override=query_mode, group="rbac"
+            )
+
+            self.assertTrue(rbac_service.user_has_matching_permission_grant(user_db=user_db))
+            self.assertTrue(
+                rbac_service.user_has_matching_permission_grant(
+                    user_db=user_db,
+                    resource_uid=resource_db.get_uid(),
+                    resource_types=[ResourceType.RULE],
+                    permission_types=[PermissionType.RULE_ALL, PermissionType.RULE_VIEW],
+                )
+            )
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant(
+                    user_db=user_db,
+                    resource_uid=resource_db.get_uid(),
+                    permission_types=[PermissionType.RULE_MODIFY],
+                )
+            )
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant(
+                    user_db=user_db, resource_types=[ResourceType.PACK]
+                )
+            )
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant(user_db=self.users["no_roles"])
+            )
+
+        cfg.CONF.set_override(name="permission_grants_query_mode", override="query", group="rbac")
+
+    def test_user_has_matching_permission_grant_for_resources(self):
+        user_db = self.users["1_custom_role"]
+        role_db = self.roles["custom_role_1"]
+        resource_db = self.resources["rule_1"]
+
+        resources = [(resource_db.get_uid(), ResourceType.RULE), ("pack:test1", ResourceType.PACK)]
+        permission_types = [PermissionType.RULE_ALL, PermissionType.RULE_VIEW]
+
+        self.assertFalse(
+            rbac_service.user_has_matching_permission_grant_for_resources(
+                user_db=user_db, resources=resources, permission_types=permission_types
+            )
+        )
+
+        rbac_service.create_permission_grant(
+            role_db=role_db,
+            resource_uid="pack:test1",
+            resource_type=ResourceType.PACK,
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+
+        for query_mode in ["query", "aggregate"]:
+            cfg.CONF.set_override(
+                name="permission_grants_query_mode", override=query_mode, group="rbac"
+            )
+
+            self.assertTrue(
+                rbac_service.user_has_matching_permission_grant_for_resources(
+                    user_db=user_db, resources=resources, permission_types=permission_types
+                )
+            )
+
+            # Grant is on the pack, resource type needs to match as well
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant_for_resources(
+                    user_db=user_db,
+                    resources=[("pack:test1", ResourceType.RULE)],
+                    permission_types=permission_types,
+                )
+            )
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant_for_resources(
+                    user_db=user_db,
+                    resources=resources,
+                    permission_types=[PermissionType.RULE_MODIFY],
+                )
+            )
+            self.assertFalse(
+                rbac_service.user_has_matching_permission_grant_for_resources(
+                    user_db=user_db, resources=[], permission_types=permission_types
+                )
+            )
+
+        cfg.CONF.set_override(name="permission_grants_query_mode", override="query", group="rbac")
+
     def test_create_and_remove_permission_grant(self):
         role_db = self.roles["custom_role_2"]
         resource_db = self.resources["rule_1"]
@@ -0,0 +1,197 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import mock
+from oslo_config import cfg
+
+from st2common.rbac.types import PermissionType
+from st2common.rbac.types import ResourceType
+from st2common.persistence.auth import User
+from st2common.persistence.rbac import Role
+from st2common.persistence.rbac import UserRoleAssignment
+from st2common.persistence.rbac import PermissionGrant
+from st2common.persistence.rule import Rule
+from st2common.models.db.auth import UserDB
+from st2common.models.db.rbac import RoleDB
+from st2common.models.db.rbac import UserRoleAssignmentDB
+from st2common.models.db.rbac import PermissionGrantDB
+from st2common.models.db.rule import RuleDB
+
+from st2rbac_backend.resolvers import RulePermissionsResolver
+from st2rbac_backend.service import RBACService as rbac_service
+from st2rbac_backend.snapshot import PermissionSnapshot
+from st2rbac_backend.snapshot import get_permission_snapshot
+from st2rbac_backend.snapshot import invalidate_permission_snapshot
+from st2rbac_backend.snapshot import use_permission_snapshot
+from tests.unit.test_rbac_resolvers import BasePermissionsResolverTestCase
+
+__all__ = ["PermissionSnapshotTestCase"]
+
+
+class PermissionSnapshotTestCase(BasePermissionsResolverTestCase):
+    def setUp(self):
+        super(PermissionSnapshotTestCase, self).setUp()
+
+        invalidate_permission_snapshot()
+
+        rule_1_db = RuleDB(pack="test_pack_1", name="rule1", ref="test_pack_1.rule1")
+        rule_1_db = Rule.add_or_update(rule_1_db)
+        self.resources["rule_1"] = rule_1_db
+
+        rule_2_db = RuleDB(pack="test_pack_2", name="rule2", ref="test_pack_2.rule2")
+        rule_2_db = Rule.add_or_update(rule_2_db)
+        self.resources["rule_2"] = rule_2_db
+
+        # Role with a direct "rule_view" grant on rule_1
+        grant_db = PermissionGrantDB(
+            resource_uid=self.resources["rule_1"].get_uid(),
+            resource_type=ResourceType.RULE,
+            permission_types=[PermissionType.RULE_VIEW],
+        )
+        grant_db = PermissionGrant.add_or_update(grant_db)
+        role_db = RoleDB(name="rule_1_view", permission_grants=[str(grant_db.id)])
+        self.roles["rule_1_view"] = Role.add_or_update(role_db)
+
+        user_db = User.add_or_update(UserDB(name="rule_1_view"))
+        self.users["rule_1_view"] = user_db
+
+        role_assignment_db = UserRoleAssignmentDB(
+            user=user_db.name,
+            role=self.roles["rule_1_view"].name,
+            source="assignments/%s.yaml" % user_db.name,
+        )
+        UserRoleAssignment.add_or_update(role_assignment_db)
+
+    def tearDown(self):
+        super(PermissionSnapshotTestCase, self).tearDown()
+
+        invalidate_permission_snapshot()
+        cfg.CONF.set_override(name="permission_snapshot_enable", override=False, group="rbac")
+
+    def test_snapshot_matches_database(self):
+        snapshot = PermissionSnapshot.build()
+
+        for user_db in self.users.values():
+            db_role_names = sorted(
+                [role_db.name for role_db in rbac_service.get_roles_for_user(user_db=user_db)]
+            )
+            snapshot_role_names = sorted(
+                [role_db.name for role_db in snapshot.get_roles_for_user(username=user_db.name)]
+            )
+            self.assertEqual(snapshot_role_names, db_role_names)
+
+            db_grant_ids = sorted(
+                [
+                    str(grant_db.id)
+                    for grant_db in rbac_service.get_all_permission_grants_for_user(user_db=user_db)
+                ]
+            )
+            snapshot_grant_ids = sorted(
+                [
+                    str(grant_db.id)
+                    for grant_db in snapshot.get_permission_grants_for_user(username=user_db.name)
+                ]
+            )
+            self.assertEqual(snapshot_grant_ids, db_grant_ids)
+
+    def test_user_has_permission_grant(self):
+        snapshot = PermissionSnapshot.build()
+        username = self.users["rule_1_view"].name
+        rule_1_uid = self.resources["rule_1"].get_uid()
+        rule_2_uid = self.resources["rule_2"].get_uid()
+
+        self.assertTrue(
+            snapshot.user_has_permission_grant(
+                username=username,
+                resource_uid=rule_1_uid,
+                resource_types=[ResourceType.RULE],
+                permission_types=[PermissionType.RULE_VIEW],
+            )
+        )
+        self.assertTrue(
+            snapshot.user_has_permission_grant(
+                username=username, permission_types=[PermissionType.RULE_VIEW]
+            )
+        )
+        self.assertFalse(
+            snapshot.user_has_permission_grant(
+                username=username,
+                resource_uid=rule_2_uid,
+                resource_types=[ResourceType.RULE],
+                permission_types=[PermissionType.RULE_VIEW],
+            )
+        )
+        self.assertFalse(
+            snapshot.user_has_permission_grant(
+                username=username,
+                resource_uid=rule_1_uid,
+                resource_types=[ResourceType.PACK],
+                permission_types=[PermissionType.RULE_VIEW],
+            )
+        )
+        self.assertFalse(
+            snapshot.user_has_permission_grant(
+                username="unknown", permission_types=[PermissionType.RULE_VIEW]
+            )
+        )
+
+    @mock.patch.object(PermissionGrant, "query", mock.Mock(side_effect=AssertionError("db")))
+    @mock.patch.object(UserRoleAssignment, "query", mock.Mock(side_effect=AssertionError("db")))
+    @mock.patch.object(Role, "query", mock.Mock(side_effect=AssertionError("db")))
+    def test_resolver_uses_snapshot_without_database_queries(self):
+        resolver = RulePermissionsResolver()
+
+        snapshot = PermissionSnapshot.build()
+
+        with use_permission_snapshot(snapshot):
+            self.assertUserHasResourceDbPermission(
+                resolver=resolver,
+                user_db=self.users["rule_1_view"],
+                resource_db=self.resources["rule_1"],
+                permission_type=PermissionType.RULE_VIEW,
+            )
+            self.assertUserDoesntHaveResourceDbPermission(
+                resolver=resolver,
+                user_db=self.users["rule_1_view"],
+                resource_db=self.resources["rule_2"],
+                permission_type=PermissionType.RULE_VIEW,
+            )
+
+            # Observer has "view" permission on all the resources via system role
+            self.assertUserHasResourceDbPermission(
+                resolver=resolver,
+                user_db=self.users["observer"],
+                resource_db=self.resources["rule_2"],
+                permission_type=PermissionType.RULE_VIEW,
+            )
+
+    def test_snapshot_is_invalidated_on_service_mutation(self):
+        cfg.CONF.set_override(name="permission_snapshot_enable", override=True, group="rbac")
+
+        snapshot_1 = get_permission_snapshot()
+        self.assertEqual(get_permission_snapshot(), snapshot_1)
+
+        user_db = self.users["no_roles"]
+        self.assertEqual(rbac_service.get_roles_for_user(user_db=user_db), [])
+
+        rbac_service.assign_role_to_user(role_db=self.roles["rule_1_view"], user_db=user_db)
+
+        snapshot_2 = get_permission_snapshot()
+        self.assertNotEqual(snapshot_2, snapshot_1)
+
+        role_names = [role_db.name for role_db in rbac_service.get_roles_for_user(user_db=user_db)]
+        self.assertEqual(role_names, ["rule_1_view"])
@@ -15,6 +15,8 @@
 
 from __future__ import absolute_import
 
+import mock
+from oslo_config import cfg
 from pymongo import MongoClient
 
 from st2tests.base import CleanDbTestCase
@@ -26,6 +28,7 @@ from st2common.models.db.auth import UserDB
 from st2common.models.db.rbac import UserRoleAssignmentDB
 from st2common.models.api.rbac import RoleDefinitionFileFormatAPI
 from st2common.models.api.rbac import UserRoleAssignmentFileFormatAPI
+from st2rbac_backend.generation import get_rbac_generation
 from st2rbac_backend.service import RBACService as rbac_service
 from st2rbac_backend.syncer import RBACDefinitionsDBSyncer
 from st2rbac_backend.syncer import RBACRemoteGroupToRoleSyncer
@@ -187,6 +190,88 @@ class RBACDefinitionsDBSyncerTestCase(BaseRBACDefinitionsDBSyncerTestCase):
         self.assertRoleDBObjectExists(role_db=created_role_dbs[0])
         self.assertEqual(Role.get_all()[0].name, "test_role_2")
 
+    def test_sync_roles_role_inheritance(self):
+        syncer = RBACDefinitionsDBSyncer()
+
+        base_api = RoleDefinitionFileFormatAPI(
+            name="base",
+            permission_grants=[
+                {"resource_uid": "pack:base", "permission_types": ["pack_all"]},
+                {"permission_types": ["action_list"]},
+            ],
+        )
+        base_api.extends = []
+        team_api = RoleDefinitionFileFormatAPI(
+            name="team",
+            permission_grants=[{"resource_uid": "pack:team", "permission_types": ["pack_all"]}],
+        )
+        team_api.extends = ["base"]
+        team_lead_api = RoleDefinitionFileFormatAPI(
+            name="team_lead",
+            permission_grants=[{"resource_uid": "pack:lead", "permission_types": ["pack_all"]}],
+        )
+        team_lead_api.extends = ["team", "base"]
+
+        # Roles are created in the inheritance order, regardless of the definitions order
+        created_role_dbs, _ = syncer.sync_roles(
+            role_definition_apis=[team_lead_api, team_api, base_api]
+        )
+        role_names = [role_db.name for role_db in created_role_dbs]
+        self.assertEqual(role_names, ["base", "team", "team_lead"])
+
+        # Grants are shared and not duplicated
+        self.assertEqual(len(PermissionGrant.get_all()), 4)
+
+        base_grant_ids = created_role_dbs[0].permission_grants
+        team_grant_ids = created_role_dbs[1].permission_grants
+        team_lead_grant_ids = created_role_dbs[2].permission_grants
+
+        self.assertEqual(len(base_grant_ids), 2)
+        self.assertEqual(len(team_grant_ids), 3)
+        self.assertEqual(len(team_lead_grant_ids), 4)
+        self.assertEqual(team_grant_ids[1:], base_grant_ids)
+        self.assertEqual(team_lead_grant_ids[1:], team_grant_ids)
+
+        # Flattened grants are stored in the DB
+        self.assertEqual(Role.get(name="team_lead").permission_grants, team_lead_grant_ids)
+
+        # Re-sync removes all the old grants
+        syncer.sync_roles(role_definition_apis=[team_lead_api, team_api, base_api])
+        self.assertEqual(len(PermissionGrant.get_all()), 4)
+
+        # Cycles are detected
+        base_api.extends = ["team_lead"]
+        self.assertRaisesRegex(
+            ValueError,
+            "Role inheritance cycle detected",
+            syncer.sync_roles,
+            role_definition_apis=[team_lead_api, team_api, base_api],
+        )
+
+    @mock.patch("st2rbac_backend.events.invalidate_permission_caches")
+    def test_sync_sends_single_rbac_change_notification(self, mock_invalidate):
+        syncer = RBACDefinitionsDBSyncer()
+
+        role_api = RoleDefinitionFileFormatAPI(
+            name="test_role_1",
+            permission_grants=[
+                {"resource_uid": "pack:mapack1", "permission_types": ["pack_all"]},
+                {"resource_uid": "pack:mapack2", "permission_types": ["pack_all"]},
+            ],
+        )
+        assignment_api = UserRoleAssignmentFileFormatAPI(
+            username="user_1", roles=["test_role_1"], file_path="assignments/user_1.yaml"
+        )
+
+        syncer.sync(
+            role_definition_apis=[role_api],
+            role_assignment_apis=[assignment_api],
+            group_to_role_map_apis=[],
+        )
+
+        # Changes made by the individual service mutators are not notified about
+        mock_invalidate.assert_called_once_with(username=None, role_name=None)
+
     def test_sync_user_assignments_single_role_assignment(self):
         syncer = RBACDefinitionsDBSyncer()
 
@@ -675,6 +760,59 @@ class RBACRemoteGroupToRoleSyncerTestCase(BaseRBACDefinitionsDBSyncerTestCase):
         self.assertEqual(role_assignment_dbs[2].source, "mappings/stormers.yaml")
         self.assertEqual(role_assignment_dbs[3].source, "mappings/stormers.yaml")
 
+    def test_sync_role_claims(self):
+        syncer = RBACRemoteGroupToRoleSyncer()
+        user_db = self.users["user_1"]
+
+        rbac_service.create_group_to_role_map(
+            group="CN=stormers,OU=groups,DC=stackstorm,DC=net",
+            roles=["mock_remote_role_3"],
+            source="mappings/stormers.yaml",
+        )
+        groups = ["CN=stormers,OU=groups,DC=stackstorm,DC=net"]
+
+        # Role claims are disabled by default
+        syncer.sync(user_db=user_db, groups=groups)
+        self.assertIsNone(syncer.role_claims)
+
+        cfg.CONF.set_override(name="role_claims_enable", override=True, group="rbac")
+        self.addCleanup(
+            cfg.CONF.set_override, name="role_claims_enable", override=False, group="rbac"
+        )
+
+        syncer.sync(user_db=user_db, groups=groups)
+        self.assertEqual(syncer.role_claims.username, user_db.name)
+        self.assertEqual(
+            syncer.role_claims.role_names,
+            frozenset(["mock_local_role_1", "mock_local_role_2", "mock_remote_role_3"]),
+        )
+        self.assertEqual(syncer.role_claims.generation, get_rbac_generation())
+
+    @mock.patch("st2rbac_backend.syncer.notify_rbac_change")
+    def test_sync_only_notifies_when_effective_roles_change(self, mock_notify):
+        syncer = RBACRemoteGroupToRoleSyncer()
+        user_db = self.users["user_1"]
+
+        rbac_service.create_group_to_role_map(
+            group="CN=stormers,OU=groups,DC=stackstorm,DC=net",
+            roles=["mock_remote_role_3", "mock_remote_role_4"],
+            source="mappings/stormers.yaml",
+        )
+        groups = ["CN=stormers,OU=groups,DC=stackstorm,DC=net"]
+
+        # New remote roles, single notification
+        syncer.sync(user_db=user_db, groups=groups)
+        mock_notify.assert_called_once_with(username=user_db.name)
+
+        # Same roles on subsequent login, no notification
+        mock_notify.reset_mock()
+        syncer.sync(user_db=user_db, groups=groups)
+        self.assertEqual(mock_notify.call_count, 0)
+
+        # User is not a member of the group anymore
+        syncer.sync(user_db=user_db, groups=[])
+        mock_notify.assert_called_once_with(username=user_db.name)
+
     def test_sync_user_same_role_granted_locally_and_remote_via_mapping(self):
         syncer = RBACRemoteGroupToRoleSyncer()
         user_db = self.users["user_6"]
@@ -0,0 +1,49 @@
+# Copyright 2020 The StackStorm Authors.
+# Copyright (C) 2020 Extreme Networks, Inc - All Rights Reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+
+import unittest
+
+from st2common.rbac.types import ResourceType
+from st2common.models.db.pack import PackDB
+from st2common.models.db.webhook import WebhookDB
+
+from st2rbac_backend.uid import get_resource_uid
+from st2rbac_backend.uid import get_pack_uid
+from st2rbac_backend.uid import get_webhook_uid
+
+__all__ = ["UIDUtilsTestCase"]
+
+
+class UIDUtilsTestCase(unittest.TestCase):
+    def test_get_resource_uid(self):
+        self.assertEqual(get_resource_uid(ResourceType.PACK, "examples"), "pack:examples")
+        self.assertEqual(
+            get_resource_uid(ResourceType.ACTION, "examples", "local"), "action:examples:local"
+        )
+
+    def test_get_pack_uid(self):
+        for pack_ref in ["examples", "core", "my_pack"]:
+            self.assertEqual(get_pack_uid(pack_ref=pack_ref), PackDB(ref=pack_ref).get_uid())
+
+        # Results are memoized
+        self.assertTrue(get_pack_uid(pack_ref="examples") is get_pack_uid(pack_ref="examples"))
+
+    def test_get_webhook_uid(self):
+        for name in ["git", "sample/hook", "my_webhook/"]:
+            self.assertEqual(get_webhook_uid(name=name), WebhookDB(name=name).get_uid())
+
+        self.assertTrue(get_webhook_uid(name="git") is get_webhook_uid(name="git"))